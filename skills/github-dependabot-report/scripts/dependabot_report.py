@@ -12,15 +12,38 @@ from __future__ import annotations
 
 import subprocess
 import json
+import os
+import re
 import sys
+import threading
 import argparse
+import io
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from typing import Optional
 
+try:
+    # orjson is optional; it parses multi-MB alert pages and the response cache faster
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 ORGS = ["walletconnect", "reown-com", "walletconnectfoundation"]
 OUT_OF_SCOPE_TOPIC = "out-of-scope"
+MAX_ORG_WORKERS = 4
+MAX_TOPIC_WORKERS = 8
+TOPICS_BATCH_SIZE = 100
+ALERTS_PER_PAGE = 100
+CACHE_PATH = Path.home() / ".cache" / "dependabot_report" / "cache.json"
+
+_LINK_NEXT_RE = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+# Endpoints requested this run; only their cache entries are saved, so pages
+# and repos that are no longer requested drop out of the cache
+_used_endpoints: set[str] = set()
 
 
 def run_gh_command(args: list[str], silent: bool = False, timeout: int = 300) -> Optional[str]:
@@ -45,58 +68,212 @@ def run_gh_command(args: list[str], silent: bool = False, timeout: int = 300) ->
         return None
 
 
-def get_org_alerts(org: str, include_medium: bool = False) -> tuple[bool, list[dict]]:
-    """Get all open Dependabot alerts for an organization.
+def load_response_cache(path: Path = CACHE_PATH) -> dict[str, dict]:
+    """Load the ETag response cache, returning an empty cache if unreadable."""
+    try:
+        cache = json_loads(path.read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
 
-    Returns (success, alerts) — success is False when the API call failed.
+
+def save_response_cache(cache: dict[str, dict], path: Path = CACHE_PATH) -> None:
+    """Persist the cache entries for endpoints requested this run."""
+    used = {endpoint: cache[endpoint] for endpoint in _used_endpoints if endpoint in cache}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so an interrupted save never leaves a truncated cache
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(used))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"  Warning: could not write cache {path}: {e}", file=sys.stderr)
+
+
+def gh_api_conditional(
+    endpoint: str,
+    cache: Optional[dict[str, dict]],
+    silent: bool = False,
+    timeout: int = 300
+) -> Optional[tuple[str, Optional[str]]]:
+    """GET a REST endpoint, revalidating a cached copy with If-None-Match.
+
+    Returns (body, next_url) or None on failure. A 304 reuses the cached
+    body and does not count against the rate limit.
     """
-    print(f"  Fetching alerts for {org}...")
+    entry = None
+    if cache is not None:
+        _used_endpoints.add(endpoint)
+        entry = cache.get(endpoint)
+    args = ["api", "-i", endpoint]
+    if entry:
+        args += ["-H", f"If-None-Match: {entry['etag']}"]
+
+    # Read the status line and headers off the pipe as they arrive, then the
+    # body in one read (pages are bounded by ALERTS_PER_PAGE), rather than
+    # buffering all of stdout and splitting it.
+    try:
+        proc = subprocess.Popen(
+            ["gh"] + args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+    except Exception as e:
+        print(f"  Error: {e}", file=sys.stderr)
+        return None
 
-    output = run_gh_command([
-        "api", f"/orgs/{org}/dependabot/alerts",
-        "--paginate"
-    ], timeout=300)
+    timed_out = threading.Event()
 
-    if not output:
-        print(f"    ERROR: Failed to fetch alerts for {org} (check token permissions)", file=sys.stderr)
-        return False, []
+    def _kill() -> None:
+        timed_out.set()
+        proc.kill()
 
+    watchdog = threading.Timer(timeout, _kill)
+    watchdog.start()
     try:
-        all_alerts = json.loads(output)
-    except json.JSONDecodeError as e:
-        print(f"    ERROR: JSON decode error for {org}: {e}", file=sys.stderr)
-        return False, []
+        status_fields = proc.stdout.readline().split()
+        headers = {}
+        for line in proc.stdout:
+            line = line.rstrip("\r\n")
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = proc.stdout.read()
+        stderr = proc.stderr.read()
+        proc.wait()
+    finally:
+        watchdog.cancel()
+
+    if timed_out.is_set():
+        print(f"  Timeout running: gh {' '.join(args)}", file=sys.stderr)
+        return None
 
-    severities = {"critical", "high"}
+    # gh exits non-zero on a 304, so inspect the status line rather than the return code
+    status = int(status_fields[1]) if len(status_fields) > 1 and status_fields[1].isdigit() else 0
+
+    if status == 304 and entry:
+        return entry["body"], entry.get("next")
+
+    if status != 200:
+        if not silent:
+            print(f"  Warning: {stderr.strip() or f'HTTP {status}'}", file=sys.stderr)
+        return None
+
+    link = _LINK_NEXT_RE.search(headers.get("link", ""))
+    next_url = link.group(1) if link else None
+
+    if cache is not None and headers.get("etag"):
+        cache[endpoint] = {"etag": headers["etag"], "body": body, "next": next_url}
+    return body, next_url
+
+
+def get_org_alerts(
+    org: str,
+    include_medium: bool = False,
+    cache: Optional[dict[str, dict]] = None
+) -> tuple[bool, list[dict]]:
+    """Get all open Dependabot alerts for an organization.
+
+    Pages are fetched one at a time so each can be revalidated against the
+    ETag cache. State and severity are filtered by the API itself.
+
+    Returns (success, alerts) — success is False when the API call failed.
+    """
+    print(f"  Fetching alerts for {org}...")
+
+    severities = ["critical", "high"]
     if include_medium:
-        severities.add("medium")
+        severities.append("medium")
 
-    alerts = [
-        a for a in all_alerts
-        if a.get("state") == "open" and
-        a.get("security_advisory", {}).get("severity", "").lower() in severities
-    ]
+    # per_page=100 is the endpoint maximum (default 30); Link "next" URLs keep it
+    url: Optional[str] = (
+        f"/orgs/{org}/dependabot/alerts?state=open&severity={','.join(severities)}"
+        f"&per_page={ALERTS_PER_PAGE}"
+    )
+    alerts: list[dict] = []
+    while url:
+        page = gh_api_conditional(url, cache)
+        if page is None:
+            print(f"    ERROR: Failed to fetch alerts for {org} (check token permissions)", file=sys.stderr)
+            return False, []
+
+        body, url = page
+        try:
+            alerts.extend(json_loads(body))
+        except json.JSONDecodeError as e:
+            print(f"    ERROR: JSON decode error for {org}: {e}", file=sys.stderr)
+            return False, []
 
     print(f"    Found {len(alerts)} open alerts (critical/high{'/medium' if include_medium else ''})")
     return True, alerts
 
 
-def get_repo_topics(org: str, repo: str) -> list[str]:
+def get_repo_topics(org: str, repo: str, cache: Optional[dict[str, dict]] = None) -> list[str]:
     """Get topics for a specific repository."""
-    output = run_gh_command([
-        "api", f"/repos/{org}/{repo}/topics",
-        "-q", ".names"
-    ], silent=True)
+    page = gh_api_conditional(f"/repos/{org}/{repo}/topics", cache, silent=True)
 
-    if not output:
+    if not page:
         return []
 
     try:
-        return json.loads(output)
+        return json.loads(page[0]).get("names", [])
     except json.JSONDecodeError:
         return []
 
 
+def _fetch_topics_graphql(pairs: list[tuple[str, str]]) -> Optional[dict[str, list[str]]]:
+    """Fetch topics for up to TOPICS_BATCH_SIZE repos in one GraphQL query.
+
+    Returns None when the query fails so the caller can fall back to REST.
+    """
+    fields = " ".join(
+        f"r{i}: repository(owner: {json.dumps(org)}, name: {json.dumps(repo)}) "
+        "{ repositoryTopics(first: 100) { nodes { topic { name } } } }"
+        for i, (org, repo) in enumerate(pairs)
+    )
+    output = run_gh_command(["api", "graphql", "-f", f"query=query {{ {fields} }}"], silent=True)
+    if not output:
+        return None
+
+    try:
+        data = json_loads(output).get("data") or {}
+    except json.JSONDecodeError:
+        return None
+
+    topics: dict[str, list[str]] = {}
+    for i, (org, repo) in enumerate(pairs):
+        node = data.get(f"r{i}") or {}
+        topics[f"{org}/{repo}"] = [
+            n["topic"]["name"]
+            for n in (node.get("repositoryTopics") or {}).get("nodes", [])
+            if n and n.get("topic")
+        ]
+    return topics
+
+
+def get_repo_topics_batch(
+    pairs: list[tuple[str, str]],
+    cache: Optional[dict[str, dict]] = None
+) -> dict[str, list[str]]:
+    """Get topics for many repositories, keyed by "org/repo".
+
+    Repos are queried via GraphQL in batches of TOPICS_BATCH_SIZE; a batch that
+    fails (e.g. one inaccessible repo) falls back to per-repo REST calls.
+    """
+    batches = [pairs[i:i + TOPICS_BATCH_SIZE] for i in range(0, len(pairs), TOPICS_BATCH_SIZE)]
+    topics: dict[str, list[str]] = {}
+    with ThreadPoolExecutor(max_workers=MAX_TOPIC_WORKERS) as executor:
+        for batch, result in zip(batches, executor.map(_fetch_topics_graphql, batches)):
+            if result is not None:
+                topics.update(result)
+                continue
+            for (org, repo), repo_topics in zip(batch, executor.map(lambda p: get_repo_topics(*p, cache), batch)):
+                topics[f"{org}/{repo}"] = repo_topics
+    return topics
+
+
 def extract_team_topics(topics: list[str]) -> list[str]:
     """Extract team-* topics from a list of topics."""
     return [t for t in topics if t.startswith("team-")]
@@ -106,13 +283,16 @@ def generate_report(
     orgs: list[str],
     include_medium: bool = False,
     output_path: Path = None,
-    skip_min_check: bool = False
+    skip_min_check: bool = False,
+    use_cache: bool = True
 ) -> str:
     """Generate the full Dependabot report."""
 
     if output_path is None:
         raise ValueError("--output is required")
 
+    response_cache = load_response_cache() if use_cache else None
+
     team_repos: dict[str, list[dict]] = defaultdict(list)
     unowned_repos: list[dict] = []
     out_of_scope_repos: list[dict] = []
@@ -126,8 +306,11 @@ def generate_report(
     all_alerts = []
     failed_orgs = []
     empty_orgs = []
-    for org in orgs:
-        success, org_alerts = get_org_alerts(org, include_medium)
+    # Org fetches are independent, network-bound gh calls; run them concurrently
+    with ThreadPoolExecutor(max_workers=max(1, min(len(orgs), MAX_ORG_WORKERS))) as executor:
+        results = list(executor.map(lambda o: get_org_alerts(o, include_medium, response_cache), orgs))
+
+    for org, (success, org_alerts) in zip(orgs, results):
         if not success:
             failed_orgs.append(org)
         elif len(org_alerts) == 0:
@@ -154,53 +337,64 @@ def generate_report(
     if not all_alerts:
         print("No alerts found.")
     else:
+        needed_repos: dict[str, tuple[str, str]] = {}
+        for alert in all_alerts:
+            repo_info = alert.get("repository", {})
+            full_name = repo_info.get("full_name", "")
+            if full_name and full_name not in needed_repos:
+                needed_repos[full_name] = (repo_info.get("owner", {}).get("login", ""), repo_info.get("name", ""))
+
+        print(f"  Fetching topics for {len(needed_repos)} repositories...")
+        batch_topics = get_repo_topics_batch(list(needed_repos.values()), response_cache)
+        for full_name, (org, repo_name) in needed_repos.items():
+            repo_topics_cache[full_name] = batch_topics.get(f"{org}/{repo_name}", [])
+
         for alert in all_alerts:
             repo_info = alert.get("repository", {})
             full_name = repo_info.get("full_name", "")
-            org = repo_info.get("owner", {}).get("login", "")
-            repo_name = repo_info.get("name", "")
 
             if not full_name:
                 continue
 
-            if full_name not in repo_data_map:
-                if full_name not in repo_topics_cache:
-                    print(f"  Fetching topics for {full_name}...")
-                    repo_topics_cache[full_name] = get_repo_topics(org, repo_name)
-
-                repo_data_map[full_name] = {
-                    "name": repo_name,
+            repo_data = repo_data_map.get(full_name)
+            if repo_data is None:
+                topics = repo_topics_cache[full_name]
+                out_of_scope = OUT_OF_SCOPE_TOPIC in topics
+                teams = [] if out_of_scope else extract_team_topics(topics)
+                repo_data = repo_data_map[full_name] = {
+                    "name": repo_info.get("name", ""),
                     "full_name": full_name,
-                    "org": org,
+                    "org": repo_info.get("owner", {}).get("login", ""),
                     "alerts": [],
                     "severity_counts": defaultdict(int),
                     "total_alerts": 0,
                     "security_url": f"https://github.com/{full_name}/security/dependabot",
-                    "topics": repo_topics_cache[full_name]
+                    "topics": topics,
+                    "_teams": teams,
+                    "_out_of_scope": out_of_scope
                 }
-
-            sev = alert.get("security_advisory", {}).get("severity", "unknown").lower()
-            repo_data_map[full_name]["alerts"].append(alert)
-            repo_data_map[full_name]["severity_counts"][sev] += 1
-            repo_data_map[full_name]["total_alerts"] += 1
+                # Group the repo the first time it is seen instead of in a second pass
+                if out_of_scope:
+                    out_of_scope_repos.append(repo_data)
+                elif teams:
+                    for team in teams:
+                        team_repos[team].append(repo_data)
+                else:
+                    unowned_repos.append(repo_data)
+
+            advisory = alert.get("security_advisory") or {}
+            sev = advisory.get("severity", "unknown").lower()
+            # Precomputed detail-section sort key: critical first, then oldest first
+            alert["_sort_key"] = (0 if sev == "critical" else 1, alert.get("created_at", ""))
+            repo_data["alerts"].append(alert)
+            repo_data["severity_counts"][sev] += 1
+            repo_data["total_alerts"] += 1
             total_by_severity[sev] += 1
-
-        for full_name, repo_data in repo_data_map.items():
-            topics = repo_data.get("topics", [])
-            if OUT_OF_SCOPE_TOPIC in topics:
-                out_of_scope_repos.append(repo_data)
-                for sev, count in repo_data["severity_counts"].items():
-                    oos_by_severity[sev] += count
-                continue
-            teams = extract_team_topics(topics)
-            if teams:
-                for team in teams:
-                    team_repos[team].append(repo_data)
-            else:
-                unowned_repos.append(repo_data)
+            if repo_data["_out_of_scope"]:
+                oos_by_severity[sev] += 1
 
         print(f"\nRepositories with alerts: {len(repo_data_map)}")
-        print(f"  Assigned to teams: {len(set(r['full_name'] for repos in team_repos.values() for r in repos))}")
+        print(f"  Assigned to teams: {sum(1 for r in repo_data_map.values() if r['_teams'])}")
         print(f"  Unowned: {len(unowned_repos)}")
         print(f"  Out of scope: {len(out_of_scope_repos)}")
 
@@ -237,6 +431,13 @@ def generate_report(
         "",
     ])
 
+    # Sort once; the partitions below keep this order, so every section is already sorted
+    repos_by_alerts = sorted(repo_data_map.values(), key=lambda r: -r["total_alerts"])
+    team_repos_by_alerts: dict[str, list[dict]] = defaultdict(list)
+    for repo in repos_by_alerts:
+        for team in repo["_teams"]:
+            team_repos_by_alerts[team].append(repo)
+
     total_alerts = in_scope_total + oos_total
     if total_alerts == 0:
         lines.extend([
@@ -256,7 +457,7 @@ def generate_report(
             lines.append("| Repository | Critical | High | Link |")
             lines.append("|------------|----------|------|------|")
 
-            for repo in sorted(repos, key=lambda r: -r["total_alerts"]):
+            for repo in team_repos_by_alerts[team]:
                 crit = repo["severity_counts"].get("critical", 0)
                 high = repo["severity_counts"].get("high", 0)
                 lines.append(
@@ -275,7 +476,7 @@ def generate_report(
             lines.append("| Repository | Critical | High | Link |")
             lines.append("|------------|----------|------|------|")
 
-            for repo in sorted(unowned_repos, key=lambda r: -r["total_alerts"]):
+            for repo in (r for r in repos_by_alerts if not r["_teams"] and not r["_out_of_scope"]):
                 crit = repo["severity_counts"].get("critical", 0)
                 high = repo["severity_counts"].get("high", 0)
                 lines.append(
@@ -293,7 +494,7 @@ def generate_report(
             lines.append("| Repository | Critical | High | Link |")
             lines.append("|------------|----------|------|------|")
 
-            for repo in sorted(out_of_scope_repos, key=lambda r: -r["total_alerts"]):
+            for repo in (r for r in repos_by_alerts if r["_out_of_scope"]):
                 crit = repo["severity_counts"].get("critical", 0)
                 high = repo["severity_counts"].get("high", 0)
                 lines.append(
@@ -307,31 +508,17 @@ def generate_report(
         lines.append("## Alert Details")
         lines.append("")
 
-        all_repos = []
-        for repos in team_repos.values():
-            all_repos.extend(repos)
-        all_repos.extend(unowned_repos)
-        # Exclude out-of-scope repos from detailed alert listing
-        oos_names = {r["full_name"] for r in out_of_scope_repos}
-
-        seen = set()
-        unique_repos = []
-        for repo in all_repos:
-            if repo["full_name"] not in seen and repo["full_name"] not in oos_names:
-                seen.add(repo["full_name"])
-                unique_repos.append(repo)
-
-        for repo in sorted(unique_repos, key=lambda r: -r["total_alerts"]):
-            lines.append(f"### {repo['full_name']}")
-            lines.append("")
+        # repo_data_map is already deduplicated; exclude out-of-scope repos from detailed alert listing
+        unique_repos = [r for r in repos_by_alerts if not r["_out_of_scope"]]
 
-            for alert in sorted(
-                repo["alerts"],
-                key=lambda a: (
-                    0 if a.get("security_advisory", {}).get("severity") == "critical" else 1,
-                    a.get("created_at", "")
-                )
-            ):
+        # One write per alert instead of five list appends; blank line between repos
+        details = io.StringIO()
+        for repo in unique_repos:
+            if details.tell():
+                details.write("\n")
+            details.write(f"### {repo['full_name']}\n\n")
+
+            for alert in sorted(repo["alerts"], key=itemgetter("_sort_key")):
                 advisory = alert.get("security_advisory", {})
                 vuln = alert.get("security_vulnerability", {})
                 pkg = vuln.get("package", {})
@@ -344,16 +531,21 @@ def generate_report(
                 patched = vuln.get("first_patched_version", {})
                 patched_ver = patched.get("identifier", "No patch available") if patched else "No patch available"
 
-                lines.append(f"- **[{sev}]** `{pkg_name}` ({ecosystem})")
-                lines.append(f"  - {summary}")
-                lines.append(f"  - Patched in: {patched_ver}")
-                lines.append(f"  - [View alert]({html_url})")
-                lines.append("")
+                details.write(
+                    f"- **[{sev}]** `{pkg_name}` ({ecosystem})\n"
+                    f"  - {summary}\n"
+                    f"  - Patched in: {patched_ver}\n"
+                    f"  - [View alert]({html_url})\n\n"
+                )
 
-            lines.append("")
+        if details.tell():
+            lines.append(details.getvalue())
 
     report = "\n".join(lines)
 
+    if response_cache is not None:
+        save_response_cache(response_cache)
+
     output_path.parent.mkdir(parents=True, exist_ok=True)
     output_path.write_text(report)
 
@@ -387,6 +579,11 @@ def main():
         action="store_true",
         help="Disable the minimum alert count sanity check"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Do not read or write the ETag response cache ({CACHE_PATH})"
+    )
 
     args = parser.parse_args()
 
@@ -396,7 +593,8 @@ def main():
         orgs=orgs,
         include_medium=args.include_medium,
         output_path=args.output,
-        skip_min_check=args.no_min_check
+        skip_min_check=args.no_min_check,
+        use_cache=not args.no_cache
     )
 
 
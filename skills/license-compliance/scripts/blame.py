@@ -3,12 +3,31 @@
 from __future__ import annotations
 
 import json
+import os
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
-from util import run_command
+from util import json_loads, run_command, walk_project
+
+_CARGO_DEPS_SECTION_RE = re.compile(r'\[(dev-)?dependencies\]')
+_TREE_PREFIX_RE = re.compile(r'^[\s\u2502\u251c\u2514\u2500\u252c\u2524]+')
+_PNPM_WHY_ENTRY_RE = re.compile(r'^(@[a-zA-Z0-9_.-]+/[a-zA-Z0-9_.-]+|[a-zA-Z][a-zA-Z0-9_.-]*)[\s@](\d[\d.]*)')
+_YARN_WHY_PARENT_RE = re.compile(r'"([^"]+)"\s+depends on it')
+_PNPM_LOCK_HEADER_RE = re.compile(r"""[/'"]?(@[a-zA-Z0-9._-]+/[a-zA-Z0-9._-]+|[a-zA-Z][a-zA-Z0-9._-]*)@""")
+_CARGO_TREE_NAME_RE = re.compile(r'^[\u2502\u251c\u2514\u2500 ]*([a-zA-Z][a-zA-Z0-9_-]*)')
+_MANIFEST_KEY_RE = re.compile(r'^([^=\s]+)\s*=')
+_TOML_DOTTED_TABLE_NAME_RE = re.compile(r'\.([^.\]]+)\]')
+_QUOTED_REQUIREMENT_RE = re.compile(r'["\']([^"\'>=<~!\s]+)(?=[>=<~!\s\'"])')
+_PNPM_LOCK_DEP_LINE_RE = re.compile(r'^\s+(\S+?):\s')
+
+# Successive `git fetch --deepen` steps for shallow clones; None means --unshallow
+_DEEPEN_STEPS = (500, 2000, 10000, None)
+_ERE_SPECIAL_CHARS = frozenset(".[]{}()\\*+?^$|")
+
+_pnpm_lock_index_cache: dict[Path, dict[str, list[str]]] = {}
 
 
 def _get_manifest_pathspecs(pm: str) -> list[str]:
@@ -26,41 +45,48 @@ def _get_manifest_pathspecs(pm: str) -> list[str]:
     return []
 
 
-def _find_direct_dep_in_manifest(project_path: Path, pm: str, pkg_name: str) -> bool:
-    """Check if pkg_name is listed as a direct dependency in a manifest file."""
-    import glob as globmod
+def _iter_manifests(root: Path, filename: str) -> Iterator[str]:
+    """Yield paths of files named `filename` under root, pruned like the scanners' walks."""
+    for dirpath, _, filenames in walk_project(root):
+        if filename in filenames:
+            yield os.path.join(dirpath, filename)
+
+
+def _collect_direct_deps(project_path: Path, pm: str) -> set[str]:
+    """Collect the names of all direct dependencies declared in the project's manifests.
 
+    Python package managers compare names case-insensitively, so their names
+    are returned lowercased; see _is_direct_dep.
+    """
+    direct: set[str] = set()
     if pm in ("pnpm", "npm", "yarn"):
-        for p in globmod.glob(str(project_path / "**" / "package.json"), recursive=True):
-            if "node_modules" in p:
-                continue
+        for p in _iter_manifests(project_path, "package.json"):
             try:
-                with open(p) as f:
-                    data = json.load(f)
-                all_deps = {}
-                all_deps.update(data.get("dependencies", {}))
-                all_deps.update(data.get("devDependencies", {}))
-                if pkg_name in all_deps:
-                    return True
+                with open(p, "rb") as f:
+                    data = json_loads(f.read())
+                direct.update(data.get("dependencies", {}))
+                direct.update(data.get("devDependencies", {}))
             except (json.JSONDecodeError, OSError):
                 pass
     elif pm == "cargo":
-        for p in globmod.glob(str(project_path / "**" / "Cargo.toml"), recursive=True):
+        for p in _iter_manifests(project_path, "Cargo.toml"):
             try:
                 content = Path(p).read_text()
                 in_deps = False
                 for line in content.splitlines():
                     stripped = line.strip()
-                    if re.match(r'\[(dev-)?dependencies\]', stripped):
+                    if _CARGO_DEPS_SECTION_RE.match(stripped):
                         in_deps = True
                         continue
                     if stripped.startswith("["):
-                        if f".{pkg_name}]" in stripped:
-                            return True
+                        # [dependencies.foo] style tables
+                        direct.update(_TOML_DOTTED_TABLE_NAME_RE.findall(stripped))
                         in_deps = False
                         continue
-                    if in_deps and re.match(rf'^{re.escape(pkg_name)}\s*=', stripped):
-                        return True
+                    if in_deps:
+                        m = _MANIFEST_KEY_RE.match(stripped)
+                        if m:
+                            direct.add(m.group(1))
             except OSError:
                 pass
     elif pm in ("poetry", "uv"):
@@ -69,11 +95,10 @@ def _find_direct_dep_in_manifest(project_path: Path, pm: str, pkg_name: str) ->
             try:
                 content = pyproject.read_text()
                 for line in content.splitlines():
-                    stripped = line.strip()
-                    if re.match(rf'^{re.escape(pkg_name)}\s*=', stripped, re.IGNORECASE):
-                        return True
-                if re.search(rf'["\']({re.escape(pkg_name)})[>=<~!\s\'"]', content, re.IGNORECASE):
-                    return True
+                    m = _MANIFEST_KEY_RE.match(line.strip())
+                    if m:
+                        direct.add(m.group(1).lower())
+                direct.update(name.lower() for name in _QUOTED_REQUIREMENT_RE.findall(content))
             except OSError:
                 pass
     elif pm == "pipenv":
@@ -81,8 +106,9 @@ def _find_direct_dep_in_manifest(project_path: Path, pm: str, pkg_name: str) ->
         if pipfile.exists():
             try:
                 for line in pipfile.read_text().splitlines():
-                    if re.match(rf'^{re.escape(pkg_name)}\s*=', line.strip(), re.IGNORECASE):
-                        return True
+                    m = _MANIFEST_KEY_RE.match(line.strip())
+                    if m:
+                        direct.add(m.group(1).lower())
             except OSError:
                 pass
     elif pm == "pip":
@@ -91,11 +117,52 @@ def _find_direct_dep_in_manifest(project_path: Path, pm: str, pkg_name: str) ->
             try:
                 for line in req.read_text().splitlines():
                     stripped = line.strip()
-                    if stripped and stripped.split("==")[0].split(">=")[0].split("[")[0].strip().lower() == pkg_name.lower():
-                        return True
+                    if stripped:
+                        direct.add(stripped.split("==")[0].split(">=")[0].split("[")[0].strip().lower())
             except OSError:
                 pass
-    return False
+    return direct
+
+
+def _is_direct_dep(direct_deps: set[str], pm: str, pkg_name: str) -> bool:
+    """Check pkg_name against the set built by _collect_direct_deps."""
+    if pm in ("poetry", "uv", "pipenv", "pip"):
+        return pkg_name.lower() in direct_deps
+    return pkg_name in direct_deps
+
+
+def _pnpm_lock_reverse_index(lockfile: Path) -> dict[str, list[str]]:
+    """Index pnpm-lock.yaml as {dependency: [packages depending on it]}, in file order.
+
+    The lockfile is scanned once per path and cached for later violations.
+    """
+    cached = _pnpm_lock_index_cache.get(lockfile)
+    if cached is not None:
+        return cached
+
+    # In pnpm-lock.yaml, dependency entries look like:
+    #   /pkg@version: or 'pkg@version': (root-level, indented by 2+)
+    #     dependencies:
+    #       target-pkg: version
+    index: dict[str, list[str]] = {}
+    current_pkg = None
+    for line in lockfile.read_text().splitlines():
+        # Detect package header lines (vary by lockfile version)
+        # v6+: '/pkg@version':  or  pkg@version:
+        # v9:  'pkg@version':
+        stripped = line.strip()
+        if not line.startswith("    ") and ("@" in stripped or stripped.endswith(":")):
+            header_match = _PNPM_LOCK_HEADER_RE.match(stripped.lstrip("/"))
+            if header_match:
+                current_pkg = header_match.group(1)
+        # Record this line as a dependency of the current package
+        if current_pkg:
+            dep_match = _PNPM_LOCK_DEP_LINE_RE.match(line)
+            if dep_match:
+                index.setdefault(dep_match.group(1), []).append(current_pkg)
+
+    _pnpm_lock_index_cache[lockfile] = index
+    return index
 
 
 def _trace_dep_chain_via_pm(
@@ -122,13 +189,10 @@ def _trace_dep_chain_via_pm(
             if ok and output:
                 chain_names = []
                 for line in output.splitlines():
-                    cleaned = re.sub(r'^[\s\u2502\u251c\u2514\u2500\u252c\u2524]+', '', line).strip()
+                    cleaned = _TREE_PREFIX_RE.sub('', line).strip()
                     if not cleaned or cleaned.startswith("Legend:") or cleaned.endswith(":"):
                         continue
-                    m = re.match(
-                        r'^(@[a-zA-Z0-9_.-]+/[a-zA-Z0-9_.-]+|[a-zA-Z][a-zA-Z0-9_.-]*)[\s@](\d[\d.]*)',
-                        cleaned,
-                    )
+                    m = _PNPM_WHY_ENTRY_RE.match(cleaned)
                     if m:
                         chain_names.append(m.group(1))
                 # chain_names[0] is the project/workspace name, skip it
@@ -146,23 +210,19 @@ def _trace_dep_chain_via_pm(
                 print(f"    npm ls failed: {output[:200]}", file=sys.stderr)
             if ok and output:
                 try:
-                    data = json.loads(output)
-
-                    def _find_path(node: dict, target: str, path: list[str] | None = None) -> list[str] | None:
-                        if path is None:
-                            path = []
-                        for name, info in node.get("dependencies", {}).items():
-                            current = path + [name]
-                            if name == target:
-                                return current
-                            found = _find_path(info, target, current)
-                            if found:
-                                return found
-                        return None
-
-                    chain = _find_path(data, pkg_name)
-                    if chain and len(chain) >= 1:
-                        return chain[0], chain
+                    data = json_loads(output)
+
+                    # Iterative pre-order DFS; deep npm trees can exceed the recursion limit
+                    stack = [
+                        (name, info, [name])
+                        for name, info in reversed(list(data.get("dependencies", {}).items()))
+                    ]
+                    while stack:
+                        name, info, chain = stack.pop()
+                        if name == pkg_name:
+                            return chain[0], chain
+                        for child, child_info in reversed(list(info.get("dependencies", {}).items())):
+                            stack.append((child, child_info, chain + [child]))
                 except json.JSONDecodeError:
                     pass
 
@@ -174,7 +234,7 @@ def _trace_dep_chain_via_pm(
                 print(f"    yarn why failed: {output[:200]}", file=sys.stderr)
             if ok and output:
                 for line in output.splitlines():
-                    match = re.search(r'"([^"]+)"\s+depends on it', line)
+                    match = _YARN_WHY_PARENT_RE.search(line)
                     if match:
                         parent = match.group(1)
                         return parent, [parent, pkg_name]
@@ -186,43 +246,20 @@ def _trace_dep_chain_via_pm(
         lockfile = project_path / "pnpm-lock.yaml"
         if pm == "pnpm" and lockfile.exists():
             try:
-                content = lockfile.read_text()
-                # In pnpm-lock.yaml, dependency entries look like:
-                #   /pkg@version: or 'pkg@version': (root-level, indented by 2+)
-                #     dependencies:
-                #       target-pkg: version
-                # We search for lines referencing our target as a dependency value
-                lines = content.splitlines()
-                current_pkg = None
-                for line in lines:
-                    # Detect package header lines (vary by lockfile version)
-                    # v6+: '/pkg@version':  or  pkg@version:
-                    # v9:  'pkg@version':
-                    stripped = line.strip()
-                    if not line.startswith("    ") and ("@" in stripped or stripped.endswith(":")):
-                        header_match = re.match(
-                            r"""[/'"]?(@[a-zA-Z0-9._-]+/[a-zA-Z0-9._-]+|[a-zA-Z][a-zA-Z0-9._-]*)@""",
-                            stripped.lstrip("/"),
-                        )
-                        if header_match:
-                            current_pkg = header_match.group(1)
-                    # Check if this line declares the target as a dependency
-                    if current_pkg and current_pkg != pkg_name:
-                        dep_match = re.match(
-                            rf'^\s+{re.escape(pkg_name)}:\s', line
-                        )
-                        if dep_match:
-                            if verbose:
-                                print(f"    Found in lockfile: {current_pkg} -> {pkg_name}", file=sys.stderr)
-                            return current_pkg, [current_pkg, pkg_name]
+                parents = _pnpm_lock_reverse_index(lockfile).get(pkg_name, [])
+                parent = next((p for p in parents if p != pkg_name), None)
+                if parent:
+                    if verbose:
+                        print(f"    Found in lockfile: {parent} -> {pkg_name}", file=sys.stderr)
+                    return parent, [parent, pkg_name]
             except OSError:
                 pass
         # npm/yarn fallback: check nested node_modules
         elif root_pkg_path := (project_path / "package.json"):
             if root_pkg_path.exists():
                 try:
-                    with open(root_pkg_path) as f:
-                        pkg_data = json.load(f)
+                    with open(root_pkg_path, "rb") as f:
+                        pkg_data = json_loads(f.read())
                     all_direct = {}
                     all_direct.update(pkg_data.get("dependencies", {}))
                     all_direct.update(pkg_data.get("devDependencies", {}))
@@ -244,7 +281,7 @@ def _trace_dep_chain_via_pm(
             lines = output.strip().splitlines()
             chain = []
             for line in lines:
-                name_match = re.match(r'^[\u2502\u251c\u2514\u2500 ]*([a-zA-Z][a-zA-Z0-9_-]*)', line)
+                name_match = _CARGO_TREE_NAME_RE.match(line)
                 if name_match:
                     chain.append(name_match.group(1))
             if len(chain) > 1:
@@ -257,6 +294,90 @@ def _trace_dep_chain_via_pm(
     return pkg_name, [pkg_name]
 
 
+_JS_DEP_KEYS = ("dependencies", "devDependencies", "optionalDependencies")
+
+
+def _index_js_dep_tree(roots: list[dict]) -> dict[str, list[str]]:
+    """Map each package name to its first chain (direct dep first) in pre-order.
+
+    Matches the per-package DFS over `npm ls <pkg>`. A name@version subtree is
+    expanded only once, since every name under it is already indexed.
+    """
+    chains: dict[str, list[str]] = {}
+    expanded: set[tuple[str, str]] = set()
+    stack: list[tuple[str, dict, list[str]]] = []
+    for root in reversed(roots):
+        for key in reversed(_JS_DEP_KEYS):
+            for name, info in reversed(list((root.get(key) or {}).items())):
+                stack.append((name, info or {}, [name]))
+    while stack:
+        name, info, chain = stack.pop()
+        chains.setdefault(name, chain)
+        node_key = (name, info.get("version", ""))
+        if node_key in expanded:
+            continue
+        expanded.add(node_key)
+        for key in reversed(_JS_DEP_KEYS):
+            for child, child_info in reversed(list((info.get(key) or {}).items())):
+                stack.append((child, child_info or {}, chain + [child]))
+    return chains
+
+
+def _index_cargo_metadata(data: dict) -> dict[str, list[str]]:
+    """Map each crate name to its shortest chain from a workspace member's direct dep."""
+    names = {pkg["id"]: pkg["name"] for pkg in data.get("packages", [])}
+    members = data.get("workspace_members", [])
+    member_set = set(members)
+    deps_by_id = {
+        node["id"]: [d["pkg"] for d in node.get("deps", [])]
+        for node in (data.get("resolve") or {}).get("nodes", [])
+    }
+
+    chains: dict[str, list[str]] = {}
+    seen = set(members)
+    queue: list[tuple[str, list[str]]] = [(m, []) for m in members]
+    for pkg_id, chain in queue:
+        for dep_id in deps_by_id.get(pkg_id, []):
+            if dep_id in seen or dep_id in member_set:
+                continue
+            seen.add(dep_id)
+            dep_chain = chain + [names.get(dep_id, dep_id)]
+            chains.setdefault(dep_chain[-1], dep_chain)
+            queue.append((dep_id, dep_chain))
+    return chains
+
+
+def _build_dep_chain_index(project_path: Path, pm: str, verbose: bool) -> dict[str, list[str]]:
+    """Resolve the whole dependency graph with one PM query.
+
+    Returns {package_name: [direct_dep, ..., package_name]}. Empty when the PM
+    is unsupported or the query fails; callers fall back to per-package tracing.
+    """
+    if pm == "npm":
+        cmd = ["npm", "ls", "--all", "--json"]
+    elif pm == "pnpm":
+        cmd = ["pnpm", "ls", "-r", "--depth", "Infinity", "--json"]
+    elif pm == "cargo":
+        cmd = ["cargo", "metadata", "--format-version", "1"]
+    else:
+        return {}
+
+    ok, output = run_command(cmd, cwd=str(project_path), timeout=120)
+    if not ok or not output:
+        if verbose:
+            print(f"  {' '.join(cmd[:2])} failed, tracing per package: {output[:200]}", file=sys.stderr)
+        return {}
+
+    try:
+        data = json_loads(output)
+    except json.JSONDecodeError:
+        return {}
+
+    if pm == "cargo":
+        return _index_cargo_metadata(data)
+    return _index_js_dep_tree(data if isinstance(data, list) else [data])
+
+
 def _git_pickaxe(project_path: Path, dep_name: str, pathspecs: list[str]) -> Optional[dict]:
     """Use git log -S (pickaxe) to find the commit that introduced a dependency."""
     cmd = [
@@ -281,6 +402,128 @@ def _git_pickaxe(project_path: Path, dep_name: str, pathspecs: list[str]) -> Opt
     return None
 
 
+def _ere_escape(text: str) -> str:
+    """Escape text for a POSIX extended regex (git -G); re.escape output is not portable."""
+    return "".join(f"\\{c}" if c in _ERE_SPECIAL_CHARS else c for c in text)
+
+
+def _git_pickaxe_many(
+    project_path: Path, dep_names: list[str], pathspecs: list[str]
+) -> Optional[dict[str, dict]]:
+    """Find the introducing commit for many dependencies in one history walk.
+
+    Same semantics as calling _git_pickaxe per name: a name hits a commit when
+    its occurrence count changes in some file, and the oldest hit wins.
+    Returns None if the git walk fails so callers can fall back to _git_pickaxe.
+    """
+    pending = set(dep_names)
+    if not pending:
+        return {}
+
+    cmd = [
+        "git", "log", "--reverse", "-p", "--unified=0", "--no-color", "--no-ext-diff",
+        "-G", "|".join(_ere_escape(n) for n in sorted(pending)),
+        "--format=%x00%H|%an|%ai|%s", "--",
+    ] + pathspecs
+    try:
+        ok, output = run_command(cmd, cwd=str(project_path), timeout=60)
+    except (UnicodeDecodeError, OSError):
+        return None
+    if not ok:
+        return None
+
+    found: dict[str, dict] = {}
+    commit: Optional[dict] = None
+    deltas: dict[str, int] = {}
+    in_hunk = False
+
+    def _flush_file() -> None:
+        for name, delta in deltas.items():
+            if delta and commit and name in pending:
+                found[name] = commit
+                pending.discard(name)
+        deltas.clear()
+
+    for line in output.splitlines():
+        if line.startswith("\x00"):
+            _flush_file()
+            parts = line[1:].split("|", 3)
+            commit = {
+                "commit": parts[0][:7],
+                "author": parts[1],
+                "date": parts[2].split()[0],
+                "message": parts[3],
+            } if len(parts) >= 4 else None
+            in_hunk = False
+        elif line.startswith("diff --git"):
+            _flush_file()
+            in_hunk = False
+        elif line.startswith("@@"):
+            in_hunk = True
+        elif in_hunk and pending and line[:1] in ("+", "-"):
+            sign = 1 if line[0] == "+" else -1
+            for name in pending:
+                count = line.count(name, 1)
+                if count:
+                    deltas[name] = deltas.get(name, 0) + sign * count
+    _flush_file()
+    return found
+
+
+def _pickaxe_all(project_path: Path, dep_names: list[str], pathspecs: list[str]) -> dict[str, dict]:
+    """Blame many deps in one history walk, falling back to one git log -S per name."""
+    blame_map = _git_pickaxe_many(project_path, dep_names, pathspecs)
+    if blame_map is not None:
+        return blame_map
+    # Each git log -S is an independent subprocess; run distinct names concurrently
+    unique_names = sorted(set(dep_names))
+    with ThreadPoolExecutor(max_workers=min(len(unique_names), os.cpu_count() or 1) or 1) as executor:
+        blames = executor.map(lambda name: _git_pickaxe(project_path, name, pathspecs), unique_names)
+        return {name: blame for name, blame in zip(unique_names, blames) if blame}
+
+
+def _blame_with_deepening(
+    project_path: Path, dep_names: list[str], pathspecs: list[str], verbose: bool
+) -> dict[str, dict]:
+    """Blame deps, deepening a shallow clone only as far as needed.
+
+    In a shallow clone the boundary commit shows every file as added, so a dep
+    blamed on a boundary commit may be older. Those deps are re-blamed after
+    each deepening step instead of unshallowing the full history up front.
+    """
+    blame_map = _pickaxe_all(project_path, dep_names, pathspecs)
+    shallow_file = project_path / ".git" / "shallow"
+
+    for depth in _DEEPEN_STEPS:
+        try:
+            boundary = shallow_file.read_text().split()
+        except OSError:
+            break  # not (or no longer) shallow
+        suspect = [
+            name for name, blame in blame_map.items()
+            if any(sha.startswith(blame["commit"]) for sha in boundary)
+        ]
+        if not suspect:
+            break
+
+        if depth is None:
+            if verbose:
+                print("  Unshallowing clone for git blame...", file=sys.stderr)
+            cmd = ["git", "fetch", "--unshallow"]
+        else:
+            if verbose:
+                print(f"  Deepening clone by {depth} commits for git blame...", file=sys.stderr)
+            cmd = ["git", "fetch", f"--deepen={depth}"]
+        ok, msg = run_command(cmd, cwd=str(project_path), timeout=120)
+        if not ok:
+            if verbose:
+                print(f"  Warning: failed to deepen clone: {msg}", file=sys.stderr)
+            break
+        blame_map.update(_pickaxe_all(project_path, suspect, pathspecs))
+
+    return blame_map
+
+
 def trace_blame_for_violations(
     project_path: Path, pm: str, violations: list[dict], verbose: bool
 ) -> list[dict]:
@@ -288,23 +531,18 @@ def trace_blame_for_violations(
     if not violations:
         return violations
 
-    # Unshallow if needed for full history
-    shallow_file = project_path / ".git" / "shallow"
-    if shallow_file.exists():
-        if verbose:
-            print("  Unshallowing clone for git blame...", file=sys.stderr)
-        ok, msg = run_command(
-            ["git", "fetch", "--unshallow"], cwd=str(project_path), timeout=120
-        )
-        if not ok and verbose:
-            print(f"  Warning: failed to unshallow: {msg}", file=sys.stderr)
-
     pathspecs = _get_manifest_pathspecs(pm)
     if not pathspecs:
         for v in violations:
             v["introduced_by"] = None
         return violations
 
+    # Parse manifests once; each violation is then an O(1) membership check
+    direct_deps = _collect_direct_deps(project_path, pm)
+    # Built on first transitive violation, then shared by the rest
+    chain_index: Optional[dict[str, list[str]]] = None
+
+    traced: list[tuple[dict, str, list[str]]] = []
     for violation in violations:
         pkg_name = violation["name"]
         if verbose:
@@ -312,28 +550,43 @@ def trace_blame_for_violations(
 
         try:
             # Check if the flagged package is itself a direct dependency
-            is_direct = _find_direct_dep_in_manifest(project_path, pm, pkg_name)
+            is_direct = _is_direct_dep(direct_deps, pm, pkg_name)
             if is_direct:
                 direct_dep = pkg_name
                 chain = [pkg_name]
                 if verbose:
                     print(f"    {pkg_name} is a direct dependency", file=sys.stderr)
             else:
-                # Trace the dependency chain via PM-specific command
-                direct_dep, chain = _trace_dep_chain_via_pm(
-                    project_path, pm, pkg_name, verbose
-                )
+                if chain_index is None:
+                    chain_index = _build_dep_chain_index(project_path, pm, verbose)
+                chain = chain_index.get(pkg_name)
+                if chain:
+                    direct_dep = chain[0]
+                else:
+                    # Trace the dependency chain via PM-specific command
+                    direct_dep, chain = _trace_dep_chain_via_pm(
+                        project_path, pm, pkg_name, verbose
+                    )
                 if verbose:
                     print(f"    Chain: {' -> '.join(chain)}", file=sys.stderr)
                     print(f"    Direct dep to blame: {direct_dep}", file=sys.stderr)
+            traced.append((violation, direct_dep, chain))
+        except Exception:
+            violation["introduced_by"] = None
 
-            # Git pickaxe: find the commit that introduced the direct dep
-            blame = _git_pickaxe(project_path, direct_dep, pathspecs)
+    # Git pickaxe: find the commits that introduced the direct deps
+    blame_map = _blame_with_deepening(
+        project_path, [d for _, d, _ in traced], pathspecs, verbose
+    )
+
+    for violation, direct_dep, chain in traced:
+        try:
+            blame = blame_map.get(direct_dep)
             if verbose:
                 if blame:
-                    print(f"    Blame: {blame['author']} on {blame['date']} ({blame['commit']})", file=sys.stderr)
+                    print(f"    Blame for {direct_dep}: {blame['author']} on {blame['date']} ({blame['commit']})", file=sys.stderr)
                 else:
-                    print(f"    Blame: not found via git log -S", file=sys.stderr)
+                    print(f"    Blame for {direct_dep}: not found via git log", file=sys.stderr)
 
             if blame:
                 violation["introduced_by"] = {
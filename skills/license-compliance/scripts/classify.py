@@ -2,11 +2,27 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+
 from config import evaluate_spdx_expr, find_override
 from ecosystems import lookup_npm_license, lookup_pypi_license, lookup_crates_io_license
 
 import sys
 
+MAX_REGISTRY_WORKERS = 16
+
+
+def _resolve_one(name: str, version: str, ecosystem: str) -> tuple[str | None, str]:
+    """Look up a single unknown package in its registry.
+
+    Returns (registry_license, source_tag); registry_license is None on a miss.
+    """
+    if ecosystem == "cargo":
+        return lookup_crates_io_license(name, version), "crates.io"
+    if ecosystem == "pypi":
+        return lookup_pypi_license(name, version), "pypi"
+    return lookup_npm_license(name, version), "npm"
+
 
 def classify_packages(packages: list[dict], config: dict, resolve_unknowns: bool = True, ecosystem: str = "npm") -> dict:
     """Classify all packages and return structured results."""
@@ -22,7 +38,8 @@ def classify_packages(packages: list[dict], config: dict, resolve_unknowns: bool
     }
 
     # First pass: classify everything
-    unknown_pkgs = []
+    unknown_entries = []
+    unknown_keys = []
     for pkg in packages:
         raw_license = pkg.get("license", "UNKNOWN")
         name = pkg["name"]
@@ -73,28 +90,25 @@ def classify_packages(packages: list[dict], config: dict, resolve_unknowns: bool
         }
 
         if tier == "unknown":
-            unknown_pkgs.append((entry, pkg))
+            unknown_entries.append(entry)
+            unknown_keys.append((name, entry["version"]))
         else:
             results[tier].append(entry)
 
     # Second pass: resolve unknowns via package registry
     # Skip for github (Swift/Dart/Go/Solidity), maven (Gradle), nuget (C#) — already looked up during extraction
-    if resolve_unknowns and unknown_pkgs and ecosystem not in ("github", "maven", "nuget"):
-        count = len(unknown_pkgs)
+    if resolve_unknowns and unknown_entries and ecosystem not in ("github", "maven", "nuget"):
+        count = len(unknown_entries)
         registry_name = {"npm": "npm", "cargo": "crates.io", "pypi": "PyPI"}.get(ecosystem, ecosystem)
         print(f"  Resolving {count} unknown licenses via {registry_name}...", file=sys.stderr)
         resolved = 0
-        for entry, pkg in unknown_pkgs:
-            if ecosystem == "cargo":
-                reg_license = lookup_crates_io_license(entry["name"], entry["version"])
-                source_tag = "crates.io"
-            elif ecosystem == "pypi":
-                reg_license = lookup_pypi_license(entry["name"], entry["version"])
-                source_tag = "pypi"
-            else:
-                reg_license = lookup_npm_license(entry["name"], entry["version"])
-                source_tag = "npm"
-
+        # Lookups are network-bound; fan each distinct (name, version) out once
+        # and apply results here in input order
+        unique_keys = list(dict.fromkeys(unknown_keys))
+        with ThreadPoolExecutor(max_workers=min(MAX_REGISTRY_WORKERS, len(unique_keys))) as pool:
+            key_lookups = dict(zip(unique_keys, pool.map(lambda key: _resolve_one(*key, ecosystem), unique_keys)))
+        lookups = [key_lookups[key] for key in unknown_keys]
+        for entry, (reg_license, source_tag) in zip(unknown_entries, lookups):
             if reg_license:
                 normalized, tier = evaluate_spdx_expr(reg_license, config)
                 entry["license"] = normalized
@@ -112,7 +126,6 @@ def classify_packages(packages: list[dict], config: dict, resolve_unknowns: bool
             print(f"  Resolved {resolved}/{count} via {registry_name}", file=sys.stderr)
 
     else:
-        for entry, _ in unknown_pkgs:
-            results["unknown"].append(entry)
+        results["unknown"].extend(unknown_entries)
 
     return results
@@ -3,18 +3,69 @@
 from __future__ import annotations
 
 import fnmatch
+import functools
 import json
+import re
 from pathlib import Path
 from typing import Optional
 
 SCRIPT_DIR = Path(__file__).parent.resolve()
 DEFAULT_CONFIG = SCRIPT_DIR.parent / "config" / "default-config.json"
+_GLOB_CHARS = frozenset("*?[")
 
 
 def load_config(config_path: Path) -> dict:
     """Load license classification config."""
     with open(config_path) as f:
-        return json.load(f)
+        config = json.load(f)
+    _compile_overrides(config)
+    _index_license_tiers(config)
+    return config
+
+
+def _index_license_tiers(config: dict) -> dict:
+    """Flip license_tiers into a license -> tier map cached on the config.
+
+    The first tier listing a license wins, matching the old list scan.
+    """
+    license_to_tier = {}
+    for tier, licenses in config.get("license_tiers", {}).items():
+        for lic in licenses:
+            license_to_tier.setdefault(lic, tier)
+    config["_license_to_tier"] = license_to_tier
+    return license_to_tier
+
+
+def _compile_overrides(config: dict) -> tuple:
+    """Index license_overrides for find_override and cache it on the config.
+
+    Every key goes into an exact-name map. Pure prefix globs ("@scope/*")
+    go into a prefix map probed once per distinct prefix length, so their
+    cost does not grow with the number of scopes. Any other glob is folded
+    into a single alternation regex. All three record the entry's position
+    so the first matching override in config order still wins.
+    """
+    overrides = list(config.get("license_overrides", {}).items())
+    exact = {}
+    prefixes = {}
+    glob_indices = []
+    for idx, (pattern, _) in enumerate(overrides):
+        exact.setdefault(pattern, idx)
+        if not _GLOB_CHARS & set(pattern):
+            continue
+        if pattern.endswith("*") and not _GLOB_CHARS & set(pattern[:-1]):
+            prefixes.setdefault(pattern[:-1], idx)
+        else:
+            glob_indices.append(idx)
+    glob_re = None
+    if glob_indices:
+        glob_re = re.compile("|".join(
+            f"(?P<g{idx}>{fnmatch.translate(overrides[idx][0])})" for idx in glob_indices
+        ))
+    prefix_lengths = sorted({len(prefix) for prefix in prefixes})
+    index = (exact, prefixes, prefix_lengths, glob_re, [override for _, override in overrides])
+    config["_override_index"] = index
+    return index
 
 
 def normalize_license(raw: str, config: dict) -> str:
@@ -28,92 +79,215 @@ def normalize_license(raw: str, config: dict) -> str:
 
 def classify_license(license_str: str, config: dict) -> str:
     """Classify a normalized license string into a tier."""
-    tiers = config.get("license_tiers", {})
-    for tier, licenses in tiers.items():
-        if license_str in licenses:
-            return tier
-    return "unknown"
+    license_to_tier = config.get("_license_to_tier")
+    if license_to_tier is None:
+        license_to_tier = _index_license_tiers(config)
+    return license_to_tier.get(license_str, "unknown")
 
 
 def evaluate_spdx_expr(expr: str, config: dict) -> tuple[str, str]:
     """Evaluate an SPDX expression, return (best_license, tier).
 
-    OR -> most permissive; AND -> most restrictive.
+    Parses the expression (parentheses, AND/OR/WITH) and evaluates it
+    bottom-up: OR -> most permissive; AND -> most restrictive.
     Also handles Rust-style slash separators (MIT/Apache-2.0) as OR.
+    Results are memoized per config, since a handful of expressions
+    (MIT, Apache-2.0, "MIT OR Apache-2.0") cover most packages.
     """
-    tier_rank = {"permissive": 0, "weak_copyleft": 1, "restrictive": 2, "unknown": 3}
-
-    if " OR " in expr:
-        parts = [p.strip().strip("()") for p in expr.split(" OR ")]
-        best_tier = "unknown"
-        best_license = expr
-        for part in parts:
-            norm = normalize_license(part, config)
-            tier = classify_license(norm, config)
-            if tier_rank.get(tier, 3) < tier_rank.get(best_tier, 3):
-                best_tier = tier
-                best_license = norm
-        return best_license, best_tier
-
-    if " AND " in expr:
-        parts = [p.strip().strip("()") for p in expr.split(" AND ")]
-        worst_tier = "permissive"
-        worst_license = expr
-        for part in parts:
-            norm = normalize_license(part, config)
+    cache = config.setdefault("_spdx_cache", {})
+    result = cache.get(expr)
+    if result is None:
+        result = cache[expr] = _evaluate_spdx_expr(expr, config)
+    return result
+
+
+_TIER_RANK = {"permissive": 0, "weak_copyleft": 1, "restrictive": 2, "unknown": 3}
+# Operators, parentheses and slash separators (MIT/Apache-2.0); keywords must
+# stand alone so ids like "GPL-2.0-OR-later" stay intact
+_SPDX_TOKEN_RE = re.compile(r"\(|\)|/+|(?<![^\s()])(?:OR|AND|WITH)(?![^\s()])")
+
+
+class _SpdxSyntaxError(ValueError):
+    """Raised when an expression does not parse; callers treat it as one license."""
+
+
+def _tokenize_spdx(expr: str) -> list[tuple[str, str, int, int]]:
+    """Split an expression into (kind, text, start, end) tokens.
+
+    Kinds are LPAREN, RPAREN, OP (AND/OR/WITH, "/" becomes OR) and LIC.
+    """
+    tokens = []
+    pos = 0
+    for m in _SPDX_TOKEN_RE.finditer(expr):
+        _append_lic_token(tokens, expr, pos, m.start())
+        text = m.group()
+        if text == "(":
+            tokens.append(("LPAREN", text, m.start(), m.end()))
+        elif text == ")":
+            tokens.append(("RPAREN", text, m.start(), m.end()))
+        else:
+            tokens.append(("OP", "OR" if text.startswith("/") else text, m.start(), m.end()))
+        pos = m.end()
+    _append_lic_token(tokens, expr, pos, len(expr))
+    return tokens
+
+
+def _append_lic_token(tokens: list, expr: str, start: int, end: int) -> None:
+    """Append the license text in expr[start:end], if any, as a LIC token."""
+    text = expr[start:end]
+    stripped = text.strip()
+    if stripped:
+        lead = len(text) - len(text.lstrip())
+        tokens.append(("LIC", stripped, start + lead, start + lead + len(stripped)))
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_spdx(expr: str) -> tuple:
+    """Parse an SPDX expression into a small AST.
+
+    Nodes are ("lic", text, exception), ("or", children, text) and
+    ("and", children, text). Precedence follows SPDX: WITH > AND > OR.
+    """
+    tokens = _tokenize_spdx(expr)
+    pos = 0
+
+    def peek(kind: str, value: Optional[str] = None) -> bool:
+        return pos < len(tokens) and tokens[pos][0] == kind and (value is None or tokens[pos][1] == value)
+
+    def peek_lic(idx: int) -> bool:
+        return idx < len(tokens) and tokens[idx][0] == "LIC"
+
+    def parse_binary(op: str, parse_operand) -> tuple[tuple, int, int]:
+        nonlocal pos
+        node, start, end = parse_operand()
+        children = [node]
+        while peek("OP", op):
+            pos += 1
+            node, _, end = parse_operand()
+            children.append(node)
+        if len(children) == 1:
+            return children[0], start, end
+        return (op.lower(), children, expr[start:end]), start, end
+
+    def parse_or() -> tuple[tuple, int, int]:
+        return parse_binary("OR", parse_and)
+
+    def parse_and() -> tuple[tuple, int, int]:
+        return parse_binary("AND", parse_with)
+
+    def parse_with() -> tuple[tuple, int, int]:
+        nonlocal pos
+        node, start, end = parse_atom()
+        if peek("OP", "WITH"):
+            if node[0] != "lic" or not peek_lic(pos + 1):
+                raise _SpdxSyntaxError(expr)
+            exception = tokens[pos + 1]
+            pos += 2
+            node, end = ("lic", node[1], exception[1]), exception[3]
+        return node, start, end
+
+    def parse_atom() -> tuple[tuple, int, int]:
+        nonlocal pos
+        if peek("LIC"):
+            _, _, start, end = tokens[pos]
+            pos += 1
+            # A bare parenthesized suffix is part of the name, e.g.
+            # "GNU General Public License v2 (GPLv2)"
+            while peek("LPAREN") and peek_lic(pos + 1) and pos + 2 < len(tokens) and tokens[pos + 2][0] == "RPAREN":
+                end = tokens[pos + 2][3]
+                pos += 3
+            return ("lic", expr[start:end], None), start, end
+        if peek("LPAREN"):
+            start = tokens[pos][2]
+            pos += 1
+            node, _, _ = parse_or()
+            if not peek("RPAREN"):
+                raise _SpdxSyntaxError(expr)
+            end = tokens[pos][3]
+            pos += 1
+            return node, start, end
+        raise _SpdxSyntaxError(expr)
+
+    node, _, _ = parse_or()
+    if pos != len(tokens):
+        raise _SpdxSyntaxError(expr)
+    return node
+
+
+def _eval_spdx_node(node: tuple, config: dict) -> tuple[str, str]:
+    """Evaluate an AST node bottom-up: OR -> most permissive, AND -> most restrictive."""
+    kind = node[0]
+    if kind == "lic":
+        _, text, exception = node
+        norm = normalize_license(text, config)
+        if exception is None:
+            return norm, classify_license(norm, config)
+        # Exceptions only grant extra permissions, so fall back to the base tier
+        with_expr = f"{norm} WITH {exception}"
+        tier = classify_license(with_expr, config)
+        if tier == "unknown":
             tier = classify_license(norm, config)
-            if tier_rank.get(tier, 3) > tier_rank.get(worst_tier, 3):
-                worst_tier = tier
-                worst_license = norm
-        return worst_license, worst_tier
-
-    # Handle Rust-style slash-delimited dual licenses (e.g. "MIT/Apache-2.0",
-    # "Apache-2.0/MIT", "Unlicense/MIT"). Treat "/" as OR.
-    # Only split if "/" is not part of a known license identifier (e.g. "LGPL-2.1-or-later").
-    if "/" in expr and " " not in expr:
-        parts = [p.strip() for p in expr.split("/")]
-        # Verify at least one part is a known license before treating as dual
-        any_known = any(
-            classify_license(normalize_license(p, config), config) != "unknown"
-            for p in parts
-        )
-        if any_known:
-            best_tier = "unknown"
-            best_license = expr
-            for part in parts:
-                norm = normalize_license(part, config)
-                tier = classify_license(norm, config)
-                if tier_rank.get(tier, 3) < tier_rank.get(best_tier, 3):
-                    best_tier = tier
-                    best_license = norm
-            return best_license, best_tier
-
-    # Also handle "Apache-2.0 / MIT" (spaces around slash)
-    if " / " in expr:
-        parts = [p.strip() for p in expr.split(" / ")]
-        any_known = any(
-            classify_license(normalize_license(p, config), config) != "unknown"
-            for p in parts
-        )
-        if any_known:
-            best_tier = "unknown"
-            best_license = expr
-            for part in parts:
-                norm = normalize_license(part, config)
-                tier = classify_license(norm, config)
-                if tier_rank.get(tier, 3) < tier_rank.get(best_tier, 3):
-                    best_tier = tier
-                    best_license = norm
-            return best_license, best_tier
+        return with_expr, tier
+
+    _, children, text = node
+    # Track the chosen rank as an int and stop once it cannot improve:
+    # OR at permissive (0), AND at unknown (3)
+    if kind == "or":
+        best, best_rank = (text, "unknown"), 3
+        for child in children:
+            result = _eval_spdx_node(child, config)
+            rank = _TIER_RANK.get(result[1], 3)
+            if rank < best_rank:
+                best, best_rank = result, rank
+                if rank == 0:
+                    break
+        return best
+
+    worst, worst_rank = (text, "permissive"), 0
+    for child in children:
+        result = _eval_spdx_node(child, config)
+        rank = _TIER_RANK.get(result[1], 3)
+        if rank > worst_rank:
+            worst, worst_rank = result, rank
+            if rank == 3:
+                break
+    return worst
+
 
+def _evaluate_spdx_expr(expr: str, config: dict) -> tuple[str, str]:
+    """Uncached body of evaluate_spdx_expr."""
     norm = normalize_license(expr, config)
-    return norm, classify_license(norm, config)
+    tier = classify_license(norm, config)
+    # Known ids and alias keys (some contain parentheses) are taken whole, as
+    # is any bare token: operators need spaces, and slashes/parens are absent
+    if tier != "unknown" or norm != expr.strip():
+        return norm, tier
+    if " " not in expr and "/" not in expr and "(" not in expr:
+        return norm, tier
+    try:
+        node = _parse_spdx(expr)
+    except _SpdxSyntaxError:
+        return norm, tier
+    if node[0] != "lic":
+        # Report unresolved compound expressions verbatim
+        node = (node[0], node[1], expr)
+    return _eval_spdx_node(node, config)
 
 
 def find_override(pkg_name: str, config: dict) -> Optional[dict]:
     """Check if a package matches a license_overrides entry (supports glob patterns)."""
-    overrides = config.get("license_overrides", {})
-    for pattern, override in overrides.items():
-        if fnmatch.fnmatch(pkg_name, pattern) or pkg_name == pattern:
-            return override
-    return None
+    exact, prefixes, prefix_lengths, glob_re, overrides = config.get("_override_index") or _compile_overrides(config)
+    best = exact.get(pkg_name)
+    for length in prefix_lengths:
+        if length > len(pkg_name):
+            break
+        idx = prefixes.get(pkg_name[:length])
+        if idx is not None and (best is None or idx < best):
+            best = idx
+    if glob_re is not None:
+        m = glob_re.fullmatch(pkg_name)
+        if m:
+            idx = int(m.lastgroup[1:])
+            if best is None or idx < best:
+                best = idx
+    return overrides[best] if best is not None else None
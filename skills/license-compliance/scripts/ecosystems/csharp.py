@@ -2,18 +2,56 @@
 
 from __future__ import annotations
 
-import gzip as gzip_mod
+import functools
 import json
+import mmap
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 from urllib.error import URLError
 from urllib.parse import quote as urlquote, urlparse
-from urllib.request import Request, urlopen
+
+from http_client import http_get
+from registry_cache import cached_fetch
+from manifest_index import ManifestIndex
+from util import json_loads
+
+MAX_LOOKUP_WORKERS = 8
+# Bytes patterns so manifests can be scanned straight from an mmap
+_PKG_REF_RE = re.compile(
+    rb'<PackageReference\s+Include="([^"]+)".*?Version="([^"]+)"',
+    re.IGNORECASE,
+)
+_PKG_VERSION_RE = re.compile(
+    rb'<PackageVersion\s+Include="([^"]+)".*?Version="([^"]+)"',
+    re.IGNORECASE,
+)
+# Common known license URLs (substring -> SPDX id), matched as one alternation
+_LICENSE_URLS = (
+    ("apache.org/licenses/LICENSE-2.0", "Apache-2.0"),
+    ("opensource.org/licenses/MIT", "MIT"),
+    ("opensource.org/licenses/BSD", "BSD-3-Clause"),
+    ("mozilla.org/MPL/2.0", "MPL-2.0"),
+    ("gnu.org/licenses/lgpl", "LGPL-2.1"),
+    ("gnu.org/licenses/gpl", "GPL-3.0"),
+)
+_LICENSE_URL_RE = re.compile("|".join(f"({re.escape(fragment)})" for fragment, _ in _LICENSE_URLS))
+_LICENSE_URL_SPDX = [spdx for _, spdx in _LICENSE_URLS]
+
+
+def _find_csharp_manifests(root: Path, index: Optional[ManifestIndex] = None) -> tuple[list[Path], Optional[Path]]:
+    """Collect .csproj files (one pruned walk, shared via index) and the root Directory.Packages.props.
+
+    Returns (csproj_paths, props_path).
+    """
+    csproj_paths = (index or ManifestIndex(root)).paths("csproj")
+    props_path = root / "Directory.Packages.props"
+    return csproj_paths, props_path if props_path.is_file() else None
 
 
-def _parse_csproj_packages(project_path: Path) -> list[dict]:
+def _parse_csproj_packages(files_to_scan: list[Path]) -> list[dict]:
     """Parse .csproj and Directory.Packages.props for PackageReference entries.
 
     Returns list of {"name": ..., "version": ...}.
@@ -21,59 +59,39 @@ def _parse_csproj_packages(project_path: Path) -> list[dict]:
     packages = []
     seen = set()
 
-    # Collect all .csproj files and Directory.Packages.props
-    files_to_scan = list(project_path.glob("**/*.csproj"))
-    dir_packages = project_path / "Directory.Packages.props"
-    if dir_packages.exists():
-        files_to_scan.append(dir_packages)
-
-    pkg_ref_re = re.compile(
-        r'<PackageReference\s+Include="([^"]+)".*?Version="([^"]+)"',
-        re.IGNORECASE,
-    )
-    pkg_version_re = re.compile(
-        r'<PackageVersion\s+Include="([^"]+)".*?Version="([^"]+)"',
-        re.IGNORECASE,
-    )
-
     for f in files_to_scan:
         try:
-            content = f.read_text()
-        except OSError:
+            with open(f, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for pattern in (_PKG_REF_RE, _PKG_VERSION_RE):
+                    for match in pattern.finditer(mm):
+                        name = match.group(1).decode("utf-8", "replace")
+                        if name not in seen:
+                            seen.add(name)
+                            packages.append({"name": name, "version": match.group(2).decode("utf-8", "replace")})
+        except (OSError, ValueError):
+            # ValueError: empty files cannot be mapped
             continue
-        for match in pkg_ref_re.finditer(content):
-            name, version = match.group(1), match.group(2)
-            if name not in seen:
-                seen.add(name)
-                packages.append({"name": name, "version": version})
-        for match in pkg_version_re.finditer(content):
-            name, version = match.group(1), match.group(2)
-            if name not in seen:
-                seen.add(name)
-                packages.append({"name": name, "version": version})
 
     return packages
 
 
+@functools.lru_cache(maxsize=4096)
 def lookup_nuget_license(package_name: str, version: str) -> Optional[str]:
-    """Look up a NuGet package license via the NuGet API.
+    """Look up a NuGet package license via the NuGet API, consulting the on-disk cache first.
 
     Tries the registration endpoint which returns license info.
     """
-    # NuGet v3 registration endpoint (gzip-compressed responses)
+    # NuGet v3 registration endpoint (gzip-compressed responses, decoded by http_get)
     url = f"https://api.nuget.org/v3/registration5-gz-semver2/{urlquote(package_name.lower(), safe='')}/{urlquote(version, safe='')}.json"
-    headers = {
-        "User-Agent": "license-check-scanner/1.0",
-        "Accept-Encoding": "gzip",
-    }
+    return cached_fetch("nuget", package_name.lower(), version, url, _parse_nuget_registration)
+
+
+def _parse_nuget_registration(body: bytes) -> Optional[str]:
+    """Extract a license from a registration leaf, following its catalogEntry if needed."""
     try:
-        req = Request(url, headers=headers)
-        with urlopen(req, timeout=10) as resp:
-            raw = resp.read()
-            # Decompress gzip if needed
-            if raw[:2] == b'\x1f\x8b':
-                raw = gzip_mod.decompress(raw)
-            data = json.loads(raw)
+        # Version leaves and catalog entries are a few KB and the body is drained
+        # anyway to keep the connection reusable, so they are parsed whole
+        data = json_loads(body)
         catalog = data.get("catalogEntry", {})
         # catalogEntry may be a URL string — if so, fetch it (only from NuGet domains)
         if isinstance(catalog, str):
@@ -82,12 +100,7 @@ def lookup_nuget_license(package_name: str, version: str) -> Optional[str]:
                 catalog = {}
             else:
                 try:
-                    req2 = Request(catalog, headers={"User-Agent": "license-check-scanner/1.0"})
-                    with urlopen(req2, timeout=10) as resp2:
-                        raw2 = resp2.read()
-                        if raw2[:2] == b'\x1f\x8b':
-                            raw2 = gzip_mod.decompress(raw2)
-                        catalog = json.loads(raw2)
+                    catalog = json_loads(http_get(catalog))
                 except (URLError, json.JSONDecodeError, OSError):
                     catalog = {}
         if not isinstance(catalog, dict):
@@ -99,45 +112,41 @@ def lookup_nuget_license(package_name: str, version: str) -> Optional[str]:
         # Try licenseUrl as fallback
         lic_url = catalog.get("licenseUrl", "")
         if lic_url:
-            # Common known license URLs
-            url_map = {
-                "apache.org/licenses/LICENSE-2.0": "Apache-2.0",
-                "opensource.org/licenses/MIT": "MIT",
-                "opensource.org/licenses/BSD": "BSD-3-Clause",
-                "mozilla.org/MPL/2.0": "MPL-2.0",
-                "gnu.org/licenses/lgpl": "LGPL-2.1",
-                "gnu.org/licenses/gpl": "GPL-3.0",
-            }
-            for pattern, spdx in url_map.items():
-                if pattern in lic_url:
-                    return spdx
-    except (URLError, json.JSONDecodeError, OSError, KeyError):
+            m = _LICENSE_URL_RE.search(lic_url)
+            if m:
+                return _LICENSE_URL_SPDX[m.lastindex - 1]
+    except (json.JSONDecodeError, AttributeError):
         pass
     return None
 
 
-def extract_licenses_csharp(project_path: Path) -> tuple[list[dict], bool, int]:
+def extract_licenses_csharp(project_path: Path, index: Optional[ManifestIndex] = None) -> tuple[list[dict], bool, int]:
     """Extract licenses from C# (NuGet) projects.
 
     Parses .csproj and Directory.Packages.props, looks up licenses via NuGet API.
 
     Returns (packages, is_monorepo, project_count).
     """
-    deps = _parse_csproj_packages(project_path)
+    csproj_paths, props_path = _find_csharp_manifests(project_path, index)
+    deps = _parse_csproj_packages(csproj_paths + ([props_path] if props_path else []))
     if not deps:
         return [], False, 0
 
     # Count .csproj files as project count
-    csproj_count = len(list(project_path.glob("**/*.csproj")))
+    csproj_count = len(csproj_paths)
     is_monorepo = csproj_count > 1
 
     print(f"  Looking up {len(deps)} NuGet package licenses...", file=sys.stderr)
+    unique_keys = list(dict.fromkeys((dep["name"], dep["version"]) for dep in deps))
+    with ThreadPoolExecutor(max_workers=min(MAX_LOOKUP_WORKERS, len(unique_keys))) as pool:
+        key_licenses = dict(zip(unique_keys, pool.map(lambda key: lookup_nuget_license(*key), unique_keys)))
+
     packages = []
     resolved_count = 0
 
     for dep in deps:
         license_str = "UNKNOWN"
-        lic = lookup_nuget_license(dep["name"], dep["version"])
+        lic = key_licenses.get((dep["name"], dep["version"]))
         if lic:
             license_str = lic
             resolved_count += 1
@@ -2,29 +2,49 @@
 
 from __future__ import annotations
 
-import glob as globmod
+import functools
 import json
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
-from urllib.error import URLError
 from urllib.parse import quote as urlquote
-from urllib.request import Request, urlopen
 
-from github_api import extract_github_org_repo, lookup_github_license
+from github_api import extract_github_org_repo, lookup_github_licenses
+from registry_cache import cached_fetch
+from manifest_index import ManifestIndex
+from util import IGNORED_DIRS, json_loads
 
+try:
+    # PyYAML is optional; without it pubspec.yaml falls back to the line parser below
+    import yaml
+    _YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+except ImportError:
+    yaml = None
 
+MAX_LOOKUP_WORKERS = 8
+_SDK_DEP_NAMES = ("flutter", "flutter_test", "flutter_web_plugins")
+
+
+@functools.lru_cache(maxsize=4096)
 def lookup_pub_dev_repo(package_name: str) -> Optional[tuple[str, str]]:
-    """Look up a Dart package's GitHub repo via pub.dev API.
+    """Look up a Dart package's GitHub repo via pub.dev API, consulting the on-disk cache first.
 
     Returns (owner, repo) or None.
     """
     url = f"https://pub.dev/api/packages/{urlquote(package_name, safe='')}"
-    headers = {"User-Agent": "license-check-scanner/1.0"}
+    cached = cached_fetch("pub", package_name, "", url, _parse_pub_dev_repo)
+    if not cached:
+        return None
+    owner, _, repo = cached.partition("/")
+    return owner, repo
+
+
+def _parse_pub_dev_repo(body: bytes) -> Optional[str]:
+    """Extract "owner/repo" from a pub.dev package response."""
     try:
-        req = Request(url, headers=headers)
-        with urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read())
+        data = json_loads(body)
         # Get repository or homepage URL
         pubspec = data.get("latest", {}).get("pubspec", {})
         for key in ("repository", "homepage"):
@@ -32,8 +52,8 @@ def lookup_pub_dev_repo(package_name: str) -> Optional[tuple[str, str]]:
             if repo_url:
                 gh = extract_github_org_repo(repo_url)
                 if gh:
-                    return gh
-    except (URLError, json.JSONDecodeError, OSError, KeyError):
+                    return f"{gh[0]}/{gh[1]}"
+    except (json.JSONDecodeError, AttributeError):
         pass
     return None
 
@@ -47,41 +67,40 @@ def _parse_pubspec_lock(lock_path: Path) -> list[dict]:
     packages = []
     current_name = None
     current = {}
-
-    try:
-        lines = lock_path.read_text().splitlines()
-    except OSError:
-        return []
-
     in_packages = False
 
-    for line in lines:
-        stripped = line.rstrip()
-        if stripped == "packages:":
-            in_packages = True
-            continue
-        if not in_packages:
-            continue
+    try:
+        with open(lock_path, buffering=65536) as fh:
+            for raw_line in fh:
+                line = raw_line.rstrip("\r\n")
+                if not in_packages:
+                    if line.rstrip() == "packages:":
+                        in_packages = True
+                    continue
 
-        # Top-level package name (2-space indent)
-        if len(line) > 2 and line[:4] != "    " and line[0] == " " and ":" in stripped:
-            # Save previous
-            if current_name and current:
-                packages.append(current)
-            name = stripped.strip().rstrip(":")
-            current_name = name
-            current = {"name": name, "version": "", "url": "", "source": ""}
-            continue
+                # Package properties (4+ space indent)
+                if line.startswith("    "):
+                    if current_name:
+                        kv = line.strip()
+                        if kv.startswith("version:"):
+                            current["version"] = kv.split(":", 1)[1].strip().strip('"')
+                        elif kv.startswith("source:"):
+                            current["source"] = kv.split(":", 1)[1].strip().strip('"')
+                        elif kv.startswith("url:"):
+                            current["url"] = kv.split(":", 1)[1].strip().strip('"')
+                    continue
 
-        # Package properties (4+ space indent)
-        if current_name and stripped.startswith("    "):
-            kv = stripped.strip()
-            if kv.startswith("version:"):
-                current["version"] = kv.split(":", 1)[1].strip().strip('"')
-            elif kv.startswith("source:"):
-                current["source"] = kv.split(":", 1)[1].strip().strip('"')
-            elif kv.startswith("url:"):
-                current["url"] = kv.split(":", 1)[1].strip().strip('"')
+                # Top-level package name (2-space indent)
+                stripped = line.rstrip()
+                if len(line) > 2 and line[0] == " " and ":" in stripped:
+                    # Save previous
+                    if current_name and current:
+                        packages.append(current)
+                    name = stripped.strip().rstrip(":")
+                    current_name = name
+                    current = {"name": name, "version": "", "url": "", "source": ""}
+    except OSError:
+        return []
 
     # Last package
     if current_name and current:
@@ -90,11 +109,69 @@ def _parse_pubspec_lock(lock_path: Path) -> list[dict]:
     return packages
 
 
+@functools.lru_cache(maxsize=256)
+def _load_pubspec_cached(path: str, mtime_ns: int) -> Optional[dict]:
+    """Parse a pubspec.yaml with PyYAML; keyed on mtime so edits invalidate it."""
+    try:
+        with open(path, "rb") as fh:
+            data = yaml.load(fh, Loader=_YAML_LOADER)
+    except (OSError, yaml.YAMLError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _load_pubspec(yaml_path: Path) -> Optional[dict]:
+    """Return the parsed pubspec.yaml, or None if PyYAML is unavailable or parsing fails."""
+    if yaml is None:
+        return None
+    try:
+        mtime_ns = os.stat(yaml_path).st_mtime_ns
+    except OSError:
+        return None
+    return _load_pubspec_cached(str(yaml_path), mtime_ns)
+
+
+def _pubspec_name(yaml_path: Path) -> Optional[str]:
+    """Return the package name declared in a pubspec.yaml."""
+    data = _load_pubspec(yaml_path)
+    if data is not None:
+        name = data.get("name")
+        return str(name) if name else None
+    try:
+        for line in yaml_path.read_text().splitlines()[:5]:
+            if line.startswith("name:"):
+                return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return None
+
+
 def _parse_pubspec_yaml_deps(yaml_path: Path) -> list[dict]:
-    """Parse a pubspec.yaml for dependency names (minimal YAML parsing).
+    """Parse a pubspec.yaml for dependency names.
 
+    Uses PyYAML when available, otherwise minimal line-based parsing.
     Returns list of {"name": ..., "version": ..., "is_dev": bool}.
     """
+    data = _load_pubspec(yaml_path)
+    if data is not None:
+        deps = []
+        for section in ("dependencies", "dev_dependencies"):
+            entries = data.get(section)
+            if not isinstance(entries, dict):
+                continue
+            for name, spec in entries.items():
+                name = str(name)
+                if name in _SDK_DEP_NAMES:
+                    continue
+                # Path/git/sdk deps are mappings and carry no version
+                version = str(spec).strip("'^~>= \"") if isinstance(spec, (str, int, float)) else ""
+                deps.append({
+                    "name": name,
+                    "version": version or "latest",
+                    "is_dev": section == "dev_dependencies",
+                })
+        return deps
+
     deps = []
     try:
         lines = yaml_path.read_text().splitlines()
@@ -124,7 +201,7 @@ def _parse_pubspec_yaml_deps(yaml_path: Path) -> list[dict]:
                 name = name_part.split(":")[0].strip()
                 version_part = name_part.split(":", 1)[1].strip()
                 # Skip sdk deps (flutter:, sdk: flutter)
-                if name in ("flutter", "flutter_test", "flutter_web_plugins"):
+                if name in _SDK_DEP_NAMES:
                     continue
                 # Version might be inline or a complex spec
                 version = version_part.strip("'^~>= \"") if version_part else "latest"
@@ -137,7 +214,38 @@ def _parse_pubspec_yaml_deps(yaml_path: Path) -> list[dict]:
     return deps
 
 
-def extract_licenses_dart(project_path: Path) -> tuple[list[dict], bool, int]:
+def _find_pubspecs(root: Path, index: Optional[ManifestIndex] = None) -> list[Path]:
+    """Return workspace pubspec.yaml files under packages/*/ and */ (root excluded).
+
+    Taken from a shared index when given, otherwise one os.scandir per
+    directory; order matches the old sorted packages/* then */ globs.
+    """
+    if index is not None:
+        by_base = {root / "packages": [], root: []}
+        for pubspec in index.paths("pubspec"):
+            pkg_dir = pubspec.parent
+            if pkg_dir.parent in by_base and not pkg_dir.name.startswith("."):
+                by_base[pkg_dir.parent].append(pubspec)
+        return [p for base in by_base.values() for p in sorted(base, key=lambda p: p.parent.name)]
+
+    found = []
+    for base in (root / "packages", root):
+        try:
+            with os.scandir(base) as it:
+                subdirs = sorted(
+                    e.name for e in it
+                    if not e.name.startswith(".") and e.name not in IGNORED_DIRS and e.is_dir()
+                )
+        except OSError:
+            continue
+        for name in subdirs:
+            candidate = base / name / "pubspec.yaml"
+            if candidate not in found and candidate.is_file():
+                found.append(candidate)
+    return found
+
+
+def extract_licenses_dart(project_path: Path, index: Optional[ManifestIndex] = None) -> tuple[list[dict], bool, int]:
     """Extract licenses from Dart project.
 
     First tries pubspec.lock. If not available, falls back to parsing
@@ -148,6 +256,7 @@ def extract_licenses_dart(project_path: Path) -> tuple[list[dict], bool, int]:
     lock_path = project_path / "pubspec.lock"
     all_dep_names = {}  # name -> {"version": ..., "is_dev": bool}
     workspace_count = 0
+    workspace_pubspecs = _find_pubspecs(project_path, index)
 
     if lock_path.exists():
         # Prefer lock file
@@ -163,12 +272,8 @@ def extract_licenses_dart(project_path: Path) -> tuple[list[dict], bool, int]:
         if root_yaml.exists():
             yaml_files.append(root_yaml)
         # Find workspace packages
-        for pattern in ("packages/*/pubspec.yaml", "*/pubspec.yaml"):
-            for match in sorted(globmod.glob(str(project_path / pattern))):
-                p = Path(match)
-                if p.exists() and p not in yaml_files:
-                    yaml_files.append(p)
-                    workspace_count += 1
+        yaml_files.extend(workspace_pubspecs)
+        workspace_count = len(workspace_pubspecs)
 
         for yf in yaml_files:
             for dep in _parse_pubspec_yaml_deps(yf):
@@ -185,15 +290,10 @@ def extract_licenses_dart(project_path: Path) -> tuple[list[dict], bool, int]:
 
     # Filter out internal workspace packages (packages that exist as directories)
     internal_names = set()
-    for pattern in ("packages/*/pubspec.yaml", "*/pubspec.yaml"):
-        for match in globmod.glob(str(project_path / pattern)):
-            try:
-                for line in Path(match).read_text().splitlines()[:5]:
-                    if line.startswith("name:"):
-                        internal_names.add(line.split(":", 1)[1].strip())
-                        break
-            except OSError:
-                pass
+    for pubspec in workspace_pubspecs:
+        name = _pubspec_name(pubspec)
+        if name:
+            internal_names.add(name)
 
     external_deps = {k: v for k, v in all_dep_names.items() if k not in internal_names}
 
@@ -201,17 +301,22 @@ def extract_licenses_dart(project_path: Path) -> tuple[list[dict], bool, int]:
         return [], is_monorepo, workspace_count
 
     print(f"  Looking up {len(external_deps)} Dart package licenses via pub.dev + GitHub...", file=sys.stderr)
+    names = list(external_deps)
+    with ThreadPoolExecutor(max_workers=min(MAX_LOOKUP_WORKERS, len(names))) as pool:
+        dep_repos = list(pool.map(lookup_pub_dev_repo, names))
+    # Packages published from one monorepo share a GitHub license lookup
+    repo_licenses = lookup_github_licenses([gh for gh in dep_repos if gh])
+
     packages = []
     resolved_count = 0
 
-    for name, info in external_deps.items():
+    for name, gh in zip(names, dep_repos):
+        info = external_deps[name]
         license_str = "UNKNOWN"
-        gh = lookup_pub_dev_repo(name)
-        if gh:
-            lic = lookup_github_license(gh[0], gh[1])
-            if lic:
-                license_str = lic
-                resolved_count += 1
+        lic = repo_licenses.get(gh) if gh else None
+        if lic:
+            license_str = lic
+            resolved_count += 1
 
         packages.append({
             "name": name,
@@ -6,7 +6,7 @@ import sys
 from pathlib import Path
 from typing import Optional
 
-from github_api import lookup_github_license
+from github_api import lookup_github_licenses
 
 
 def _parse_go_sum(project_path: Path) -> list[dict]:
@@ -23,24 +23,26 @@ def _parse_go_sum(project_path: Path) -> list[dict]:
     deps = []
 
     try:
-        for line in go_sum.read_text().splitlines():
-            parts = line.strip().split()
-            if len(parts) < 3:
-                continue
-            module_path = parts[0]
-            version = parts[1]
-            # Skip /go.mod hash lines and duplicates
-            if version.endswith("/go.mod"):
-                continue
-            if module_path in seen:
-                continue
-            seen.add(module_path)
-
-            deps.append({
-                "name": module_path,
-                "version": version.lstrip("v"),
-                "module_path": module_path,
-            })
+        # Bytes mode: only the surviving module path and version get decoded
+        with open(go_sum, "rb") as fh:
+            for raw in fh:
+                parts = raw.split(None, 2)
+                if len(parts) < 3:
+                    continue
+                module_path, version = parts[0], parts[1]
+                # Skip /go.mod hash lines and duplicates
+                if version.endswith(b"/go.mod"):
+                    continue
+                if module_path in seen:
+                    continue
+                seen.add(module_path)
+
+                name = module_path.decode("utf-8", "replace")
+                deps.append({
+                    "name": name,
+                    "version": version.lstrip(b"v").decode("utf-8", "replace"),
+                    "module_path": name,
+                })
     except OSError:
         pass
 
@@ -100,17 +102,20 @@ def extract_licenses_go(project_path: Path) -> tuple[list[dict], bool, int]:
     is_monorepo = workspace_count > 1
 
     print(f"  Looking up {len(external)} Go module licenses via GitHub...", file=sys.stderr)
+    # Many module paths (major-version suffixes, submodules) share one repo,
+    # so look each repo up once and fan the result back out
+    dep_repos = [_go_module_to_github(dep["module_path"]) for dep in external]
+    repo_licenses = lookup_github_licenses([gh for gh in dep_repos if gh])
+
     packages = []
     resolved_count = 0
 
-    for dep in external:
+    for dep, gh in zip(external, dep_repos):
         license_str = "UNKNOWN"
-        gh = _go_module_to_github(dep["module_path"])
-        if gh:
-            lic = lookup_github_license(gh[0], gh[1])
-            if lic:
-                license_str = lic
-                resolved_count += 1
+        lic = repo_licenses.get(gh) if gh else None
+        if lic:
+            license_str = lic
+            resolved_count += 1
 
         packages.append({
             "name": dep["name"],
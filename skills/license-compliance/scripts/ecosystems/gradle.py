@@ -2,13 +2,72 @@
 
 from __future__ import annotations
 
+import functools
 import re
 import sys
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
-from urllib.error import URLError
 from urllib.parse import quote as urlquote
-from urllib.request import Request, urlopen
+
+from http_client import http_get_stream
+from manifest_index import ManifestIndex
+from registry_cache import cached_fetch
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: fall back to the line parser
+    tomllib = None
+
+# Bounded to stay polite to Maven Central
+MAX_LOOKUP_WORKERS = 16
+
+# Matches implementation("group:artifact:version"), api(...), etc. Build
+# scripts are scanned as bytes; only captured coordinates are decoded
+_GRADLE_DEP_RE = re.compile(rb'(?:implementation|api|compileOnly|runtimeOnly|ksp|kapt)\s*\(\s*"([^"]+)"')
+_ARTIFACT_TYPE_SUFFIX_RE = re.compile(r'@\w+$')
+# End of a POM's <licenses> block, with or without a namespace prefix
+_LICENSES_END_RE = re.compile(rb'</(?:[\w.-]+:)?licenses\s*>')
+
+# POM <license><name> -> SPDX id, keyed by _pom_name_key
+_POM_TO_SPDX = {
+    " ".join(k.split()).lower(): v for k, v in {
+        "The Apache Software License, Version 2.0": "Apache-2.0",
+        "Apache License, Version 2.0": "Apache-2.0",
+        "Apache-2.0": "Apache-2.0",
+        "Apache 2.0": "Apache-2.0",
+        "Apache 2": "Apache-2.0",
+        "Apache License 2.0": "Apache-2.0",
+        "Apache License v2": "Apache-2.0",
+        "Apache License v2.0": "Apache-2.0",
+        "The Apache License, Version 2.0": "Apache-2.0",
+        "The Apache 2 License": "Apache-2.0",
+        "MIT License": "MIT",
+        "The MIT License": "MIT",
+        "The MIT License (MIT)": "MIT",
+        "MIT": "MIT",
+        "BSD License": "BSD-3-Clause",
+        "BSD 3-Clause License": "BSD-3-Clause",
+        "BSD-3-Clause": "BSD-3-Clause",
+        "New BSD License": "BSD-3-Clause",
+        "The BSD License": "BSD-2-Clause",
+        "BSD 2-Clause License": "BSD-2-Clause",
+        "BSD-2-Clause": "BSD-2-Clause",
+        "Eclipse Public License 1.0": "EPL-1.0",
+        "Eclipse Public License - v 1.0": "EPL-1.0",
+        "Eclipse Public License v2.0": "EPL-2.0",
+        "Eclipse Public License - v 2.0": "EPL-2.0",
+        "Eclipse Public License 2.0": "EPL-2.0",
+        "GNU Lesser General Public License": "LGPL-2.1",
+        "LGPL-2.1": "LGPL-2.1",
+        "GNU General Public License, version 2": "GPL-2.0",
+        "Mozilla Public License 2.0": "MPL-2.0",
+        "Mozilla Public License, Version 2.0": "MPL-2.0",
+        "Bouncy Castle Licence": "MIT",
+        "ISC License": "ISC",
+    }.items()
+}
 
 
 def _parse_versions_toml(toml_path: Path) -> tuple[dict, list[dict]]:
@@ -17,6 +76,67 @@ def _parse_versions_toml(toml_path: Path) -> tuple[dict, list[dict]]:
     Returns (versions_dict, libraries_list) where each library is
     {"name": alias, "group": groupId, "artifact": artifactId, "version": resolvedVersion}.
     """
+    if tomllib is not None:
+        try:
+            with open(toml_path, "rb") as f:
+                data = tomllib.load(f)
+        except tomllib.TOMLDecodeError:
+            pass
+        else:
+            return _catalog_from_toml(data)
+    return _parse_versions_toml_lines(toml_path)
+
+
+def _rich_version(value) -> str:
+    """Flatten a catalog version, which may be a string or a rich-version table."""
+    if isinstance(value, dict):
+        for key in ("strictly", "require", "prefer"):
+            if isinstance(value.get(key), str):
+                return value[key]
+        return ""
+    return value if isinstance(value, str) else ""
+
+
+def _catalog_from_toml(data: dict) -> tuple[dict, list[dict]]:
+    """Resolve the [versions] and [libraries] tables of a parsed catalog."""
+    versions = {k: _rich_version(v) for k, v in data.get("versions", {}).items()}
+    libraries = []
+
+    for alias, spec in data.get("libraries", {}).items():
+        group = artifact = version = ""
+        if isinstance(spec, dict):
+            module = spec.get("module", "")
+            if isinstance(module, str) and ":" in module:
+                group, artifact = module.split(":", 1)
+            else:
+                group = spec.get("group", "")
+                artifact = spec.get("name", "")
+            version_spec = spec.get("version", "")
+            if isinstance(version_spec, dict) and "ref" in version_spec:
+                ref = version_spec["ref"]
+                version = versions.get(ref, ref)
+            else:
+                version = _rich_version(version_spec)
+        elif isinstance(spec, str):
+            parts = spec.split(":")
+            if len(parts) >= 3:
+                group, artifact, version = parts[0], parts[1], parts[2]
+            elif len(parts) == 2:
+                group, artifact = parts[0], parts[1]
+
+        if group and artifact:
+            libraries.append({
+                "name": alias,
+                "group": group,
+                "artifact": artifact,
+                "version": version,
+            })
+
+    return versions, libraries
+
+
+def _parse_versions_toml_lines(toml_path: Path) -> tuple[dict, list[dict]]:
+    """Line-based catalog parser, used when tomllib is unavailable or rejects the file."""
     versions = {}
     libraries = []
     section = None
@@ -87,28 +207,30 @@ def _parse_versions_toml(toml_path: Path) -> tuple[dict, list[dict]]:
     return versions, libraries
 
 
-def _parse_gradle_build_files(project_path: Path) -> list[dict]:
+def _parse_gradle_build_files(project_path: Path, index: Optional[ManifestIndex] = None) -> list[dict]:
     """Scan build.gradle.kts files for direct dependency declarations not in version catalog."""
     deps = []
     seen = set()
 
-    for gradle_file in project_path.glob("**/build.gradle.kts"):
+    index = index or ManifestIndex(project_path)
+    for gradle_file in index.paths("gradle_kts"):
         try:
-            content = gradle_file.read_text()
+            content = gradle_file.read_bytes()
         except OSError:
             continue
 
         # Match patterns like: implementation("group:artifact:version")
         # or: api("group:artifact:version")
-        for match in re.finditer(
-            r'(?:implementation|api|compileOnly|runtimeOnly|ksp|kapt)\s*\(\s*"([^"]+)"',
-            content
-        ):
-            coord = match.group(1)
+        for match in _GRADLE_DEP_RE.finditer(content):
+            raw = match.group(1)
+            # Skip "$group:..." string interpolation before doing any work
+            if raw.startswith(b"$"):
+                continue
             # Remove @aar, @jar suffixes
-            coord = re.sub(r'@\w+$', '', coord)
-            parts = coord.split(":")
-            if len(parts) >= 3 and not parts[0].startswith("$"):
+            coord = _ARTIFACT_TYPE_SUFFIX_RE.sub('', raw.decode("utf-8", errors="replace"))
+            # group:artifact:version[:classifier] — nothing past the version is used
+            parts = coord.split(":", 3)
+            if len(parts) >= 3:
                 key = (parts[0], parts[1])
                 if key not in seen:
                     seen.add(key)
@@ -122,86 +244,85 @@ def _parse_gradle_build_files(project_path: Path) -> list[dict]:
     return deps
 
 
+def _fetch_pom_head(url: str, headers: dict, timeout: float):
+    """cached_fetch fetcher for POMs: the body is cut off after </licenses>.
+
+    The download stops there, so the (usually much longer) dependency
+    sections are never fetched.
+    """
+    chunks = []
+
+    def consume(chunk: bytes) -> bool:
+        tail = chunks[-1][-32:] if chunks else b""
+        chunks.append(chunk)
+        return _LICENSES_END_RE.search(tail + chunk) is not None
+
+    resp_headers = http_get_stream(url, consume, headers, timeout)
+    if resp_headers is None:
+        return None, None
+    return b"".join(chunks), resp_headers
+
+
+def _parse_pom_license(body: bytes) -> Optional[str]:
+    """License from a POM's <licenses><license><name> values; namespaces are ignored."""
+    names = []
+    parser = ET.XMLPullParser(events=("start", "end"))
+    in_licenses = False
+    try:
+        parser.feed(body)
+        for event, elem in parser.read_events():
+            tag = elem.tag.rpartition("}")[2]
+            if event == "start":
+                if tag == "licenses":
+                    in_licenses = True
+                continue
+            if in_licenses and tag == "name":
+                names.append((elem.text or "").strip())
+            elif tag == "licenses":
+                break
+    except ET.ParseError:
+        pass
+    return _spdx_from_pom_names(names)
+
+
+@functools.lru_cache(maxsize=4096)
 def lookup_maven_license(group: str, artifact: str, version: str) -> Optional[str]:
-    """Look up a Maven artifact's license via POM file from Maven Central."""
+    """Look up a Maven artifact's license from its POM, consulting the on-disk cache first."""
+    key = f"{group}:{artifact}"
     # Sanitize: quote each segment after splitting on dots to prevent path traversal
     group_path = "/".join(urlquote(seg, safe='') for seg in group.split("."))
     safe_artifact = urlquote(artifact, safe='')
     safe_version = urlquote(version, safe='')
-    pom_url = f"https://repo1.maven.org/maven2/{group_path}/{safe_artifact}/{safe_version}/{safe_artifact}-{safe_version}.pom"
+    pom_path = f"{group_path}/{safe_artifact}/{safe_version}/{safe_artifact}-{safe_version}.pom"
 
-    pom_to_spdx = {
-        "The Apache Software License, Version 2.0": "Apache-2.0",
-        "Apache License, Version 2.0": "Apache-2.0",
-        "Apache-2.0": "Apache-2.0",
-        "Apache 2.0": "Apache-2.0",
-        "Apache License 2.0": "Apache-2.0",
-        "The Apache License, Version 2.0": "Apache-2.0",
-        "MIT License": "MIT",
-        "The MIT License": "MIT",
-        "MIT": "MIT",
-        "BSD License": "BSD-3-Clause",
-        "BSD 3-Clause License": "BSD-3-Clause",
-        "BSD-3-Clause": "BSD-3-Clause",
-        "The BSD License": "BSD-2-Clause",
-        "Eclipse Public License 1.0": "EPL-1.0",
-        "Eclipse Public License v2.0": "EPL-2.0",
-        "Eclipse Public License - v 2.0": "EPL-2.0",
-        "GNU Lesser General Public License": "LGPL-2.1",
-        "LGPL-2.1": "LGPL-2.1",
-        "GNU General Public License, version 2": "GPL-2.0",
-        "Mozilla Public License 2.0": "MPL-2.0",
-        "Mozilla Public License, Version 2.0": "MPL-2.0",
-        "Bouncy Castle Licence": "MIT",
-        "ISC License": "ISC",
-    }
+    lic = cached_fetch(
+        "maven", key, version, f"https://repo1.maven.org/maven2/{pom_path}",
+        _parse_pom_license, fetch=_fetch_pom_head,
+    )
+    # Fallback: try Google Maven (for Android/Google artifacts)
+    if not lic and group.startswith(("com.google.", "com.android.", "androidx.")):
+        lic = cached_fetch(
+            "maven-google", key, version, f"https://dl.google.com/dl/android/maven2/{pom_path}",
+            _parse_pom_license, fetch=_fetch_pom_head,
+        )
+    return lic
 
-    try:
-        req = Request(pom_url, headers={"User-Agent": "license-check-scanner/1.0"})
-        with urlopen(req, timeout=10) as resp:
-            pom_content = resp.read().decode("utf-8", errors="replace")
-
-        # Parse license from POM XML (simple regex — avoid full XML parser dependency)
-        license_block = re.search(r'<licenses>(.*?)</licenses>', pom_content, re.DOTALL)
-        if license_block:
-            names = re.findall(r'<name>(.*?)</name>', license_block.group(1))
-            if names:
-                # Return first recognized license, or the raw name
-                for name in names:
-                    name = name.strip()
-                    if name in pom_to_spdx:
-                        return pom_to_spdx[name]
-                return names[0].strip()
-    except (URLError, OSError):
-        pass
 
-    # Fallback: try Google Maven (for Android/Google artifacts)
-    if group.startswith("com.google.") or group.startswith("com.android.") or group.startswith("androidx."):
-        google_pom = f"https://dl.google.com/dl/android/maven2/{group_path}/{artifact}/{version}/{artifact}-{version}.pom"
-        try:
-            req = Request(google_pom, headers={"User-Agent": "license-check-scanner/1.0"})
-            with urlopen(req, timeout=10) as resp:
-                pom_content = resp.read().decode("utf-8", errors="replace")
-            license_block = re.search(r'<licenses>(.*?)</licenses>', pom_content, re.DOTALL)
-            if license_block:
-                names = re.findall(r'<name>(.*?)</name>', license_block.group(1))
-                if names:
-                    google_pom_to_spdx = {
-                        "The Apache Software License, Version 2.0": "Apache-2.0",
-                        "Apache License, Version 2.0": "Apache-2.0",
-                    }
-                    for name in names:
-                        name = name.strip()
-                        if name in google_pom_to_spdx:
-                            return google_pom_to_spdx[name]
-                    return names[0].strip()
-        except (URLError, OSError):
-            pass
+def _pom_name_key(name: str) -> str:
+    """Normalize a POM license name for _POM_TO_SPDX (case and whitespace)."""
+    return " ".join(name.split()).lower()
 
-    return None
 
+def _spdx_from_pom_names(names: list[str]) -> Optional[str]:
+    """Return the first recognized license, or the raw first name."""
+    for name in names:
+        spdx = _POM_TO_SPDX.get(_pom_name_key(name))
+        if spdx:
+            return spdx
+    return names[0] if names else None
 
-def extract_licenses_gradle(project_path: Path) -> tuple[list[dict], bool, int]:
+
+def extract_licenses_gradle(project_path: Path, index: Optional[ManifestIndex] = None) -> tuple[list[dict], bool, int]:
     """Extract licenses from Gradle projects via version catalog + Maven POM lookup.
 
     Returns (packages, is_monorepo, module_count).
@@ -213,7 +334,7 @@ def extract_licenses_gradle(project_path: Path) -> tuple[list[dict], bool, int]:
         _, catalog_libs = _parse_versions_toml(toml_path)
 
     # Also scan build files for direct declarations
-    build_deps = _parse_gradle_build_files(project_path)
+    build_deps = _parse_gradle_build_files(project_path, index)
 
     # Merge, dedup by (group, artifact)
     seen = set()
@@ -238,8 +359,8 @@ def extract_licenses_gradle(project_path: Path) -> tuple[list[dict], bool, int]:
         sf = project_path / settings_file
         if sf.exists():
             try:
-                content = sf.read_text()
-                module_count = len(re.findall(r'include\s*\(', content))
+                content = sf.read_bytes()
+                module_count = content.count(b"include(") + content.count(b"include (")
             except OSError:
                 pass
             break
@@ -247,18 +368,22 @@ def extract_licenses_gradle(project_path: Path) -> tuple[list[dict], bool, int]:
 
     # Look up licenses via Maven Central POM
     print(f"  Looking up {len(all_deps)} Gradle dependency licenses via Maven Central...", file=sys.stderr)
+    with ThreadPoolExecutor(max_workers=min(MAX_LOOKUP_WORKERS, len(all_deps))) as pool:
+        licenses = list(pool.map(
+            lambda dep: lookup_maven_license(dep["group"], dep["artifact"], dep["version"]) if dep["version"] else None,
+            all_deps,
+        ))
+
     packages = []
     resolved_count = 0
 
-    for dep in all_deps:
+    for dep, lic in zip(all_deps, licenses):
         coord = f"{dep['group']}:{dep['artifact']}"
         license_str = "UNKNOWN"
 
-        if dep["version"]:
-            lic = lookup_maven_license(dep["group"], dep["artifact"], dep["version"])
-            if lic:
-                license_str = lic
-                resolved_count += 1
+        if lic:
+            license_str = lic
+            resolved_count += 1
 
         packages.append({
             "name": coord,
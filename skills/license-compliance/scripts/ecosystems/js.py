@@ -2,36 +2,70 @@
 
 from __future__ import annotations
 
+import functools
 import json
+import os
 import subprocess
 import sys
 from pathlib import Path
 from typing import Optional
-from urllib.error import URLError
 from urllib.parse import quote as urlquote
-from urllib.request import urlopen
 
+from registry_cache import cached_fetch
+from util import json_loads
 
+
+@functools.lru_cache(maxsize=4096)
 def lookup_npm_license(pkg_name: str, version: str) -> Optional[str]:
-    """Query the npm registry for a package's license field."""
+    """Query the npm registry for a package's license field, consulting the on-disk cache first."""
     # Scoped packages need encoding: @scope/pkg -> @scope%2Fpkg
     encoded = urlquote(pkg_name, safe="@")
     safe_ver = urlquote(version, safe='')
     spec = f"{encoded}/{safe_ver}" if version else encoded
     url = f"https://registry.npmjs.org/{spec}"
+    return cached_fetch("npm", pkg_name, version, url, _parse_npm_license, timeout=5)
+
+
+def _parse_npm_license(body: bytes) -> Optional[str]:
+    """Extract the license field from a registry package document."""
     try:
-        with urlopen(url, timeout=5) as resp:
-            data = json.loads(resp.read())
-        lic = data.get("license", "")
-        if isinstance(lic, dict):
-            lic = lic.get("type", "")
-        if isinstance(lic, str) and lic and lic not in ("UNLICENSED", "UNKNOWN", "Unknown"):
-            return lic
-    except (URLError, json.JSONDecodeError, OSError, KeyError):
-        pass
+        lic = json_loads(body).get("license", "")
+    except (json.JSONDecodeError, AttributeError):
+        return None
+    if isinstance(lic, dict):
+        lic = lic.get("type", "")
+    if isinstance(lic, str) and lic and lic not in ("UNLICENSED", "UNKNOWN", "Unknown"):
+        return lic
     return None
 
 
+def _package_json_license(pkg: dict) -> str:
+    """License string from a parsed package.json, including the legacy licenses array."""
+    lic = pkg.get("license", "")
+    if not lic:
+        # Legacy licenses array
+        licenses_arr = pkg.get("licenses", [])
+        if isinstance(licenses_arr, list) and licenses_arr:
+            types = [l.get("type", "") for l in licenses_arr if isinstance(l, dict)]
+            lic = " OR ".join(t for t in types if t)
+
+    if isinstance(lic, dict):
+        lic = lic.get("type", "")
+    return str(lic) if lic else ""
+
+
+def _read_local_license(project_path: Path, name: str, version: str) -> Optional[str]:
+    """License of an installed node_modules package, if that exact version is on disk."""
+    try:
+        with open(os.path.join(project_path, "node_modules", name, "package.json"), "rb") as f:
+            pkg = json_loads(f.read())
+    except (json.JSONDecodeError, OSError):
+        return None
+    if not isinstance(pkg, dict) or (version and pkg.get("version") != version):
+        return None
+    return _package_json_license(pkg) or None
+
+
 def extract_licenses_pnpm(project_path: Path, prod_only: bool) -> list[dict]:
     """Extract licenses using pnpm licenses list --json."""
     cmd = ["pnpm", "licenses", "list", "--json"]
@@ -39,9 +73,7 @@ def extract_licenses_pnpm(project_path: Path, prod_only: bool) -> list[dict]:
         cmd.append("--prod")
 
     try:
-        result = subprocess.run(
-            cmd, capture_output=True, text=True, cwd=str(project_path), timeout=120
-        )
+        result = subprocess.run(cmd, capture_output=True, cwd=str(project_path), timeout=120)
     except subprocess.TimeoutExpired:
         print("  Timeout running pnpm licenses list", file=sys.stderr)
         return []
@@ -53,11 +85,12 @@ def extract_licenses_pnpm(project_path: Path, prod_only: bool) -> list[dict]:
     if not output:
         # pnpm sometimes outputs to stderr on error
         if result.stderr:
-            print(f"  pnpm licenses error: {result.stderr.strip()}", file=sys.stderr)
+            stderr = result.stderr.decode("utf-8", errors="replace")
+            print(f"  pnpm licenses error: {stderr.strip()}", file=sys.stderr)
         return []
 
     try:
-        data = json.loads(output)
+        data = json_loads(output)
     except json.JSONDecodeError:
         print("  Failed to parse pnpm licenses JSON output", file=sys.stderr)
         return []
@@ -83,10 +116,14 @@ def extract_licenses_pnpm(project_path: Path, prod_only: bool) -> list[dict]:
             if key in seen:
                 continue
             seen.add(key)
+            license_str = license_id
+            if license_id in ("Unknown", "UNKNOWN", ""):
+                # Check the installed package.json before classify falls back to the registry
+                license_str = _read_local_license(project_path, name, version) or license_id
             packages.append({
                 "name": name,
                 "version": version,
-                "license": license_id,
+                "license": license_str,
                 "is_dev": False,  # pnpm --prod handles filtering
             })
 
@@ -104,8 +141,8 @@ def extract_licenses_node_modules(project_path: Path, prod_only: bool) -> list[d
     root_pkg = project_path / "package.json"
     if root_pkg.exists():
         try:
-            with open(root_pkg) as f:
-                pkg = json.load(f)
+            with open(root_pkg, "rb") as f:
+                pkg = json_loads(f.read())
             dev_deps = set(pkg.get("devDependencies", {}).keys())
         except (json.JSONDecodeError, OSError):
             pass
@@ -113,32 +150,32 @@ def extract_licenses_node_modules(project_path: Path, prod_only: bool) -> list[d
     packages = []
     seen = set()
 
-    def scan_dir(base: Path) -> None:
-        if not base.exists():
-            return
-        for entry in sorted(base.iterdir()):
-            if not entry.is_dir():
-                continue
+    def package_dirs(base: str) -> list[os.DirEntry]:
+        # DirEntry.is_dir() answers from readdir's d_type, so only symlinked
+        # packages (pnpm, workspaces) cost an extra stat
+        try:
+            with os.scandir(base) as it:
+                entries = [e for e in it if not e.name.startswith(".") and e.is_dir()]
+        except OSError:
+            return []
+        entries.sort(key=lambda e: e.name)
+        return entries
+
+    def scan_dir(base: str) -> None:
+        for entry in package_dirs(base):
             name = entry.name
-            if name.startswith("."):
-                continue
-
             if name.startswith("@"):
                 # Scoped package — go one level deeper
-                for sub in sorted(entry.iterdir()):
-                    if sub.is_dir() and not sub.name.startswith("."):
-                        process_pkg(sub, f"{name}/{sub.name}")
+                for sub in package_dirs(entry.path):
+                    process_pkg(sub.path, f"{name}/{sub.name}")
             else:
-                process_pkg(entry, name)
-
-    def process_pkg(pkg_dir: Path, name: str) -> None:
-        pkg_json = pkg_dir / "package.json"
-        if not pkg_json.exists():
-            return
+                process_pkg(entry.path, name)
 
+    def process_pkg(pkg_dir: str, name: str) -> None:
+        # Opening directly is one syscall; a missing file is just skipped
         try:
-            with open(pkg_json) as f:
-                pkg = json.load(f)
+            with open(os.path.join(pkg_dir, "package.json"), "rb") as f:
+                pkg = json_loads(f.read())
         except (json.JSONDecodeError, OSError):
             return
 
@@ -152,17 +189,7 @@ def extract_licenses_node_modules(project_path: Path, prod_only: bool) -> list[d
             return
         seen.add(key)
 
-        # Extract license
-        lic = pkg.get("license", "")
-        if not lic:
-            # Legacy licenses array
-            licenses_arr = pkg.get("licenses", [])
-            if isinstance(licenses_arr, list) and licenses_arr:
-                types = [l.get("type", "") for l in licenses_arr if isinstance(l, dict)]
-                lic = " OR ".join(t for t in types if t)
-
-        if isinstance(lic, dict):
-            lic = lic.get("type", "")
+        lic = _package_json_license(pkg)
 
         is_dev = name in dev_deps
         if prod_only and is_dev:
@@ -171,9 +198,9 @@ def extract_licenses_node_modules(project_path: Path, prod_only: bool) -> list[d
         packages.append({
             "name": name,
             "version": version,
-            "license": str(lic) if lic else "UNKNOWN",
+            "license": lic if lic else "UNKNOWN",
             "is_dev": is_dev,
         })
 
-    scan_dir(nm)
+    scan_dir(str(nm))
     return packages
@@ -2,26 +2,52 @@
 
 from __future__ import annotations
 
+import functools
 import json
 import re
 import sys
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
-from urllib.error import URLError
 from urllib.parse import quote as urlquote
-from urllib.request import urlopen
 
+from registry_cache import cached_fetch
+from util import json_loads
 
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: fall back to the line parser
+    tomllib = None
+
+MAX_LOOKUP_WORKERS = 8
+# poetry: [tool.poetry.group.dev.dependencies] or [tool.poetry.dev-dependencies]
+# uv: [tool.uv.dev-dependencies]
+_DEV_DEPS_HEADER_RE = re.compile(
+    r'\[tool\.(?:poetry\.(?:dev-dependencies|group\.dev\.dependencies)|uv\.dev-dependencies)\]'
+)
+# name[extras] op version; the version stops at a comma, marker or comment
+_REQUIREMENT_RE = re.compile(
+    r'([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*(?:(===|==|>=|<=|~=|!=|>|<)\s*([^\s,;#]*))?'
+)
+_REQUIREMENT_OPTION_RE = re.compile(r'\s+--')
+
+
+@functools.lru_cache(maxsize=4096)
 def lookup_pypi_license(pkg_name: str, version: str) -> Optional[str]:
-    """Query PyPI for a package's license via classifiers or license field."""
+    """Query PyPI for a package's license, consulting the on-disk cache first."""
+    # PyPI has no bulk metadata endpoint, and deps.dev's GetVersion is also one
+    # request per package; the disk cache is what removes repeat round trips
     safe_name = urlquote(pkg_name, safe='')
     safe_ver = urlquote(version, safe='')
     url = f"https://pypi.org/pypi/{safe_name}/{safe_ver}/json" if version else f"https://pypi.org/pypi/{safe_name}/json"
+    return cached_fetch("pypi", pkg_name.lower(), version, url, _parse_pypi_license, timeout=5)
+
+
+def _parse_pypi_license(body: bytes) -> Optional[str]:
+    """Extract a license from a PyPI JSON document via classifiers or the license field."""
     try:
-        with urlopen(url, timeout=5) as resp:
-            data = json.loads(resp.read())
-        info = data.get("info", {})
+        info = json_loads(body).get("info", {})
 
         # Prefer classifiers (more structured)
         classifiers = info.get("classifiers", [])
@@ -33,40 +59,64 @@ def lookup_pypi_license(pkg_name: str, version: str) -> Optional[str]:
         lic = info.get("license", "")
         if isinstance(lic, str) and lic and lic.upper() not in ("UNKNOWN", ""):
             return lic
-    except (URLError, json.JSONDecodeError, OSError, KeyError):
+    except (json.JSONDecodeError, AttributeError):
         pass
     return None
 
 
 def _parse_poetry_lock(lock_path: Path) -> list[dict]:
-    """Parse poetry.lock (TOML-like) for package names and versions."""
+    """Parse poetry.lock / uv.lock for package names and versions."""
+    if tomllib is not None:
+        try:
+            with open(lock_path, "rb") as f:
+                data = tomllib.load(f)
+        except tomllib.TOMLDecodeError:
+            pass
+        else:
+            packages = []
+            for pkg in data.get("package", []):
+                if isinstance(pkg, dict) and pkg.get("name"):
+                    entry = {"name": pkg["name"]}
+                    if "version" in pkg:
+                        entry["version"] = pkg["version"]
+                    packages.append(entry)
+            return packages
+    return _parse_poetry_lock_lines(lock_path)
+
+
+def _parse_poetry_lock_lines(lock_path: Path) -> list[dict]:
+    """Line-based lockfile parser, used when tomllib is unavailable or rejects the file."""
     packages = []
     current = {}
     in_package = False
 
     with open(lock_path) as f:
-        for line in f:
-            stripped = line.strip()
+        lines = f.read().splitlines()
+
+    for line in lines:
+        stripped = line.strip()
+        # Dispatch on the first character: only headers and name/version keys matter
+        first = stripped[:1]
+        if first == "[":
             if stripped == "[[package]]":
                 if current.get("name"):
                     packages.append(current)
                 current = {}
                 in_package = True
-                continue
-            # Exit package section on new section header (but not [[package]])
-            if in_package and stripped.startswith("[") and not stripped.startswith("[[package]]"):
-                if not stripped.startswith("[package."):
-                    # New top-level section, save current and stop
-                    in_package = False
-                continue
-            if in_package and "=" in stripped:
-                key, _, value = stripped.partition("=")
-                key = key.strip()
-                value = value.strip().strip('"')
-                if key == "name":
-                    current["name"] = value
-                elif key == "version":
-                    current["version"] = value
+            elif not stripped.startswith(("[[package]]", "[package.")):
+                # New top-level section ends the package list
+                in_package = False
+            continue
+        if not in_package or first not in ("n", "v"):
+            continue
+        key, sep, value = stripped.partition("=")
+        if not sep:
+            continue
+        key = key.strip()
+        if key == "name":
+            current["name"] = value.strip().strip('"')
+        elif key == "version":
+            current["version"] = value.strip().strip('"')
 
     if current.get("name"):
         packages.append(current)
@@ -77,8 +127,8 @@ def _parse_poetry_lock(lock_path: Path) -> list[dict]:
 def _parse_pipfile_lock(lock_path: Path) -> list[dict]:
     """Parse Pipfile.lock (JSON) for packages with dev/prod distinction."""
     try:
-        with open(lock_path) as f:
-            data = json.load(f)
+        with open(lock_path, "rb") as f:
+            data = json_loads(f.read())
     except (json.JSONDecodeError, OSError):
         return []
 
@@ -103,23 +153,21 @@ def _parse_requirements_txt(req_path: Path) -> list[dict]:
             stripped = line.strip()
             if not stripped or stripped.startswith("#") or stripped.startswith("-"):
                 continue
+            # Drop per-requirement options (--hash=..., --install-option=...) and
+            # the line continuation pip-compile puts before them
+            spec = _REQUIREMENT_OPTION_RE.split(stripped, 1)[0].rstrip("\\").strip()
             # Handle package==version, package>=version, etc.
-            matched = False
-            for sep in ("==", ">=", "<=", "~=", "!=", ">", "<"):
-                if sep in stripped:
-                    name, _, version = stripped.partition(sep)
-                    name = name.split("[")[0].strip()
-                    version = version.strip().split(",")[0].split(";")[0].strip()
-                    packages.append({
-                        "name": name,
-                        "version": version,
-                        "is_dev": False,
-                    })
-                    matched = True
-                    break
-            if not matched:
-                # Package without version pin
-                name = stripped.split("[")[0].split(";")[0].strip()
+            m = _REQUIREMENT_RE.match(spec)
+            rest = spec[m.end():].lstrip() if m else ""
+            if m and not (rest.startswith(("@", "+", "/", ":")) or "://" in spec):
+                packages.append({
+                    "name": m.group(1),
+                    "version": m.group(3) or "",
+                    "is_dev": False,
+                })
+            else:
+                # URL / path / VCS requirements: keep the whole spec as the name, unpinned
+                name = spec.split("[")[0].split(";")[0].strip()
                 if name:
                     packages.append({
                         "name": name,
@@ -160,15 +208,10 @@ def extract_licenses_python(project_path: Path, pm: str, prod_only: bool) -> lis
                 with open(pyproject) as f:
                     content = f.read()
                 # Simple regex extraction for dev dependencies
-                # poetry: [tool.poetry.group.dev.dependencies] or [tool.poetry.dev-dependencies]
-                # uv: [tool.uv.dev-dependencies]
                 in_dev = False
                 for line in content.splitlines():
                     stripped = line.strip()
-                    if re.match(r'\[tool\.poetry\.(dev-dependencies|group\.dev\.dependencies)\]', stripped):
-                        in_dev = True
-                        continue
-                    if re.match(r'\[tool\.uv\.dev-dependencies\]', stripped):
+                    if _DEV_DEPS_HEADER_RE.match(stripped):
                         in_dev = True
                         continue
                     if in_dev and stripped.startswith("["):
@@ -180,30 +223,46 @@ def extract_licenses_python(project_path: Path, pm: str, prod_only: bool) -> lis
             except OSError:
                 pass
 
-    # Look up licenses via PyPI
-    packages = []
-    total = len(raw_packages)
-    print(f"  Looking up {total} Python package licenses via PyPI...", file=sys.stderr)
-
-    for i, raw in enumerate(raw_packages, 1):
+    selected = []
+    for raw in raw_packages:
         name = raw.get("name", "")
-        version = raw.get("version", "")
         is_dev = raw.get("is_dev", name.lower() in dev_deps)
-
         if prod_only and is_dev:
             continue
+        selected.append((name, raw.get("version", ""), is_dev))
+
+    if not selected:
+        return []
 
-        license_str = lookup_pypi_license(name, version)
+    # Several requirement lines can pin the same package; fetch each once
+    unique_keys = list(dict.fromkeys((name, version) for name, version, _ in selected))
 
+    # Look up licenses via PyPI
+    total = len(unique_keys)
+    print(f"  Looking up {total} Python package licenses via PyPI...", file=sys.stderr)
+
+    done = 0
+    done_lock = threading.Lock()
+
+    def lookup(key: tuple[str, str]) -> Optional[str]:
+        nonlocal done
+        license_str = lookup_pypi_license(*key)
+        with done_lock:
+            done += 1
+            if done % 50 == 0:
+                print(f"  Looked up {done}/{total}...", file=sys.stderr)
+        return license_str
+
+    with ThreadPoolExecutor(max_workers=min(MAX_LOOKUP_WORKERS, total)) as pool:
+        key_licenses = dict(zip(unique_keys, pool.map(lookup, unique_keys)))
+
+    packages = []
+    for name, version, is_dev in selected:
+        license_str = key_licenses[(name, version)]
         packages.append({
             "name": name,
             "version": version,
             "license": license_str if license_str else "UNKNOWN",
             "is_dev": is_dev,
         })
-
-        if i % 50 == 0:
-            print(f"  Looked up {i}/{total}...", file=sys.stderr)
-            time.sleep(0.2)  # Small delay to be respectful to PyPI
-
     return packages
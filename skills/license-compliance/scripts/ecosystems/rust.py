@@ -2,71 +2,57 @@
 
 from __future__ import annotations
 
+import functools
 import json
 import subprocess
 import sys
+import tempfile
+import threading
 from pathlib import Path
-from typing import Optional
-from urllib.error import URLError
+from typing import Iterable, Optional
 from urllib.parse import quote as urlquote
-from urllib.request import Request, urlopen
 
+try:
+    # Optional: parse `cargo metadata` (multi-MB on large workspaces) as it streams
+    import ijson
+except ImportError:
+    ijson = None
 
-def lookup_crates_io_license(name: str, version: str) -> Optional[str]:
-    """Query crates.io API for a crate's license field."""
-    url = f"https://crates.io/api/v1/crates/{urlquote(name, safe='')}/{urlquote(version, safe='')}"
-    try:
-        req = Request(url, headers={"User-Agent": "license-check-scanner/1.0"})
-        with urlopen(req, timeout=5) as resp:
-            data = json.loads(resp.read())
-        lic = data.get("version", {}).get("license", "")
-        if isinstance(lic, str) and lic and lic not in ("UNKNOWN", "Unknown"):
-            return lic
-    except (URLError, json.JSONDecodeError, OSError, KeyError):
-        pass
-    return None
+from registry_cache import cached_fetch
+from util import json_loads
 
+CARGO_METADATA_CMD = ["cargo", "metadata", "--format-version=1"]
+CARGO_METADATA_TIMEOUT = 120
 
-def extract_licenses_cargo(project_path: Path) -> tuple[list[dict], bool, int]:
-    """Extract licenses using cargo metadata.
 
-    Returns (packages, is_workspace, workspace_member_count).
-    """
-    cmd = ["cargo", "metadata", "--format-version=1"]
-    try:
-        result = subprocess.run(
-            cmd, capture_output=True, text=True, cwd=str(project_path), timeout=120
-        )
-    except subprocess.TimeoutExpired:
-        print("  Timeout running cargo metadata", file=sys.stderr)
-        return [], False, 0
-    except FileNotFoundError:
-        print("  cargo not found in PATH", file=sys.stderr)
-        return [], False, 0
+@functools.lru_cache(maxsize=4096)
+def lookup_crates_io_license(name: str, version: str) -> Optional[str]:
+    """Query crates.io API for a crate's license field, consulting the on-disk cache first."""
+    url = f"https://crates.io/api/v1/crates/{urlquote(name, safe='')}/{urlquote(version, safe='')}"
+    return cached_fetch("crates", name, version, url, _parse_crates_io_license, timeout=5)
 
-    if result.returncode != 0:
-        print(f"  cargo metadata failed: {result.stderr.strip()[:200]}", file=sys.stderr)
-        return [], False, 0
 
+def _parse_crates_io_license(body: bytes) -> Optional[str]:
+    """Extract the license field from a crates.io version document."""
     try:
-        data = json.loads(result.stdout)
-    except json.JSONDecodeError:
-        print("  Failed to parse cargo metadata JSON output", file=sys.stderr)
-        return [], False, 0
+        lic = json_loads(body).get("version", {}).get("license", "")
+    except (json.JSONDecodeError, AttributeError):
+        return None
+    if isinstance(lic, str) and lic and lic not in ("UNKNOWN", "Unknown"):
+        return lic
+    return None
 
-    # Identify workspace members (source is null for local packages)
-    workspace_members = set()
-    for pkg in data.get("packages", []):
-        if pkg.get("source") is None:
-            workspace_members.add(pkg.get("id", ""))
 
-    is_workspace = len(workspace_members) > 1
+def _collect_cargo_packages(pkgs: Iterable[dict]) -> tuple[list[dict], int]:
+    """Single pass over cargo metadata packages: (third-party packages, member count)."""
     packages = []
     seen = set()
+    member_count = 0
 
-    for pkg in data.get("packages", []):
-        # Skip workspace members (local packages, not third-party deps)
+    for pkg in pkgs:
+        # Workspace members (source is null) are local packages, not third-party deps
         if pkg.get("source") is None:
+            member_count += 1
             continue
 
         name = pkg.get("name", "")
@@ -84,4 +70,86 @@ def extract_licenses_cargo(project_path: Path) -> tuple[list[dict], bool, int]:
             "is_dev": False,  # cargo metadata doesn't distinguish dev deps
         })
 
-    return packages, is_workspace, len(workspace_members)
+    return packages, member_count
+
+
+def _stream_cargo_metadata(project_path: Path) -> Optional[tuple[list[dict], int]]:
+    """Run cargo metadata and parse packages with ijson as the output arrives."""
+    # stderr goes to a file: cargo can log more than a pipe buffer while we read stdout
+    with tempfile.TemporaryFile() as err:
+        try:
+            proc = subprocess.Popen(
+                CARGO_METADATA_CMD, stdout=subprocess.PIPE, stderr=err, cwd=str(project_path)
+            )
+        except FileNotFoundError:
+            print("  cargo not found in PATH", file=sys.stderr)
+            return None
+
+        timed_out = threading.Event()
+
+        def kill() -> None:
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(CARGO_METADATA_TIMEOUT, kill)
+        timer.start()
+        try:
+            try:
+                collected = _collect_cargo_packages(ijson.items(proc.stdout, "packages.item"))
+            except ijson.JSONError:
+                collected = None
+            proc.stdout.close()
+            proc.wait()
+        finally:
+            timer.cancel()
+
+        if timed_out.is_set():
+            print("  Timeout running cargo metadata", file=sys.stderr)
+            return None
+        if proc.returncode != 0:
+            err.seek(0)
+            stderr = err.read().decode("utf-8", errors="replace")
+            print(f"  cargo metadata failed: {stderr.strip()[:200]}", file=sys.stderr)
+            return None
+
+    if collected is None:
+        print("  Failed to parse cargo metadata JSON output", file=sys.stderr)
+    return collected
+
+
+def extract_licenses_cargo(project_path: Path) -> tuple[list[dict], bool, int]:
+    """Extract licenses using cargo metadata.
+
+    Returns (packages, is_workspace, workspace_member_count).
+    """
+    if ijson is not None:
+        collected = _stream_cargo_metadata(project_path)
+        if collected is None:
+            return [], False, 0
+        packages, member_count = collected
+        return packages, member_count > 1, member_count
+
+    try:
+        result = subprocess.run(
+            CARGO_METADATA_CMD, capture_output=True, cwd=str(project_path), timeout=CARGO_METADATA_TIMEOUT
+        )
+    except subprocess.TimeoutExpired:
+        print("  Timeout running cargo metadata", file=sys.stderr)
+        return [], False, 0
+    except FileNotFoundError:
+        print("  cargo not found in PATH", file=sys.stderr)
+        return [], False, 0
+
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", errors="replace")
+        print(f"  cargo metadata failed: {stderr.strip()[:200]}", file=sys.stderr)
+        return [], False, 0
+
+    try:
+        data = json_loads(result.stdout)
+    except json.JSONDecodeError:
+        print("  Failed to parse cargo metadata JSON output", file=sys.stderr)
+        return [], False, 0
+
+    packages, member_count = _collect_cargo_packages(data.get("packages", []))
+    return packages, member_count > 1, member_count
@@ -3,10 +3,17 @@
 from __future__ import annotations
 
 import json
+import re
 import sys
 from pathlib import Path
 
-from github_api import extract_github_org_repo, lookup_github_license
+from util import json_loads
+from github_api import extract_github_org_repo, lookup_github_licenses
+
+_SUBMODULE_RE = re.compile(r'^[ \t]*\[submodule\s+"([^"]*)"', re.MULTILINE)
+_SUBMODULE_KEY_RE = re.compile(r'^[ \t]*(url|path)[ \t]*=[ \t]*(.*?)\s*$', re.MULTILINE)
+# One npm range prefix: ^1.2.3, ~1.2.3, >=1.2.3, ^>=1.2.3, "= 1.2.3"
+_SEMVER_PREFIX_RE = re.compile(r'^[\^~]?(?:>=|<=|>|<|=)?\s*')
 
 
 def _parse_gitmodules(project_path: Path) -> list[dict]:
@@ -18,30 +25,21 @@ def _parse_gitmodules(project_path: Path) -> list[dict]:
     if not gitmodules.exists():
         return []
 
-    modules = []
-    current = {}
-
     try:
-        for line in gitmodules.read_text().splitlines():
-            stripped = line.strip()
-            if stripped.startswith("[submodule"):
-                if current:
-                    modules.append(current)
-                name = stripped.split('"')[1] if '"' in stripped else ""
-                current = {"name": name, "url": "", "path": ""}
-            elif "=" in stripped and current is not None:
-                key, val = stripped.split("=", 1)
-                key = key.strip()
-                val = val.strip()
-                if key == "url":
-                    current["url"] = val
-                elif key == "path":
-                    current["path"] = val
+        text = gitmodules.read_text(encoding="utf-8", errors="replace")
     except OSError:
         return []
 
-    if current:
-        modules.append(current)
+    # Two regex scans over the whole file: section headers, then the url/path
+    # keys inside each section (in either order)
+    headers = list(_SUBMODULE_RE.finditer(text))
+    modules = []
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        module = {"name": header.group(1), "url": "", "path": ""}
+        for key in _SUBMODULE_KEY_RE.finditer(text, header.end(), end):
+            module[key.group(1)] = key.group(2)
+        modules.append(module)
 
     return modules
 
@@ -65,18 +63,18 @@ def extract_licenses_solidity(project_path: Path) -> tuple[list[dict], bool, int
     if not submodules and project_path.parent != project_path:
         submodules = _parse_gitmodules(project_path.parent)
     if submodules:
-        github_subs = [s for s in submodules if extract_github_org_repo(s.get("url", ""))]
+        # Parse each URL once and keep (submodule, (owner, repo)) for GitHub-hosted ones
+        github_subs = [(s, gh) for s in submodules if (gh := extract_github_org_repo(s.get("url", "")))]
         if github_subs:
             print(f"  Looking up {len(github_subs)} Foundry submodule licenses via GitHub...", file=sys.stderr)
+            repo_licenses = lookup_github_licenses([gh for _, gh in github_subs])
             resolved = 0
-            for sub in github_subs:
-                gh = extract_github_org_repo(sub["url"])
+            for sub, gh in github_subs:
                 license_str = "UNKNOWN"
-                if gh:
-                    lic = lookup_github_license(gh[0], gh[1])
-                    if lic:
-                        license_str = lic
-                        resolved += 1
+                lic = repo_licenses.get(gh)
+                if lic:
+                    license_str = lic
+                    resolved += 1
                 name = sub["name"] or sub["path"] or sub["url"]
                 if name not in seen:
                     seen.add(name)
@@ -92,8 +90,8 @@ def extract_licenses_solidity(project_path: Path) -> tuple[list[dict], bool, int
     pkg_json = project_path / "package.json"
     if pkg_json.exists():
         try:
-            with open(pkg_json) as f:
-                data = json.load(f)
+            with open(pkg_json, "rb") as f:
+                data = json_loads(f.read())
             for dep_section in ("dependencies", "devDependencies"):
                 for name in data.get(dep_section, {}):
                     if name not in seen:
@@ -102,7 +100,7 @@ def extract_licenses_solidity(project_path: Path) -> tuple[list[dict], bool, int
                         # in classify_packages will resolve them
                         all_packages.append({
                             "name": name,
-                            "version": data[dep_section][name].lstrip("^~>="),
+                            "version": _SEMVER_PREFIX_RE.sub("", data[dep_section][name], count=1),
                             "license": "UNKNOWN",
                             "is_dev": dep_section == "devDependencies",
                         })
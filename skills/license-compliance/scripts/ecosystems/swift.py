@@ -5,123 +5,114 @@ from __future__ import annotations
 import json
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
-from github_api import extract_github_org_repo, lookup_github_license
+from util import json_loads
+from github_api import extract_github_org_repo, lookup_github_licenses
+from manifest_index import ManifestIndex
 
 
-def find_package_resolved(project_path: Path) -> Optional[Path]:
-    """Find Swift Package.resolved in common locations."""
-    candidates = [
-        project_path / "Package.resolved",
-        project_path / ".package.resolved",
-    ]
-    # Also search in Xcode workspace locations
-    for xcodeproj in project_path.glob("**/*.xcodeproj"):
-        candidates.append(
-            xcodeproj / "project.xcworkspace" / "xcshareddata" / "swiftpm" / "Package.resolved"
-        )
-    for xcworkspace in project_path.glob("**/*.xcworkspace"):
-        candidates.append(
-            xcworkspace / "xcshareddata" / "swiftpm" / "Package.resolved"
-        )
-    # Return the first existing file
-    for c in candidates:
-        if c.exists():
-            return c
-    return None
-
-
-def extract_licenses_swift(project_path: Path) -> list[dict]:
-    """Extract licenses from Swift Package.resolved (v1/v2/v3).
+def _xcode_resolved_candidates(project_path: Path, index: Optional[ManifestIndex] = None) -> list[Path]:
+    """Package.resolved locations inside Xcode projects and workspaces.
 
-    Parses all Package.resolved files found, deduplicates, and looks up
-    licenses via the GitHub API.
+    Bundles come from one pruned walk (shared via index when given);
+    project candidates still come before workspace ones.
     """
-    resolved_files = []
-    # Collect all Package.resolved files
+    index = index or ManifestIndex(project_path)
+    projects = [
+        xcodeproj / "project.xcworkspace" / "xcshareddata" / "swiftpm" / "Package.resolved"
+        for xcodeproj in index.paths("xcodeproj")
+    ]
+    workspaces = [
+        xcworkspace / "xcshareddata" / "swiftpm" / "Package.resolved"
+        for xcworkspace in index.paths("xcworkspace")
+    ]
+    return projects + workspaces
+
+
+def _package_resolved_files(project_path: Path, index: Optional[ManifestIndex] = None) -> list[Path]:
+    """Existing Package.resolved files: project root first, then Xcode locations."""
     candidates = [
         project_path / "Package.resolved",
         project_path / ".package.resolved",
     ]
-    for xcodeproj in project_path.glob("**/*.xcodeproj"):
-        candidates.append(
-            xcodeproj / "project.xcworkspace" / "xcshareddata" / "swiftpm" / "Package.resolved"
-        )
-    for xcworkspace in project_path.glob("**/*.xcworkspace"):
-        candidates.append(
-            xcworkspace / "xcshareddata" / "swiftpm" / "Package.resolved"
-        )
-    for c in candidates:
-        if c.exists():
-            resolved_files.append(c)
+    candidates.extend(_xcode_resolved_candidates(project_path, index))
+    return [c for c in candidates if c.is_file()]
 
-    if not resolved_files:
-        return []
 
-    # Parse all resolved files and collect unique pins
-    seen = set()
-    pins = []  # list of (identity, version, url)
+def find_package_resolved(project_path: Path, index: Optional[ManifestIndex] = None) -> Optional[Path]:
+    """Find Swift Package.resolved in common locations."""
+    found = _package_resolved_files(project_path, index)
+    return found[0] if found else None
 
+
+def _iter_pins(resolved_files: list[Path]) -> Iterator[tuple[str, str, str]]:
+    """Yield unique (identity, version, url) pins from Package.resolved v1/v2/v3 files."""
+    seen = set()
     for rf in resolved_files:
         try:
-            with open(rf) as f:
-                data = json.load(f)
+            with open(rf, "rb") as f:
+                data = json_loads(f.read())
         except (json.JSONDecodeError, OSError):
             continue
 
         version_num = data.get("version", 0)
-        raw_pins = []
-
         if version_num == 1:
             # V1: pins are under "object.pins"
             raw_pins = data.get("object", {}).get("pins", [])
+            identity_key, url_key = "package", "repositoryURL"
         else:
             # V2/V3: pins at top level
             raw_pins = data.get("pins", [])
+            identity_key, url_key = "identity", "location"
 
         for pin in raw_pins:
+            identity = pin.get(identity_key, "")
             if version_num == 1:
-                identity = pin.get("package", "").lower()
-                url = pin.get("repositoryURL", "")
-            else:
-                identity = pin.get("identity", "")
-                url = pin.get("location", "")
-
+                identity = identity.lower()
             state = pin.get("state", {})
-            version = state.get("version", "") or ""
-            branch = state.get("branch", "")
+            version = state.get("version", "") or state.get("branch", "") or "unknown"
 
-            key = (identity, version or branch or "unknown")
+            key = (identity, version)
             if key in seen:
                 continue
             seen.add(key)
-            pins.append({
-                "identity": identity,
-                "version": version or branch or "unknown",
-                "url": url,
-            })
+            yield identity, version, pin.get(url_key, "")
+
+
+def extract_licenses_swift(project_path: Path, index: Optional[ManifestIndex] = None) -> list[dict]:
+    """Extract licenses from Swift Package.resolved (v1/v2/v3).
+
+    Parses all Package.resolved files found, deduplicates, and looks up
+    licenses via the GitHub API.
+    """
+    resolved_files = _package_resolved_files(project_path, index)
+    if not resolved_files:
+        return []
 
+    # Unique (identity, version, url) pins across all resolved files
+    pins = list(_iter_pins(resolved_files))
     if not pins:
         return []
 
     # Look up licenses via GitHub API
-    packages = []
     print(f"  Looking up {len(pins)} Swift package licenses via GitHub API...", file=sys.stderr)
+    pin_repos = [extract_github_org_repo(url) for _, _, url in pins]
+    repo_licenses = lookup_github_licenses([gh for gh in pin_repos if gh])
+
+    packages = []
     resolved_count = 0
 
-    for pin in pins:
-        gh = extract_github_org_repo(pin["url"])
+    for (identity, version, _), gh in zip(pins, pin_repos):
         license_str = "UNKNOWN"
-        if gh:
-            lic = lookup_github_license(gh[0], gh[1])
-            if lic:
-                license_str = lic
-                resolved_count += 1
+        lic = repo_licenses.get(gh) if gh else None
+        if lic:
+            license_str = lic
+            resolved_count += 1
 
         packages.append({
-            "name": pin["identity"],
-            "version": pin["version"],
+            "name": identity,
+            "version": version,
             "license": license_str,
             "is_dev": False,  # SPM doesn't distinguish dev deps in Package.resolved
         })
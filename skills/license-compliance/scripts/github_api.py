@@ -2,15 +2,48 @@
 
 from __future__ import annotations
 
+import functools
 import json
+import os
+import re
 import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
-from urllib.error import URLError
+from urllib.error import HTTPError, URLError
 from urllib.parse import quote as urlquote, urlparse
-from urllib.request import Request, urlopen
+
+from http_client import http_get_conditional, http_post_with_headers
+from registry_cache import cache_can_revalidate, cache_get, cache_put, cached_fetch
+from util import json_loads
 
 
 _GITHUB_HOST = "github.com"
+GRAPHQL_URL = "https://api.github.com/graphql"
+# Repositories per GraphQL query; each aliased field is cheap on the rate limit
+GRAPHQL_BATCH_SIZE = 50
+MAX_LOOKUP_WORKERS = 8
+# `gh auth token` answers in well under 100ms; a broken gh install should
+# cost one second once (the result is memoized), not stall the scan
+GH_TOKEN_TIMEOUT = 1
+ORG_REPOS_PER_PAGE = 100
+# Below this many remaining requests for a resource (core, graphql), calls
+# wait for its rate-limit window to reset; lowered to a tenth of the
+# window's limit for small budgets (60/hour without a token)
+RATE_LIMIT_FLOOR = 100
+# Secondary rate limits carry no budget to wait for; back off from a minute,
+# doubling up to this cap, before giving up on the request
+SECONDARY_LIMIT_RETRIES = 3
+SECONDARY_LIMIT_BACKOFF_SECONDS = 60
+SECONDARY_LIMIT_MAX_WAIT_SECONDS = 120
+_LINK_NEXT_RE = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+# Last reported (remaining, reset epoch, floor) per rate-limit resource,
+# shared by every lookup thread
+_rate_limits: dict[str, tuple[int, int, int]] = {}
+_rate_limits_lock = threading.Lock()
 
 
 def _is_github_host(url: str) -> bool:
@@ -25,11 +58,19 @@ def _is_github_host(url: str) -> bool:
     return parsed.hostname == _GITHUB_HOST
 
 
+@functools.lru_cache(maxsize=4096)
 def extract_github_org_repo(url: str) -> Optional[tuple[str, str]]:
-    """Extract (org, repo) from a GitHub URL."""
+    """Extract (org, repo) from a GitHub URL.
+
+    Memoized: monorepo scans see the same dependency URLs many times.
+    """
     url = url.rstrip("/")
     if url.endswith(".git"):
         url = url[:-4]
+    # Cheap rejection for registry URLs, paths, etc. before any URL parsing;
+    # hostnames are case-insensitive
+    if _GITHUB_HOST not in url.lower():
+        return None
     if not _is_github_host(url):
         return None
     # Handle git@ SSH URLs: git@github.com:org/repo
@@ -48,27 +89,286 @@ def extract_github_org_repo(url: str) -> Optional[tuple[str, str]]:
     return None
 
 
-def lookup_github_license(owner: str, repo: str) -> Optional[str]:
-    """Look up a repo's license via GitHub API."""
-    url = f"https://api.github.com/repos/{urlquote(owner, safe='')}/{urlquote(repo, safe='')}/license"
-    headers = {"User-Agent": "license-check-scanner/1.0", "Accept": "application/vnd.github.v3+json"}
-    # Try to get auth token from gh CLI for higher rate limits
+@functools.lru_cache(maxsize=1)
+def _github_token() -> Optional[str]:
+    """GitHub token from GITHUB_TOKEN / GH_TOKEN or the gh CLI, resolved once per process."""
+    for var in ("GITHUB_TOKEN", "GH_TOKEN"):
+        token = os.environ.get(var, "").strip()
+        if token:
+            return token
     try:
         result = subprocess.run(
-            ["gh", "auth", "token"], capture_output=True, text=True, timeout=5
+            ["gh", "auth", "token"], capture_output=True, text=True, timeout=GH_TOKEN_TIMEOUT, check=False
         )
         if result.returncode == 0 and result.stdout.strip():
-            headers["Authorization"] = f"Bearer {result.stdout.strip()}"
-    except (subprocess.TimeoutExpired, FileNotFoundError):
+            return result.stdout.strip()
+    except (subprocess.TimeoutExpired, OSError):
         pass
+    return None
+
 
+def _github_headers() -> dict:
+    """Request headers for the GitHub API, authenticated when a token is available."""
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    # A token raises the rate limit from 60 to 5000 requests per hour
+    token = _github_token()
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def _parse_github_license(body: bytes) -> Optional[str]:
+    """Extract the SPDX id from a /repos/{owner}/{repo}/license response."""
     try:
-        req = Request(url, headers=headers)
-        with urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read())
-        spdx = data.get("license", {}).get("spdx_id", "")
-        if spdx and spdx != "NOASSERTION":
-            return spdx
-    except (URLError, json.JSONDecodeError, OSError, KeyError):
-        pass
+        spdx = json_loads(body).get("license", {}).get("spdx_id", "")
+    except (json.JSONDecodeError, AttributeError):
+        return None
+    if spdx and spdx != "NOASSERTION":
+        return spdx
     return None
+
+
+@functools.lru_cache(maxsize=4096)
+def lookup_github_license(owner: str, repo: str) -> Optional[str]:
+    """Look up a repo's license via GitHub API, consulting the on-disk cache first.
+
+    Cached per (owner, repo) since the result does not depend on a version;
+    stale entries are revalidated with a conditional request.
+    """
+    url = f"https://api.github.com/repos/{urlquote(owner, safe='')}/{urlquote(repo, safe='')}/license"
+    key = f"{owner}/{repo}".lower()
+    return cached_fetch(
+        "github", key, "", url, _parse_github_license, headers=_github_headers, fetch=_github_get_conditional
+    )
+
+
+def _github_get_conditional(url: str, headers: dict, timeout: float):
+    """http_get_conditional paced by the shared GitHub rate-limit handling."""
+    return _github_request("core", http_get_conditional, url, headers, timeout=timeout)
+
+
+def _graphql_licenses(repos: list[tuple[str, str]], headers: dict) -> Optional[dict]:
+    """Fetch licenseInfo.spdxId for up to GRAPHQL_BATCH_SIZE repos in one query.
+
+    Returns {(owner, repo): spdx_or_None}, or None if the query failed as a
+    whole (missing repositories just come back as None).
+    """
+    fields = " ".join(
+        f"r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(repo)}) {{ licenseInfo {{ spdxId }} }}"
+        for i, (owner, repo) in enumerate(repos)
+    )
+    nodes = _post_graphql(f"query {{ {fields} }}", headers)
+    if nodes is None:
+        return None
+
+    found = {}
+    for i, (owner, repo) in enumerate(repos):
+        spdx = ((nodes.get(f"r{i}") or {}).get("licenseInfo") or {}).get("spdxId")
+        lic = spdx if spdx and spdx != "NOASSERTION" else None
+        found[(owner, repo)] = lic
+        if lic:
+            cache_put("github", f"{owner}/{repo}".lower(), "", lic)
+    return found
+
+
+def _post_graphql(query: str, headers: dict) -> Optional[dict]:
+    """POST a GraphQL query; returns the (possibly partial) data object, or None on failure."""
+    payload = json.dumps({"query": query}).encode()
+    try:
+        body, _ = _github_request(
+            "graphql", http_post_with_headers, GRAPHQL_URL, payload, {**headers, "Content-Type": "application/json"}
+        )
+        data = json_loads(body)
+    except (URLError, OSError, json.JSONDecodeError):
+        return None
+    nodes = data.get("data") if isinstance(data, dict) else None
+    return nodes if isinstance(nodes, dict) else None
+
+
+def github_graphql(query: str) -> Optional[dict]:
+    """Run a GraphQL query over the shared keep-alive connection.
+
+    Returns the data object (fields for missing repositories are null), or
+    None if the query failed or no token is available (GraphQL needs auth).
+    """
+    headers = _github_headers()
+    if "Authorization" not in headers:
+        return None
+    return _post_graphql(query, headers)
+
+
+def github_repo_has_file(full_name: str, path: str) -> bool:
+    """Whether a repo's default branch contains path, via the contents API."""
+    owner, _, repo = full_name.partition("/")
+    url = (
+        f"https://api.github.com/repos/{urlquote(owner, safe='')}/{urlquote(repo, safe='')}"
+        f"/contents/{urlquote(path)}"
+    )
+    try:
+        _github_request("core", http_get_conditional, url, _github_headers(), timeout=10)
+    except (URLError, OSError):
+        return False
+    return True
+
+
+def lookup_github_licenses(repos: list[tuple[str, str]]) -> dict[tuple[str, str], Optional[str]]:
+    """Look up licenses for many (owner, repo) pairs.
+
+    Fresh cache entries are used as-is, and stale ones with an ETag are
+    revalidated over REST, where a 304 costs no rate limit. With a token,
+    the remaining repos go to the GraphQL API GRAPHQL_BATCH_SIZE at a time;
+    GraphQL needs auth, so without one (or for a failed batch) they fall
+    back to concurrent per-repo REST lookups.
+    """
+    results = {}
+    misses = []
+    rest = []
+    for owner, repo in dict.fromkeys(repos):
+        key = f"{owner}/{repo}".lower()
+        cached = cache_get("github", key)
+        if cached:
+            results[(owner, repo)] = cached
+        elif cache_can_revalidate("github", key):
+            rest.append((owner, repo))
+        else:
+            misses.append((owner, repo))
+
+    headers = _github_headers() if misses else {}
+    if "Authorization" not in headers:
+        rest.extend(misses)
+    else:
+        for start in range(0, len(misses), GRAPHQL_BATCH_SIZE):
+            batch = misses[start:start + GRAPHQL_BATCH_SIZE]
+            found = _graphql_licenses(batch, headers)
+            if found is None:
+                rest.extend(batch)
+            else:
+                results.update(found)
+
+    if rest:
+        with ThreadPoolExecutor(max_workers=min(MAX_LOOKUP_WORKERS, len(rest))) as pool:
+            results.update(zip(rest, pool.map(lambda gh: lookup_github_license(*gh), rest)))
+    return results
+
+
+def list_org_repos(owner: str, etags: Optional[list[str]] = None) -> tuple[Optional[list[dict]], list[str]]:
+    """List an org's (or user's) repos via the REST API, most recently pushed first.
+
+    etags holds each listing page's ETag from the previous call, and every
+    page is requested with If-None-Match. Unchanged pages (304, free against
+    the rate limit) are not re-read, so repos only holds the repos on pages
+    that changed, or is None when none did. Returns (repos, etags). Errors
+    raise URLError.
+    """
+    etags = etags or []
+    headers = _github_headers()
+    query = f"repos?per_page={ORG_REPOS_PER_PAGE}&sort=pushed&direction=desc"
+
+    def get_page(base: str, page: int):
+        url = base if page == 1 else f"{base}&page={page}"
+        etag = etags[page - 1] if page <= len(etags) else None
+        page_headers = {**headers, "If-None-Match": etag} if etag else headers
+        return _github_request("core", http_get_conditional, url, page_headers, timeout=30)
+
+    base = f"https://api.github.com/orgs/{urlquote(owner, safe='')}/{query}"
+    try:
+        body, resp_headers = get_page(base, 1)
+    except HTTPError as e:
+        if e.code != 404:
+            raise
+        # Not an org: same listing for a user account
+        base = f"https://api.github.com/users/{urlquote(owner, safe='')}/{query}"
+        body, resp_headers = get_page(base, 1)
+
+    repos: Optional[list[dict]] = None
+    new_etags = []
+    page = 1
+    while True:
+        if body is None:
+            # Unchanged, including whether another page followed it
+            new_etags.append(etags[page - 1])
+            if page >= len(etags):
+                return repos, new_etags
+        else:
+            new_etags.append(resp_headers.get("ETag") or "")
+            if repos is None:
+                repos = []
+            try:
+                repos.extend(json_loads(body))
+            except json.JSONDecodeError as e:
+                raise URLError(f"invalid repo listing JSON: {e}") from e
+            if not _LINK_NEXT_RE.search(resp_headers.get("Link", "")):
+                return repos, new_etags
+        page += 1
+        body, resp_headers = get_page(base, page)
+
+
+def _github_request(resource: str, request, *args, **kwargs):
+    """Make one GitHub API request, pacing on the rate limit.
+
+    request is an http_client function returning (body, headers). Waits
+    first if the resource's budget is nearly spent, and retries with backoff
+    when GitHub answers with a rate-limit error instead of failing the scan.
+    """
+    for attempt in range(SECONDARY_LIMIT_RETRIES + 1):
+        _wait_for_rate_limit(resource)
+        try:
+            result = request(*args, **kwargs)
+        except HTTPError as e:
+            _note_rate_limit(resource, e.headers)
+            delay = _rate_limit_backoff(e, attempt)
+            if delay is None or attempt == SECONDARY_LIMIT_RETRIES:
+                raise
+            if delay:
+                print(f"  GitHub secondary rate limit hit; retrying in {delay:.0f}s", file=sys.stderr)
+                time.sleep(delay)
+            continue
+        _note_rate_limit(resource, result[1])
+        return result
+
+
+def _rate_limit_backoff(err: HTTPError, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying a rate-limited request, or None if err is not a rate limit.
+
+    0 means the primary budget is exhausted; _wait_for_rate_limit then waits for the reset.
+    """
+    if err.code not in (403, 429):
+        return None
+    if err.headers.get("X-RateLimit-Remaining") == "0":
+        return 0
+    retry_after = (err.headers.get("Retry-After") or "").strip()
+    if retry_after.isdigit():
+        return min(int(retry_after), SECONDARY_LIMIT_MAX_WAIT_SECONDS)
+    # A 403 is also a plain permission error; only the message tells them apart
+    if err.code == 403 and b"rate limit" not in (err.read() or b"").lower():
+        return None
+    return min(SECONDARY_LIMIT_BACKOFF_SECONDS * 2 ** attempt, SECONDARY_LIMIT_MAX_WAIT_SECONDS)
+
+
+def _note_rate_limit(resource: str, resp_headers) -> None:
+    """Record the budget a response reports, keyed by the resource it counts against."""
+    if resp_headers is None:
+        return
+    try:
+        remaining = int(resp_headers.get("X-RateLimit-Remaining", ""))
+        reset = int(resp_headers.get("X-RateLimit-Reset", ""))
+    except ValueError:
+        return
+    try:
+        floor = min(RATE_LIMIT_FLOOR, int(resp_headers.get("X-RateLimit-Limit", "")) // 10)
+    except ValueError:
+        floor = RATE_LIMIT_FLOOR
+    with _rate_limits_lock:
+        _rate_limits[resp_headers.get("X-RateLimit-Resource") or resource] = (remaining, reset, floor)
+
+
+def _wait_for_rate_limit(resource: str) -> None:
+    """Sleep until the rate-limit reset when the last response showed the budget nearly spent."""
+    with _rate_limits_lock:
+        remaining, reset, floor = _rate_limits.get(resource, (RATE_LIMIT_FLOOR, 0, RATE_LIMIT_FLOOR))
+    if remaining >= floor:
+        return
+    delay = reset - time.time()
+    if delay > 0:
+        print(f"  GitHub {resource} rate limit low ({remaining} left); waiting {delay:.0f}s for reset", file=sys.stderr)
+        time.sleep(delay)
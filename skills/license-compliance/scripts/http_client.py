@@ -0,0 +1,241 @@
+"""Keep-alive HTTP client shared by the registry and GitHub lookups.
+
+Provides GET, conditional GET (ETag / If-Modified-Since), streaming GET and
+POST helpers over per-thread persistent connections, with retries on
+429/5xx responses.
+
+Lookups run on small per-ecosystem thread pools rather than an asyncio
+event loop: the scripts have no required third-party dependencies, the
+work is network-bound (the GIL is released while waiting on sockets), and
+registries rate-limit well before thread overhead matters.
+"""
+
+from __future__ import annotations
+
+import functools
+import gzip
+import http.client
+import io
+import ssl
+import threading
+import time
+import zlib
+from email.message import Message
+from typing import Callable, Optional
+from urllib.error import HTTPError, URLError
+from urllib.parse import urljoin, urlsplit
+
+USER_AGENT = "license-check-scanner/1.0"
+_MAX_REDIRECTS = 5
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+# Rate limiting (429) and transient server errors are retried with backoff,
+# honouring Retry-After up to a cap so one slow registry cannot stall a scan
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+_MAX_RETRIES = 3
+_RETRY_BACKOFF_SECONDS = 0.3
+_MAX_RETRY_AFTER_SECONDS = 30
+_STREAM_CHUNK_SIZE = 16 * 1024
+# When a stream stops early, draining up to this much keeps the connection
+# reusable; that is cheaper than a new TLS handshake
+_STREAM_DRAIN_LIMIT = 64 * 1024
+
+# One connection per (scheme, host, port) per thread: http.client connections
+# are not thread-safe, and lookups run on thread pools
+_local = threading.local()
+
+
+@functools.lru_cache(maxsize=1)
+def _ssl_context() -> ssl.SSLContext:
+    """One verified TLS context for every HTTPS connection.
+
+    HTTPSConnection otherwise builds a context, and reloads the CA bundle,
+    for each new connection; SSLContext is safe to share across threads.
+    """
+    return ssl.create_default_context()
+
+
+def _connection(scheme: str, host: str, port: Optional[int], timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+    """Return (connection, reused) for the calling thread."""
+    conns = _local.__dict__.setdefault("conns", {})
+    key = (scheme, host, port)
+    conn = conns.get(key)
+    if conn is not None:
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+    if scheme == "https":
+        conn = http.client.HTTPSConnection(host, port, timeout=timeout, context=_ssl_context())
+    else:
+        conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    conns[key] = conn
+    return conn, False
+
+
+def _drop_connection(scheme: str, host: str, port: Optional[int]) -> None:
+    conn = _local.__dict__.get("conns", {}).pop((scheme, host, port), None)
+    if conn is not None:
+        conn.close()
+
+
+def http_get(url: str, headers: Optional[dict] = None, timeout: float = 10) -> bytes:
+    """GET a URL over a reused keep-alive connection and return the body.
+
+    Requests gzip and decompresses it, follows redirects, and retries 429 /
+    transient 5xx responses with backoff. Failures are
+    raised as URLError (HTTPError, with the error body readable, for non-200
+    statuses) so callers keep their existing urlopen error handling.
+    """
+    body, resp_headers = http_get_conditional(url, headers, timeout)
+    if body is None:
+        raise HTTPError(url, 304, "Not Modified", resp_headers, None)
+    return body
+
+
+def http_post_with_headers(
+    url: str, data: bytes, headers: Optional[dict] = None, timeout: float = 10
+) -> tuple[bytes, Message]:
+    """POST data with the same handling as http_get; returns (body, response_headers)."""
+    resp, conn_key, url = _open(url, headers, timeout, "POST", data)
+    body = _read_all(resp, conn_key)
+    if resp.status != 200:
+        raise HTTPError(url, resp.status, resp.reason, resp.headers, io.BytesIO(body))
+    return body, resp.headers
+
+
+def _open(
+    url: str, headers: Optional[dict], timeout: float, method: str = "GET", data: Optional[bytes] = None
+) -> tuple[http.client.HTTPResponse, tuple, str]:
+    """Send a request, following redirects; returns (response, conn_key, final_url).
+
+    The final response body is left unread for the caller.
+    """
+    req_headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip"}
+    if headers:
+        req_headers.update(headers)
+
+    redirects = retries = 0
+    while redirects <= _MAX_REDIRECTS:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise URLError(f"unsupported URL: {url}")
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        conn_key = (parts.scheme, parts.hostname, parts.port)
+
+        while True:
+            conn, reused = _connection(*conn_key, timeout)
+            try:
+                conn.request(method, target, body=data, headers=req_headers)
+                resp = conn.getresponse()
+                break
+            except (http.client.HTTPException, OSError) as e:
+                _drop_connection(*conn_key)
+                # The server may have closed an idle keep-alive socket; retry once fresh
+                if reused and isinstance(e, (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)):
+                    continue
+                raise URLError(e) from e
+
+        if resp.status in _REDIRECT_STATUSES and resp.getheader("Location"):
+            _read_all(resp, conn_key)
+            url = urljoin(url, resp.getheader("Location"))
+            if resp.status not in (307, 308):
+                method, data = "GET", None
+            redirects += 1
+            continue
+        if resp.status in _RETRY_STATUSES and retries < _MAX_RETRIES:
+            _read_all(resp, conn_key)
+            time.sleep(_retry_delay(resp, retries))
+            retries += 1
+            continue
+        return resp, conn_key, url
+
+    raise URLError(f"too many redirects: {url}")
+
+
+def _retry_delay(resp: http.client.HTTPResponse, attempt: int) -> float:
+    """Exponential backoff, stretched to the server's Retry-After (in seconds) when given."""
+    delay = _RETRY_BACKOFF_SECONDS * (2 ** attempt)
+    retry_after = (resp.getheader("Retry-After") or "").strip()
+    if retry_after.isdigit():
+        delay = max(delay, min(int(retry_after), _MAX_RETRY_AFTER_SECONDS))
+    return delay
+
+
+def _read_all(resp: http.client.HTTPResponse, conn_key: tuple) -> bytes:
+    """Read a whole (possibly gzipped) body, releasing the connection for reuse."""
+    try:
+        body = resp.read()
+    except (http.client.HTTPException, OSError) as e:
+        _drop_connection(*conn_key)
+        raise URLError(e) from e
+    if resp.will_close:
+        _drop_connection(*conn_key)
+    if resp.getheader("Content-Encoding", "").lower() == "gzip":
+        try:
+            body = gzip.decompress(body)
+        except (OSError, EOFError) as e:
+            raise URLError(e) from e
+    return body
+
+
+def http_get_conditional(
+    url: str, headers: Optional[dict] = None, timeout: float = 10
+) -> tuple[Optional[bytes], Message]:
+    """Like http_get, but returns (body, response_headers).
+
+    The body is None on a 304, for callers that sent If-None-Match or
+    If-Modified-Since validators.
+    """
+    resp, conn_key, url = _open(url, headers, timeout)
+    body = _read_all(resp, conn_key)
+    if resp.status == 304:
+        return None, resp.headers
+    if resp.status != 200:
+        raise HTTPError(url, resp.status, resp.reason, resp.headers, io.BytesIO(body))
+    return body, resp.headers
+
+
+def http_get_stream(
+    url: str, consume: Callable[[bytes], bool], headers: Optional[dict] = None, timeout: float = 10
+) -> Optional[Message]:
+    """GET a URL and hand the (decompressed) body to consume chunk by chunk.
+
+    consume returns True once it has what it needs; unless only a little of
+    the body is left, the rest is skipped and the connection closed rather
+    than drained. Returns the response headers, or None on a 304 (as for
+    http_get_conditional). Errors are raised as for http_get; exceptions
+    from consume propagate.
+    """
+    resp, conn_key, url = _open(url, headers, timeout)
+    if resp.status == 304:
+        _read_all(resp, conn_key)
+        return None
+    if resp.status != 200:
+        body = _read_all(resp, conn_key)
+        raise HTTPError(url, resp.status, resp.reason, resp.headers, io.BytesIO(body))
+
+    decoder = None
+    if resp.getheader("Content-Encoding", "").lower() == "gzip":
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    finished = False
+    try:
+        while True:
+            raw = resp.read(_STREAM_CHUNK_SIZE)
+            if not raw:
+                tail = decoder.flush() if decoder is not None else b""
+                if tail:
+                    consume(tail)
+                finished = True
+                break
+            chunk = decoder.decompress(raw) if decoder is not None else raw
+            if chunk and consume(chunk):
+                if resp.length is not None and resp.length <= _STREAM_DRAIN_LIMIT:
+                    resp.read()
+                    finished = True
+                break
+    except (http.client.HTTPException, OSError, zlib.error) as e:
+        raise URLError(e) from e
+    finally:
+        if not finished or resp.will_close:
+            _drop_connection(*conn_key)
+    return resp.headers
@@ -12,8 +12,10 @@ Outputs JSON to stdout for downstream formatting.
 from __future__ import annotations
 
 import json
+import os
 import sys
 import argparse
+import glob
 import tempfile
 import shutil
 import time
@@ -21,7 +23,9 @@ from pathlib import Path
 from typing import Optional
 
 from config import SCRIPT_DIR, DEFAULT_CONFIG, load_config
-from util import run_command
+from util import json_dumps, json_loads, run_command
+from github_api import extract_github_org_repo
+from manifest_index import ManifestIndex
 from classify import classify_packages
 from blame import trace_blame_for_violations
 from ecosystems import (
@@ -36,28 +40,81 @@ from ecosystems import (
     extract_licenses_solidity,
 )
 
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: fall back to a text match
+    tomllib = None
+
+try:
+    # PyYAML is optional; without it pnpm-workspace.yaml falls back to the line parser
+    import yaml
+    _YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+except ImportError:
+    yaml = None
+
+# Media and fonts no scanner or package manager reads; left out of the sparse
+# checkout so they are never written to the temp clone. Archives stay: file:
+# tarball deps, yarn zero-install caches and vendored jars are dependency inputs.
+CLONE_SKIP_PATTERNS = (
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico", "*.psd",
+    "*.mp4", "*.mov", "*.webm", "*.mp3", "*.wav",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+)
+# Clone and install logs are only shown when a step fails; the end of the log
+# holds the error, so only this much of it is kept
+COMMAND_LOG_TAIL_BYTES = 64 * 1024
+
+
+def _print_result(result: dict) -> None:
+    """Write the scan result as indented JSON to stdout."""
+    print(json_dumps(result, indent=True))
+
 
-def detect_package_manager(project_path: Path) -> Optional[str]:
-    """Detect package manager from lockfiles or package.json."""
+def _declares_poetry_packages(pyproject: Path) -> bool:
+    """Whether pyproject.toml sets tool.poetry.packages (table or inline form)."""
+    try:
+        with open(pyproject, "rb") as f:
+            if tomllib is not None:
+                try:
+                    data = tomllib.load(f)
+                except tomllib.TOMLDecodeError:
+                    return False
+                tool = data.get("tool", {})
+                return bool(tool.get("poetry", {}).get("packages"))
+            return b"[tool.poetry.packages]" in f.read()
+    except OSError:
+        return False
+
+
+def detect_package_manager(project_path: Path, index: Optional[ManifestIndex] = None) -> Optional[str]:
+    """Detect package manager from lockfiles or package.json.
+
+    Pass the same index later given to scan_project to avoid walking the tree twice.
+    """
+    # One directory listing instead of a stat() per candidate file
+    try:
+        with os.scandir(project_path) as it:
+            names = {entry.name for entry in it}
+    except OSError:
+        names = set()
 
     # Solidity (Foundry / Hardhat) — check BEFORE JS/TS since Foundry projects
     # often also have package.json for npm deps
-    if (project_path / "foundry.toml").exists():
+    if "foundry.toml" in names:
         return "solidity"
 
-    if (project_path / "pnpm-lock.yaml").exists():
+    if "pnpm-lock.yaml" in names:
         return "pnpm"
-    if (project_path / "yarn.lock").exists():
+    if "yarn.lock" in names:
         return "yarn"
-    if (project_path / "package-lock.json").exists():
+    if "package-lock.json" in names:
         return "npm"
 
     # Fallback: packageManager field in package.json
-    pkg_json = project_path / "package.json"
-    if pkg_json.exists():
+    if "package.json" in names:
         try:
-            with open(pkg_json) as f:
-                pkg = json.load(f)
+            with open(project_path / "package.json", "rb") as f:
+                pkg = json_loads(f.read())
             pm = pkg.get("packageManager", "")
             if pm.startswith("pnpm"):
                 return "pnpm"
@@ -69,46 +126,81 @@ def detect_package_manager(project_path: Path) -> Optional[str]:
             pass
 
     # Rust
-    if (project_path / "Cargo.lock").exists() or (project_path / "Cargo.toml").exists():
+    if "Cargo.lock" in names or "Cargo.toml" in names:
         return "cargo"
 
     # Kotlin/Gradle (check for version catalog or build files)
-    if (project_path / "gradle" / "libs.versions.toml").exists():
+    if "gradle" in names and (project_path / "gradle" / "libs.versions.toml").exists():
         return "gradle"
-    if any((project_path / f).exists() for f in ("build.gradle.kts", "build.gradle", "settings.gradle.kts")):
+    if not names.isdisjoint(("build.gradle.kts", "build.gradle", "settings.gradle.kts")):
         return "gradle"
 
     # Swift (SPM)
-    if find_package_resolved(project_path):
+    if find_package_resolved(project_path, index):
         return "swift"
 
     # Dart (pub)
-    if (project_path / "pubspec.lock").exists() or (project_path / "pubspec.yaml").exists():
+    if "pubspec.lock" in names or "pubspec.yaml" in names:
         return "dart"
 
     # Go (modules)
-    if (project_path / "go.sum").exists() or (project_path / "go.mod").exists():
+    if "go.sum" in names or "go.mod" in names:
         return "go"
 
     # C# (NuGet)
-    if (project_path / "Directory.Packages.props").exists():
+    if "Directory.Packages.props" in names:
         return "csharp"
-    if list(project_path.glob("*.csproj")) or list(project_path.glob("*.sln")):
+    if any(name.endswith((".csproj", ".sln")) for name in names):
         return "csharp"
 
     # Python (check lockfiles in priority order)
-    if (project_path / "poetry.lock").exists():
+    if "poetry.lock" in names:
         return "poetry"
-    if (project_path / "uv.lock").exists():
+    if "uv.lock" in names:
         return "uv"
-    if (project_path / "Pipfile.lock").exists():
+    if "Pipfile.lock" in names:
         return "pipenv"
-    if (project_path / "requirements.txt").exists():
+    if "requirements.txt" in names:
         return "pip"
 
     return None
 
 
+def _pnpm_workspace_globs(ws_file: Path) -> list[str]:
+    """Read the packages: globs from pnpm-workspace.yaml."""
+    if yaml is not None:
+        try:
+            with open(ws_file, "rb") as f:
+                data = yaml.load(f, Loader=_YAML_LOADER)
+        except yaml.YAMLError:
+            pass
+        else:
+            packages = data.get("packages") if isinstance(data, dict) else None
+            if not isinstance(packages, list):
+                return []
+            return [p for p in packages if isinstance(p, str)]
+    return _pnpm_workspace_globs_lines(ws_file)
+
+
+def _pnpm_workspace_globs_lines(ws_file: Path) -> list[str]:
+    """Line-based packages: reader, used when PyYAML is unavailable or rejects the file."""
+    globs = []
+    with open(ws_file) as f:
+        in_packages = False
+        for line in f:
+            stripped = line.strip()
+            if stripped == "packages:":
+                in_packages = True
+                continue
+            if in_packages:
+                if stripped.startswith("- "):
+                    glob_pattern = stripped[2:].strip().strip("'\"")
+                    globs.append(glob_pattern)
+                elif stripped and not stripped.startswith("#"):
+                    break
+    return globs
+
+
 def detect_workspaces(project_path: Path, pm: str) -> list[Path]:
     """Detect workspace directories in a monorepo."""
     globs = []
@@ -116,25 +208,13 @@ def detect_workspaces(project_path: Path, pm: str) -> list[Path]:
     if pm == "pnpm":
         ws_file = project_path / "pnpm-workspace.yaml"
         if ws_file.exists():
-            with open(ws_file) as f:
-                in_packages = False
-                for line in f:
-                    stripped = line.strip()
-                    if stripped == "packages:":
-                        in_packages = True
-                        continue
-                    if in_packages:
-                        if stripped.startswith("- "):
-                            glob_pattern = stripped[2:].strip().strip("'\"")
-                            globs.append(glob_pattern)
-                        elif stripped and not stripped.startswith("#"):
-                            break
+            globs = _pnpm_workspace_globs(ws_file)
     else:
         pkg_json = project_path / "package.json"
         if pkg_json.exists():
             try:
-                with open(pkg_json) as f:
-                    pkg = json.load(f)
+                with open(pkg_json, "rb") as f:
+                    pkg = json_loads(f.read())
                 ws = pkg.get("workspaces", [])
                 if isinstance(ws, dict):
                     ws = ws.get("packages", [])
@@ -142,24 +222,22 @@ def detect_workspaces(project_path: Path, pm: str) -> list[Path]:
             except (json.JSONDecodeError, OSError):
                 pass
 
-    # Resolve globs to directories
+    # Resolve globs to directories. Globbing for <pattern>/package.json lets
+    # glob's scandir-based matching find the manifests instead of stat()ing
+    # each candidate directory afterwards.
     workspace_dirs = []
-    import glob as globmod
+    root = glob.escape(str(project_path))
     for pattern in globs:
         # Remove trailing /* or /** if present
         clean = pattern.rstrip("/")
         if clean.endswith("/*"):
             clean = clean[:-2]
             # Expand one level
-            for match in sorted(globmod.glob(str(project_path / clean / "*"))):
-                p = Path(match)
-                if p.is_dir() and (p / "package.json").exists():
-                    workspace_dirs.append(p)
+            for match in sorted(glob.glob(f"{root}/{clean}/*/package.json")):
+                workspace_dirs.append(Path(match).parent)
         elif "*" in clean:
-            for match in sorted(globmod.glob(str(project_path / clean))):
-                p = Path(match)
-                if p.is_dir() and (p / "package.json").exists():
-                    workspace_dirs.append(p)
+            for match in sorted(glob.glob(f"{root}/{clean}/package.json")):
+                workspace_dirs.append(Path(match).parent)
         else:
             p = project_path / clean
             if p.is_dir() and (p / "package.json").exists():
@@ -172,20 +250,30 @@ def clone_and_install(repo: str, ref: Optional[str] = None) -> tuple[Optional[Pa
     """Clone a GitHub repo to a temp dir and install deps. Returns (path, pm)."""
     tmpdir = Path(tempfile.mkdtemp(prefix="license-check-"))
 
-    # Normalize repo arg: strip GitHub URL prefixes to get org/repo
-    from urllib.parse import urlparse as _urlparse
-    parsed = _urlparse(repo if "://" in repo else "https://" + repo)
-    if parsed.hostname == "github.com":
-        repo = parsed.path.strip("/")
+    # Normalize repo arg: GitHub URLs (https, bare or SSH) become org/repo
+    gh = extract_github_org_repo(repo)
+    if gh:
+        repo = "/".join(gh)
     repo = repo.rstrip("/")
 
-    # Clone
-    clone_cmd = ["gh", "repo", "clone", repo, str(tmpdir), "--", "--depth", "1"]
+    # Clone: shallow, checked out sparsely below. Not blobless: blame walks
+    # the history with git log -S/-G and deepens the clone, and a partial
+    # clone would fetch every commit's blobs lazily, one round trip each.
+    clone_cmd = [
+        "gh", "repo", "clone", repo, str(tmpdir), "--",
+        "--depth", "1", "--no-checkout",
+    ]
     if ref:
         clone_cmd.extend(["--branch", ref])
 
     print(f"Cloning {repo}...", file=sys.stderr)
-    ok, msg = run_command(clone_cmd, timeout=120)
+    ok, msg = run_command(clone_cmd, timeout=120, tail_bytes=COMMAND_LOG_TAIL_BYTES)
+    if ok:
+        sparse_cmd = ["git", "sparse-checkout", "set", "--no-cone", "/*"]
+        sparse_cmd.extend("!" + pattern for pattern in CLONE_SKIP_PATTERNS)
+        # Older git without sparse-checkout still gets a full checkout below
+        run_command(sparse_cmd, cwd=str(tmpdir), timeout=60, tail_bytes=COMMAND_LOG_TAIL_BYTES)
+        ok, msg = run_command(["git", "checkout"], cwd=str(tmpdir), timeout=120, tail_bytes=COMMAND_LOG_TAIL_BYTES)
     if not ok:
         shutil.rmtree(tmpdir, ignore_errors=True)
         print(f"Clone failed: {msg}", file=sys.stderr)
@@ -211,7 +299,7 @@ def clone_and_install(repo: str, ref: Optional[str] = None) -> tuple[Optional[Pa
     }
     cmd = install_cmds[pm]
     print(f"Installing dependencies with {pm}...", file=sys.stderr)
-    ok, msg = run_command(cmd, cwd=str(tmpdir), timeout=600)
+    ok, msg = run_command(cmd, cwd=str(tmpdir), timeout=600, tail_bytes=COMMAND_LOG_TAIL_BYTES)
     if not ok:
         shutil.rmtree(tmpdir, ignore_errors=True)
         print(f"Install failed: {msg}", file=sys.stderr)
@@ -220,9 +308,13 @@ def clone_and_install(repo: str, ref: Optional[str] = None) -> tuple[Optional[Pa
     return tmpdir, pm
 
 
-def scan_project(project_path: Path, pm: str, prod_only: bool, config: dict, verbose: bool) -> dict:
+def scan_project(
+    project_path: Path, pm: str, prod_only: bool, config: dict, verbose: bool,
+    index: Optional[ManifestIndex] = None,
+) -> dict:
     """Scan a project and return results dict."""
     start = time.time()
+    index = index or ManifestIndex(project_path)
 
     is_monorepo = False
     workspace_count = 0
@@ -241,21 +333,21 @@ def scan_project(project_path: Path, pm: str, prod_only: bool, config: dict, ver
     elif pm == "swift":
         # Swift: parse Package.resolved + GitHub API lookup
         ecosystem = "github"
-        packages = extract_licenses_swift(project_path)
+        packages = extract_licenses_swift(project_path, index)
         if not packages:
             return {"error": "No Package.resolved found or no dependencies.", "project": str(project_path)}
 
     elif pm == "gradle":
         # Kotlin/Gradle: parse version catalog + Maven Central POM lookup
         ecosystem = "maven"
-        packages, is_monorepo, workspace_count = extract_licenses_gradle(project_path)
+        packages, is_monorepo, workspace_count = extract_licenses_gradle(project_path, index)
         if not packages:
             return {"error": "No dependencies found in Gradle project.", "project": str(project_path)}
 
     elif pm == "dart":
         # Dart: parse pubspec.lock/yaml + pub.dev/GitHub API lookup
         ecosystem = "github"
-        packages, is_monorepo, workspace_count = extract_licenses_dart(project_path)
+        packages, is_monorepo, workspace_count = extract_licenses_dart(project_path, index)
         if not packages:
             return {"error": "No pubspec.lock/yaml found or no hosted dependencies.", "project": str(project_path)}
 
@@ -269,7 +361,7 @@ def scan_project(project_path: Path, pm: str, prod_only: bool, config: dict, ver
     elif pm == "csharp":
         # C#: parse .csproj/Directory.Packages.props + NuGet API lookup
         ecosystem = "nuget"
-        packages, is_monorepo, workspace_count = extract_licenses_csharp(project_path)
+        packages, is_monorepo, workspace_count = extract_licenses_csharp(project_path, index)
         if not packages:
             return {"error": "No .csproj files found or no NuGet dependencies.", "project": str(project_path)}
 
@@ -298,13 +390,7 @@ def scan_project(project_path: Path, pm: str, prod_only: bool, config: dict, ver
         if pm in ("poetry", "uv"):
             pyproject = project_path / "pyproject.toml"
             if pyproject.exists():
-                try:
-                    with open(pyproject) as f:
-                        content = f.read()
-                    if "[tool.poetry.packages]" in content:
-                        is_monorepo = True
-                except OSError:
-                    pass
+                is_monorepo = _declares_poetry_packages(pyproject)
 
     else:
         # JS/TS: existing extraction
@@ -412,6 +498,7 @@ def main() -> None:
     config = load_config(args.config)
 
     tmpdir = None
+    index = None
     try:
         if args.repo:
             tmpdir, pm = clone_and_install(args.repo, args.ref)
@@ -420,7 +507,8 @@ def main() -> None:
             project_path = tmpdir
         else:
             project_path = args.path or Path.cwd()
-            pm = detect_package_manager(project_path)
+            index = ManifestIndex(project_path)
+            pm = detect_package_manager(project_path, index)
             if not pm:
                 print(json.dumps({
                     "error": "No lockfile found. Expected pnpm-lock.yaml, yarn.lock, package-lock.json, Cargo.toml, poetry.lock, uv.lock, Pipfile.lock, or requirements.txt.",
@@ -428,8 +516,8 @@ def main() -> None:
                 }))
                 sys.exit(1)
 
-        result = scan_project(project_path, pm, args.prod_only, config, args.verbose)
-        print(json.dumps(result, indent=2))
+        result = scan_project(project_path, pm, args.prod_only, config, args.verbose, index)
+        _print_result(result)
 
         # Exit with non-zero if HIGH violations found
         if result.get("has_violations"):
@@ -0,0 +1,59 @@
+"""Shared index of manifest files, built with one pruned walk per project."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+
+from util import walk_project
+
+# File name -> index kind; suffix matches are handled in _scan
+_MANIFEST_NAMES = {
+    "pubspec.yaml": "pubspec",
+    "build.gradle.kts": "gradle_kts",
+    "go.sum": "gosum",
+    "go.mod": "gomod",
+    "go.work": "gowork",
+}
+_MANIFEST_SUFFIXES = {".csproj": "csproj"}
+_BUNDLE_SUFFIXES = {".xcodeproj": "xcodeproj", ".xcworkspace": "xcworkspace"}
+
+
+class ManifestIndex:
+    """Manifest paths under a project root, grouped by kind.
+
+    The walk happens lazily on first lookup, so projects whose package
+    manager never needs a tree search (e.g. JS, Rust) pay nothing.
+    Kinds: csproj, pubspec, gradle_kts, gosum, gomod, gowork (files) and
+    xcodeproj, xcworkspace (bundle directories).
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._paths: Optional[dict[str, list[Path]]] = None
+
+    def paths(self, kind: str) -> list[Path]:
+        """Return the paths of one kind, in walk order."""
+        if self._paths is None:
+            self._paths = self._scan()
+        return self._paths.get(kind, [])
+
+    def _scan(self) -> dict[str, list[Path]]:
+        found = defaultdict(list)
+        for dirpath, dirnames, filenames in walk_project(self.root):
+            base = Path(dirpath)
+            for d in dirnames:
+                for suffix, kind in _BUNDLE_SUFFIXES.items():
+                    if d.endswith(suffix):
+                        found[kind].append(base / d)
+            for fname in filenames:
+                kind = _MANIFEST_NAMES.get(fname)
+                if kind is None:
+                    for suffix, suffix_kind in _MANIFEST_SUFFIXES.items():
+                        if fname.endswith(suffix):
+                            kind = suffix_kind
+                            break
+                if kind is not None:
+                    found[kind].append(base / fname)
+        return dict(found)
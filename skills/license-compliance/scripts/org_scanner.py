@@ -15,101 +15,232 @@ import subprocess
 import json
 import sys
 import os
-import argparse
+import re
 import time
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
+from operator import itemgetter
 from pathlib import Path
 from typing import Optional
+from urllib.error import URLError
+
+from github_api import github_graphql, github_repo_has_file, list_org_repos
+from http_client import http_get
+from registry_cache import cache_get, cache_put
+from util import json_dumps, json_loads
 
 SCRIPT_DIR = Path(__file__).parent.resolve()
 LICENSE_CHECK = SCRIPT_DIR / "license_check.py"
 
 SUPPORTED_LANGUAGES = {"JavaScript", "TypeScript", "Rust", "Python", "Dart", "Go", "C#", "Kotlin", "Swift", "Solidity"}
+# Left out of the report's "Unsupported Languages" ranking: supported languages,
+# config/markup languages without package ecosystems, and repos with no language
+UNSUPPORTED_REPORT_EXCLUDED = frozenset(SUPPORTED_LANGUAGES) | {
+    "Unknown", "HCL", "Shell", "MDX", "TeX", "Jsonnet", "Dockerfile", "CSS", "Jupyter Notebook",
+}
+
+# Concurrent GitHub API calls; kept low to stay clear of GitHub's secondary rate limits
+MAX_GH_WORKERS = 8
+# Repo scans run as separate license_check.py processes (clone + install + scan),
+# each with its own temp clone, node_modules tree and gh API traffic, so they
+# run one at a time unless --max-concurrent asks for more
+DEFAULT_MAX_CONCURRENT_SCANS = 1
+# During scans, per-repo results are appended to a delta log and the full
+# tracker is rewritten (compacted) only every this many repos
+TRACKER_COMPACT_EVERY = 100
+# Concurrent registry requests when fetching package descriptions
+MAX_DESCRIPTION_WORKERS = 8
+# The report is streamed to disk through a buffer this large rather than built in memory
+REPORT_WRITE_BUFFER_SIZE = 1 << 20
+# Report appendix sections, in display order
+APPENDIX_CLASS_LABELS = {
+    "restrictive": "Restrictive",
+    "weak_copyleft": "Weak Copyleft",
+    "custom": "Custom",
+    "unknown": "Unknown",
+}
+# Repos per GraphQL file-probe query (each asks for up to five files)
+GRAPHQL_PROBE_BATCH_SIZE = 40
+
+# Map language to the primary file to check via GitHub API
+LANGUAGE_LOCKFILES = {
+    "JavaScript": "package.json",
+    "TypeScript": "package.json",
+    "Rust": "Cargo.toml",
+    "Python": "pyproject.toml",  # Check pyproject.toml first; poetry.lock/uv.lock/etc are optional
+    "Dart": "pubspec.yaml",
+    "Go": "go.mod",
+    "C#": "Directory.Packages.props",
+    "Kotlin": "gradle/libs.versions.toml",
+    "Swift": "Package.resolved",
+    "Solidity": "foundry.toml",
+}
+# Fallback files for languages where the primary may not be at root
+LANGUAGE_FALLBACKS = {
+    "Python": ["poetry.lock", "uv.lock", "Pipfile.lock", "requirements.txt"],
+    "Kotlin": ["build.gradle.kts", "build.gradle", "settings.gradle.kts"],
+    "Swift": [".package.resolved", "Package.swift"],
+    "Solidity": ["hardhat.config.js", "hardhat.config.ts"],
+}
+LANGUAGE_SKIP_REASONS = {
+    "Rust": "no_cargo_toml",
+    "Python": "no_python_lockfile",
+    "Dart": "no_pubspec",
+    "Go": "no_go_mod",
+    "C#": "no_csproj",
+    "Kotlin": "no_gradle",
+    "Swift": "no_package_resolved",
+    "Solidity": "no_foundry_toml",
+}
 
 
-def run_command(args: list[str], timeout: int = 60, ok_codes: set[int] | None = None) -> tuple[bool, str]:
-    """Run a command and return (success, output).
+def run_command_bytes(args: list[str], timeout: int = 60, ok_codes: set[int] | None = None) -> tuple[bool, bytes]:
+    """Run a command and return (success, output) with output left undecoded.
 
+    Callers parse stdout as JSON straight from bytes, skipping a str copy of
+    what can be megabytes of scan output; error messages are UTF-8 encoded.
     ok_codes: set of return codes to treat as success (default: {0}).
     """
     if ok_codes is None:
         ok_codes = {0}
     try:
-        result = subprocess.run(
-            args, capture_output=True, text=True, timeout=timeout
-        )
+        result = subprocess.run(args, capture_output=True, timeout=timeout)
         if result.returncode not in ok_codes:
             return False, result.stderr.strip() or result.stdout.strip()
-        return True, result.stdout.strip()
+        return True, result.stdout
     except subprocess.TimeoutExpired:
-        return False, f"Timeout after {timeout}s: {' '.join(args)}"
+        return False, f"Timeout after {timeout}s: {' '.join(args)}".encode()
     except FileNotFoundError:
-        return False, f"Command not found: {args[0]}"
+        return False, f"Command not found: {args[0]}".encode()
 
 
 def now_iso() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
+def print_output(output: dict) -> None:
+    """Print the run's JSON output: indented on a terminal, compact when piped or redirected."""
+    print(json_dumps(output, indent=sys.stdout.isatty()))
+
+
+# Serialized tracker last written to each path by this process
+_last_saved: dict[Path, str] = {}
+
+
+def _delta_path(path: Path) -> Path:
+    """NDJSON log of per-repo updates written since the tracker was last saved."""
+    return path.with_suffix(".delta.ndjson")
+
+
 def load_tracker(path: Path) -> dict:
-    """Load tracker file or return empty structure."""
+    """Load tracker file (replaying any pending delta log) or return empty structure."""
     if path.exists():
-        with open(path) as f:
-            return json.load(f)
-    return {"orgs": [], "last_discovery": None, "repos": {}}
+        with open(path, "rb") as f:
+            tracker = json_loads(f.read())
+    else:
+        tracker = {"orgs": [], "last_discovery": None, "org_etags": {}, "repos": {}}
+
+    delta = _delta_path(path)
+    if delta.exists():
+        with open(delta, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json_loads(line)
+                except json.JSONDecodeError:
+                    break  # Torn final line from an interrupted run
+                tracker["repos"][entry["repo"]] = entry["info"]
+
+    # Backfill the epoch used by the stale check for trackers written before it existed
+    for info in tracker["repos"].values():
+        if info.get("last_scanned") and info.get("last_scanned_epoch") is None:
+            info["last_scanned_epoch"] = datetime.fromisoformat(
+                info["last_scanned"].replace("Z", "+00:00")
+            ).timestamp()
+    return tracker
 
 
 def save_tracker(tracker: dict, path: Path) -> None:
-    """Save tracker to disk."""
+    """Save the full tracker to disk, folding in (and removing) the delta log.
+
+    The write is skipped when the tracker is unchanged since this process
+    last saved it to path (e.g. the final save of a run that scanned nothing).
+    """
+    data = json_dumps(tracker, indent=True) + "\n"
+    if _last_saved.get(path) != data:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so an interrupted save never leaves a truncated tracker
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        _last_saved[path] = data
+    _delta_path(path).unlink(missing_ok=True)
+
+
+def append_tracker_delta(path: Path, name: str, info: dict) -> None:
+    """Record one repo's updated entry without rewriting the whole tracker."""
     path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w") as f:
-        json.dump(tracker, f, indent=2)
-        f.write("\n")
+    with open(_delta_path(path), "a", encoding="utf-8") as f:
+        f.write(json_dumps({"repo": name, "info": info}) + "\n")
+
+
+def _list_org(org: str, etags: Optional[list[str]]) -> tuple[Optional[list[dict]], list[str], Optional[URLError]]:
+    """list_org_repos for a pool worker: (repos, etags, error) instead of raising."""
+    try:
+        repos, etags = list_org_repos(org, etags)
+    except URLError as e:
+        return None, [], e
+    return repos, etags, None
 
 
 def discover_repos(orgs: list[str], tracker: dict) -> dict:
-    """Discover repos across orgs via gh CLI. Returns updated tracker."""
+    """Discover repos across orgs via the GitHub REST API. Returns updated tracker.
+
+    The ETag of each page of an org's listing is kept in the tracker; pages
+    that are unchanged (304, free against the rate limit) are not re-read,
+    as their repos are already in the tracker. Orgs
+    are listed concurrently and merged into the tracker in the given order.
+    """
     timestamp = now_iso()
     new_count = 0
     total_discovered = 0
+    etags = tracker.setdefault("org_etags", {})
+
+    print(f"Discovering repos in {', '.join(orgs)}...", file=sys.stderr)
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_GH_WORKERS, len(orgs)))) as pool:
+        listings = list(pool.map(lambda org: _list_org(org, etags.get(org)), orgs))
 
-    for org in orgs:
+    for org, (repos, page_etags, error) in zip(orgs, listings):
         if org not in tracker["orgs"]:
             tracker["orgs"].append(org)
 
-        print(f"Discovering repos in {org}...", file=sys.stderr)
-        ok, output = run_command([
-            "gh", "repo", "list", org,
-            "--no-archived",
-            "--json", "name,nameWithOwner,primaryLanguage,pushedAt",
-            "--limit", "1000",
-        ], timeout=30)
-
-        if not ok:
-            print(f"  Failed to list repos for {org}: {output}", file=sys.stderr)
+        if error is not None:
+            print(f"  Failed to list repos for {org}: {error}", file=sys.stderr)
             continue
 
-        try:
-            repos = json.loads(output)
-        except json.JSONDecodeError:
-            print(f"  Failed to parse repo list for {org}", file=sys.stderr)
+        etags[org] = page_etags
+        if repos is None:
+            print(f"  {org}: unchanged since last discovery", file=sys.stderr)
             continue
 
+        repos = [repo for repo in repos if not repo.get("archived")]
         total_discovered += len(repos)
         for repo in repos:
-            full_name = repo["nameWithOwner"]
-            lang = repo.get("primaryLanguage")
-            primary_language = lang.get("name", "") if isinstance(lang, dict) else ""
+            full_name = repo["full_name"]
+            primary_language = repo.get("language") or ""
 
             if full_name not in tracker["repos"]:
                 tracker["repos"][full_name] = {
                     "discovered_at": timestamp,
                     "primary_language": primary_language,
-                    "pushed_at": repo.get("pushedAt"),
+                    "pushed_at": repo.get("pushed_at"),
                     "has_lockfile": None,
                     "package_manager": None,
                     "is_monorepo": None,
                     "last_scanned": None,
+                    "last_scanned_epoch": None,
                     "last_result_summary": None,
                     "scan_error": None,
                     "skip_reason": None,
@@ -118,33 +249,81 @@ def discover_repos(orgs: list[str], tracker: dict) -> dict:
             else:
                 # Update language and push date for existing entries
                 tracker["repos"][full_name]["primary_language"] = primary_language
-                tracker["repos"][full_name]["pushed_at"] = repo.get("pushedAt")
+                tracker["repos"][full_name]["pushed_at"] = repo.get("pushed_at")
 
-        print(f"  {org}: {len(repos)} repos found", file=sys.stderr)
+        print(f"  {org}: {len(repos)} repos on changed listing pages", file=sys.stderr)
 
-    # Migrate repos previously skipped as unsupported that are now supported
+    # Migrate repos previously skipped as unsupported that are now supported.
+    # The tracker records which languages were supported when it was last
+    # written, so the repo walk only happens after support has been added.
+    newly_supported = SUPPORTED_LANGUAGES - set(tracker.get("supported_languages") or ())
     migrated = 0
-    for name, info in tracker["repos"].items():
-        skip = info.get("skip_reason", "")
-        if skip and skip.startswith("language:"):
-            lang = skip.split(":", 1)[1]
-            if lang in SUPPORTED_LANGUAGES:
-                info["skip_reason"] = None
-                info["has_lockfile"] = None  # Re-check lockfile
-                migrated += 1
+    if newly_supported:
+        for name, info in tracker["repos"].items():
+            skip = info.get("skip_reason", "")
+            if skip and skip.startswith("language:"):
+                lang = skip.split(":", 1)[1]
+                if lang in newly_supported:
+                    info["skip_reason"] = None
+                    info["has_lockfile"] = None  # Re-check lockfile
+                    migrated += 1
+        tracker["supported_languages"] = sorted(SUPPORTED_LANGUAGES)
     if migrated:
         print(f"Migrated {migrated} repos from unsupported to supported (will re-check lockfiles)", file=sys.stderr)
 
     tracker["last_discovery"] = timestamp
-    print(f"Discovery complete: {total_discovered} total, {new_count} new", file=sys.stderr)
+    print(f"Discovery complete: {total_discovered} listed, {new_count} new", file=sys.stderr)
     return tracker
 
 
+def _lockfile_candidates(lang: str) -> list[str]:
+    """Files whose presence makes a repo scannable: the primary file, then fallbacks."""
+    return [LANGUAGE_LOCKFILES.get(lang, "package.json"), *LANGUAGE_FALLBACKS.get(lang, [])]
+
+
+def _skip_reason(lang: str, found: bool) -> Optional[str]:
+    return None if found else LANGUAGE_SKIP_REASONS.get(lang, "no_package_json")
+
+
+def _check_repo_lockfile(name: str, lang: str) -> Optional[str]:
+    """Probe a repo for its language's manifest over REST. Returns None if found, else a skip reason."""
+    return _skip_reason(lang, any(github_repo_has_file(name, path) for path in _lockfile_candidates(lang)))
+
+
+def _graphql_probe(batch: list[tuple[str, str]]) -> dict[str, bool]:
+    """Probe a batch of (repo, language) pairs for their candidate files in one GraphQL query.
+
+    Returns {repo: found} for the repos the query could answer; repos that
+    are missing (renamed, no access) or a failed query are left out.
+    """
+    fields = []
+    for i, (name, lang) in enumerate(batch):
+        owner, _, repo = name.partition("/")
+        files = " ".join(
+            f"f{j}: object(expression: {json.dumps('HEAD:' + path)}) {{ __typename }}"
+            for j, path in enumerate(_lockfile_candidates(lang))
+        )
+        fields.append(f"r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(repo)}) {{ {files} }}")
+
+    data = github_graphql(f"query {{ {' '.join(fields)} }}")
+    if data is None:
+        return {}
+
+    found = {}
+    for i, (name, _) in enumerate(batch):
+        repo_data = data.get(f"r{i}")
+        if isinstance(repo_data, dict):
+            found[name] = any(repo_data.values())
+    return found
+
+
 def check_lockfiles(tracker: dict) -> dict:
     """Check for lockfiles in repos that haven't been checked yet.
 
     Supports JS/TS (package.json), Rust (Cargo.toml), and Python
-    (poetry.lock, uv.lock, Pipfile.lock, requirements.txt).
+    (poetry.lock, uv.lock, Pipfile.lock, requirements.txt). Repos are probed
+    GRAPHQL_PROBE_BATCH_SIZE per GraphQL query; any a query could not answer
+    fall back to per-file REST probes, MAX_GH_WORKERS at a time.
     """
     unchecked = [
         name for name, info in tracker["repos"].items()
@@ -157,27 +336,7 @@ def check_lockfiles(tracker: dict) -> dict:
     print(f"Checking {len(unchecked)} repos for lockfiles...", file=sys.stderr)
     checked = 0
 
-    # Map language to the primary file to check via GitHub API
-    LANGUAGE_LOCKFILES = {
-        "JavaScript": "package.json",
-        "TypeScript": "package.json",
-        "Rust": "Cargo.toml",
-        "Python": "pyproject.toml",  # Check pyproject.toml first; poetry.lock/uv.lock/etc are optional
-        "Dart": "pubspec.yaml",
-        "Go": "go.mod",
-        "C#": "Directory.Packages.props",
-        "Kotlin": "gradle/libs.versions.toml",
-        "Swift": "Package.resolved",
-        "Solidity": "foundry.toml",
-    }
-    # Fallback files for Python (if pyproject.toml not found)
-    PYTHON_FALLBACKS = ["poetry.lock", "uv.lock", "Pipfile.lock", "requirements.txt"]
-    # Fallback files for languages where the primary may not be at root
-    KOTLIN_FALLBACKS = ["build.gradle.kts", "build.gradle", "settings.gradle.kts"]
-    CSHARP_FALLBACKS = ["*.sln"]  # Can't glob via API, but we can try the .sln pattern
-    SWIFT_FALLBACKS = [".package.resolved", "Package.swift"]
-    SOLIDITY_FALLBACKS = ["hardhat.config.js", "hardhat.config.ts"]
-
+    to_probe = []
     for name in unchecked:
         info = tracker["repos"][name]
         lang = info.get("primary_language", "")
@@ -188,56 +347,34 @@ def check_lockfiles(tracker: dict) -> dict:
             info["skip_reason"] = f"language:{lang}"
             checked += 1
             continue
+        to_probe.append((name, lang))
 
-        # Determine which file to check
-        check_file = LANGUAGE_LOCKFILES.get(lang, "package.json")
-
-        ok, output = run_command([
-            "gh", "api", f"/repos/{name}/contents/{check_file}",
-            "--jq", ".name",
-        ], timeout=10)
-
-        if ok:
-            info["has_lockfile"] = True
-            info["skip_reason"] = None
-        else:
-            # Try language-specific fallback files
-            fallbacks = {
-                "Python": PYTHON_FALLBACKS,
-                "Kotlin": KOTLIN_FALLBACKS,
-                "Swift": SWIFT_FALLBACKS,
-                "Solidity": SOLIDITY_FALLBACKS,
-            }.get(lang, [])
-            found = False
-            for fallback in fallbacks:
-                ok2, _ = run_command([
-                    "gh", "api", f"/repos/{name}/contents/{fallback}",
-                    "--jq", ".name",
-                ], timeout=10)
-                if ok2:
-                    found = True
-                    break
-            if found:
-                info["has_lockfile"] = True
-                info["skip_reason"] = None
-            else:
-                info["has_lockfile"] = False
-                skip_map = {
-                    "Rust": "no_cargo_toml",
-                    "Python": "no_python_lockfile",
-                    "Dart": "no_pubspec",
-                    "Go": "no_go_mod",
-                    "C#": "no_csproj",
-                    "Kotlin": "no_gradle",
-                    "Swift": "no_package_resolved",
-                    "Solidity": "no_foundry_toml",
-                }
-                info["skip_reason"] = skip_map.get(lang, "no_package_json")
-
+    def record(name: str, skip_reason: Optional[str]) -> None:
+        nonlocal checked
+        info = tracker["repos"][name]
+        info["has_lockfile"] = skip_reason is None
+        info["skip_reason"] = skip_reason
         checked += 1
         if checked % 20 == 0:
             print(f"  Checked {checked}/{len(unchecked)}...", file=sys.stderr)
-            time.sleep(0.5)
+
+    if to_probe:
+        batches = [
+            to_probe[start:start + GRAPHQL_PROBE_BATCH_SIZE]
+            for start in range(0, len(to_probe), GRAPHQL_PROBE_BATCH_SIZE)
+        ]
+        rest = []
+        with ThreadPoolExecutor(max_workers=min(MAX_GH_WORKERS, len(to_probe))) as pool:
+            # Results arrive in order; tracker updates stay on this thread
+            for batch, found in zip(batches, pool.map(_graphql_probe, batches)):
+                for name, lang in batch:
+                    if name in found:
+                        record(name, _skip_reason(lang, found[name]))
+                    else:
+                        rest.append((name, lang))
+            skip_reasons = pool.map(lambda item: _check_repo_lockfile(*item), rest)
+            for (name, _), skip_reason in zip(rest, skip_reasons):
+                record(name, skip_reason)
 
     print(f"  Lockfile check complete: {checked} repos checked", file=sys.stderr)
     return tracker
@@ -246,6 +383,7 @@ def check_lockfiles(tracker: dict) -> dict:
 def get_scan_candidates(tracker: dict, stale_days: Optional[int], only: Optional[list[str]]) -> list[str]:
     """Get list of repos that need scanning."""
     candidates = []
+    cutoff = time.time() - stale_days * 86400 if stale_days is not None else None
 
     for name, info in tracker["repos"].items():
         # If --only specified, filter to those repos
@@ -263,11 +401,8 @@ def get_scan_candidates(tracker: dict, stale_days: Optional[int], only: Optional
             continue
 
         # Stale check
-        if stale_days is not None:
-            last = datetime.fromisoformat(info["last_scanned"].replace("Z", "+00:00"))
-            age = (datetime.now(timezone.utc) - last).days
-            if age >= stale_days:
-                candidates.append(name)
+        if cutoff is not None and info["last_scanned_epoch"] <= cutoff:
+            candidates.append(name)
 
     return candidates
 
@@ -282,20 +417,45 @@ def _pkg_fields(pkg: dict) -> dict:
     }
 
 
+def _fetch_description(registry: str, name: str) -> Optional[str]:
+    """One package's description, consulting the on-disk registry cache first."""
+    # Descriptions are per package, not per version; org rescans hit the same names
+    ecosystem = f"description:{registry}"
+    cached = cache_get(ecosystem, name)
+    if cached:
+        return cached
+    desc = _fetch_registry_description(registry, name)
+    if desc:
+        cache_put(ecosystem, name, "", desc)
+    return desc
+
+
+def _fetch_registry_description(registry: str, name: str) -> Optional[str]:
+    """Fetch one package's description from npm, crates.io or PyPI."""
+    try:
+        if registry == "crates.io":
+            data = json_loads(http_get(f"https://crates.io/api/v1/crates/{name}", {"Accept": "application/json"}, timeout=5))
+            return data.get("crate", {}).get("description", "") or None
+        if registry == "PyPI":
+            data = json_loads(http_get(f"https://pypi.org/pypi/{name}/json", timeout=5))
+            return data.get("info", {}).get("summary", "") or None
+        data = json_loads(http_get(f"https://registry.npmjs.org/{name}", {"Accept": "application/json"}, timeout=5))
+        return data.get("description", "") or None
+    except (URLError, json.JSONDecodeError, TimeoutError, OSError):
+        return None  # Skip failures silently
+
+
 def _fetch_descriptions(packages: list[dict], repo_language: str = "") -> dict[str, str]:
     """Fetch descriptions from the appropriate registry for a list of packages.
 
-    Routes to npm, crates.io, or PyPI based on repo_language.
+    Routes to npm, crates.io, or PyPI based on repo_language, fetching up to
+    MAX_DESCRIPTION_WORKERS packages at once over keep-alive connections.
     Returns {package_name: description}.
     """
-    import urllib.request
-    import urllib.error
-
-    descriptions: dict[str, str] = {}
     unique_names = list({p["name"] for p in packages if p.get("name")})
 
     if not unique_names:
-        return descriptions
+        return {}
 
     registry = "npm"
     if repo_language == "Rust":
@@ -304,38 +464,9 @@ def _fetch_descriptions(packages: list[dict], repo_language: str = "") -> dict[s
         registry = "PyPI"
 
     print(f"  Fetching descriptions for {len(unique_names)} packages from {registry}...", file=sys.stderr)
-    for name in unique_names:
-        try:
-            if registry == "crates.io":
-                url = f"https://crates.io/api/v1/crates/{name}"
-                req = urllib.request.Request(url, headers={
-                    "User-Agent": "license-check-scanner/1.0",
-                    "Accept": "application/json",
-                })
-                with urllib.request.urlopen(req, timeout=5) as resp:
-                    data = json.loads(resp.read())
-                    desc = data.get("crate", {}).get("description", "")
-                    if desc:
-                        descriptions[name] = desc
-            elif registry == "PyPI":
-                url = f"https://pypi.org/pypi/{name}/json"
-                with urllib.request.urlopen(url, timeout=5) as resp:
-                    data = json.loads(resp.read())
-                    desc = data.get("info", {}).get("summary", "")
-                    if desc:
-                        descriptions[name] = desc
-            else:
-                url = f"https://registry.npmjs.org/{name}"
-                req = urllib.request.Request(url, headers={"Accept": "application/json"})
-                with urllib.request.urlopen(req, timeout=5) as resp:
-                    data = json.loads(resp.read())
-                    desc = data.get("description", "")
-                    if desc:
-                        descriptions[name] = desc
-        except (urllib.error.URLError, json.JSONDecodeError, TimeoutError, OSError):
-            pass  # Skip failures silently
-
-    return descriptions
+    with ThreadPoolExecutor(max_workers=min(MAX_DESCRIPTION_WORKERS, len(unique_names))) as pool:
+        fetched = pool.map(lambda name: _fetch_description(registry, name), unique_names)
+        return {name: desc for name, desc in zip(unique_names, fetched) if desc}
 
 
 # Curated knowledge base for common non-permissive packages.
@@ -429,6 +560,8 @@ PACKAGE_PREFIX_NOTES: dict[str, dict[str, str]] = {
         "removable": "N/A — own packages",
     },
 }
+# str.startswith(tuple) rejects the common no-match case in a single call
+_NOTE_PREFIXES = tuple(PACKAGE_PREFIX_NOTES)
 
 
 def scan_repo(repo_name: str) -> tuple[Optional[dict], Optional[str]]:
@@ -440,20 +573,20 @@ def scan_repo(repo_name: str) -> tuple[Optional[dict], Optional[str]]:
 
     # license_check.py exits with code 2 for violations — that's not an error
     # Large monorepos (e.g. appkit) need more time: clone + install + scan
-    ok, output = run_command(
+    ok, output = run_command_bytes(
         ["python3", str(LICENSE_CHECK), "--repo", repo_name, "--verbose"],
         timeout=900,
         ok_codes={0, 2},
     )
 
     if not ok:
-        return None, classify_error(output[:500])
+        return None, classify_error(output.decode("utf-8", errors="replace")[:500])
 
     # Parse whatever JSON it produced
     try:
-        result = json.loads(output)
-    except json.JSONDecodeError:
-        return None, f"Invalid JSON output: {output[:200]}"
+        result = json_loads(output)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None, f"Invalid JSON output: {output.decode('utf-8', errors='replace').strip()[:200]}"
 
     if "error" in result:
         return None, result["error"]
@@ -500,7 +633,7 @@ def scan_repo(repo_name: str) -> tuple[Optional[dict], Optional[str]]:
             pkg["description"] = descriptions.get(name, "")
             # Curated notes (exact match first, then prefix)
             notes = PACKAGE_NOTES.get(name)
-            if not notes:
+            if not notes and name.startswith(_NOTE_PREFIXES):
                 for prefix, prefix_notes in PACKAGE_PREFIX_NOTES.items():
                     if name.startswith(prefix):
                         notes = prefix_notes
@@ -513,41 +646,72 @@ def scan_repo(repo_name: str) -> tuple[Optional[dict], Optional[str]]:
     return summary, None
 
 
+# Phrases classify_error looks for, matched in one case-insensitive scan
+_ERROR_PHRASES = {
+    "no_pm": "no package manager detected",
+    "pnpm_outdated": "err_pnpm_outdated_lockfile",
+    "frozen_lockfile": "frozen-lockfile",
+    "yn0050": "yn0050",
+    "corepack": "corepack",
+    "dep0169": "dep0169",
+    "timeout": "timeout",
+    "clone_failed": "clone failed",
+    "install_failed": "install failed",
+    "no_packages": "no packages found",
+    "not_installed": "dependencies not installed",
+    "resolving": "resolving",
+    "unknown_licenses": "unknown licenses",
+    "monorepo": "monorepo: true",
+}
+_ERROR_RE = re.compile(
+    "|".join(f"(?P<{group}>{re.escape(phrase)})" for group, phrase in _ERROR_PHRASES.items()),
+    re.IGNORECASE,
+)
+
+
 def classify_error(raw: str) -> str:
     """Classify raw error output into a clean category."""
-    lower = raw.lower()
-    if "no package manager detected" in lower:
+    # Collect every phrase present, then apply the categories in priority order
+    found = {m.lastgroup for m in _ERROR_RE.finditer(raw)}
+    if "no_pm" in found:
         return "No lockfile detected in repo"
-    if "err_pnpm_outdated_lockfile" in lower:
+    if "pnpm_outdated" in found:
         return "Outdated lockfile (pnpm-lock.yaml out of sync with package.json)"
-    if "frozen-lockfile" in lower or "yn0050" in lower:
+    if "frozen_lockfile" in found or "yn0050" in found:
         return "Outdated lockfile (yarn.lock out of sync)"
-    if "corepack" in lower:
+    if "corepack" in found:
         return "Corepack version conflict (packageManager field requires different version)"
-    if "dep0169" in lower:
+    if "dep0169" in found:
         return "Node.js deprecation breaking install"
-    if "timeout" in lower:
+    if "timeout" in found:
         return "Install timed out (likely large monorepo)"
-    if "clone failed" in lower:
+    if "clone_failed" in found:
         return "Failed to clone repo"
-    if "install failed" in lower:
+    if "install_failed" in found:
         return "Dependency install failed"
-    if "no packages found" in lower:
+    if "no_packages" in found:
         return "No packages found (deps installed but license extraction returned empty)"
-    if "dependencies not installed" in lower:
+    if "not_installed" in found:
         return "Dependencies not installed"
-    if "resolving" in lower and "unknown licenses" in lower:
+    if "resolving" in found and "unknown_licenses" in found:
         return "Scan stalled during license resolution (likely timeout)"
-    if "monorepo: true" in lower and raw.rstrip().endswith("workspaces)"):
+    if "monorepo" in found and raw.rstrip().endswith("workspaces)"):
         return "Scan stalled after detecting monorepo (likely timeout during install)"
     # Fallback: strip newlines and truncate
     return raw.replace("\n", " ").strip()[:120]
 
 
-def run_scans(tracker: dict, candidates: list[str], tracker_path: Optional[Path] = None) -> tuple[dict, dict]:
+def run_scans(
+    tracker: dict, candidates: list[str], tracker_path: Optional[Path] = None,
+    max_concurrent: int = 1,
+) -> tuple[dict, dict]:
     """Scan candidates and update tracker. Returns (tracker, scan_results).
 
-    If tracker_path is provided, saves after each repo for crash-safe resume.
+    Up to max_concurrent repos are scanned at once. If tracker_path is
+    provided, each repo's result is appended to the tracker's delta log for
+    crash-safe resume, and the full tracker is rewritten every
+    TRACKER_COMPACT_EVERY repos; tracker updates and writes happen only on
+    the calling thread.
     """
     results = {"scanned": 0, "errors": 0, "skipped": 0, "violations": []}
 
@@ -556,35 +720,45 @@ def run_scans(tracker: dict, candidates: list[str], tracker_path: Optional[Path]
         return tracker, results
 
     print(f"Scanning {len(candidates)} repos...", file=sys.stderr)
-    for i, name in enumerate(candidates, 1):
-        print(f"[{i}/{len(candidates)}] {name}", file=sys.stderr)
-
-        summary, error = scan_repo(name)
-        info = tracker["repos"][name]
-
-        if error:
-            info["scan_error"] = error
-            info["last_scanned"] = now_iso()
-            results["errors"] += 1
-            print(f"  Error: {error[:100]}", file=sys.stderr)
-        else:
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrent, len(candidates)))) as pool:
+        futures = {pool.submit(scan_repo, name): name for name in candidates}
+        for i, future in enumerate(as_completed(futures), 1):
+            name = futures[future]
+            print(f"[{i}/{len(candidates)}] {name}", file=sys.stderr)
+
+            # One crashed scan must not take down the rest of the batch
+            try:
+                summary, error = future.result()
+            except Exception as e:
+                summary, error = None, f"Scan crashed: {e}"
+            info = tracker["repos"][name]
             info["last_scanned"] = now_iso()
-            info["non_permissive_packages"] = summary.pop("non_permissive_packages", [])
-            info["last_result_summary"] = summary
-            info["scan_error"] = None
-            info["package_manager"] = summary.get("package_manager")
-            info["is_monorepo"] = summary.get("is_monorepo")
-            results["scanned"] += 1
-
-            if summary.get("has_violations"):
-                results["violations"].append(name)
-                print(f"  Violations found!", file=sys.stderr)
-            else:
-                print(f"  Clean", file=sys.stderr)
+            info["last_scanned_epoch"] = time.time()
 
-        # Save after each repo for crash-safe resume
-        if tracker_path:
-            save_tracker(tracker, tracker_path)
+            if error:
+                info["scan_error"] = error
+                results["errors"] += 1
+                print(f"  Error: {error[:100]}", file=sys.stderr)
+            else:
+                info["non_permissive_packages"] = summary.pop("non_permissive_packages", [])
+                info["last_result_summary"] = summary
+                info["scan_error"] = None
+                info["package_manager"] = summary.get("package_manager")
+                info["is_monorepo"] = summary.get("is_monorepo")
+                results["scanned"] += 1
+
+                if summary.get("has_violations"):
+                    results["violations"].append(name)
+                    print(f"  Violations found!", file=sys.stderr)
+                else:
+                    print(f"  Clean", file=sys.stderr)
+
+            # Log after each repo for crash-safe resume; compact periodically
+            if tracker_path:
+                if i % TRACKER_COMPACT_EVERY == 0:
+                    save_tracker(tracker, tracker_path)
+                else:
+                    append_tracker_delta(tracker_path, name, info)
 
     return tracker, results
 
@@ -593,14 +767,12 @@ def build_output(tracker: dict, results: dict, discover_only: bool) -> dict:
     """Build final JSON output for Claude to format."""
     repos = tracker["repos"]
 
-    # Count by status
-    scannable_repos = [n for n, i in repos.items() if i.get("has_lockfile")]
-    skipped_repos = [n for n, i in repos.items() if i.get("skip_reason")]
-    scanned_repos = [n for n, i in repos.items() if i.get("last_scanned") and not i.get("scan_error")]
-    error_repos = [n for n, i in repos.items() if i.get("scan_error")]
-    unscanned_repos = [n for n, i in repos.items() if i.get("has_lockfile") and not i.get("last_scanned")]
-
-    # Aggregate violation stats across all scanned repos
+    # One pass for status counts, license totals and the language breakdown
+    # (for prioritizing next ecosystem support). These are derived on read,
+    # not stored in the tracker, so edits to it cannot leave them stale.
+    scannable_count = skipped_count = scanned_count = 0
+    error_repos = []
+    unscanned_repos = []
     total_stats = {
         "permissive": 0, "weak_copyleft": 0, "restrictive": 0,
         "custom": 0, "unknown": 0, "total": 0,
@@ -609,6 +781,17 @@ def build_output(tracker: dict, results: dict, discover_only: bool) -> dict:
     repos_with_unknowns = []
 
     for name, info in repos.items():
+        if info.get("has_lockfile"):
+            scannable_count += 1
+            if not info.get("last_scanned"):
+                unscanned_repos.append(name)
+        if info.get("skip_reason"):
+            skipped_count += 1
+        if info.get("scan_error"):
+            error_repos.append(name)
+        elif info.get("last_scanned"):
+            scanned_count += 1
+
         s = info.get("last_result_summary")
         if not s:
             continue
@@ -619,13 +802,9 @@ def build_output(tracker: dict, results: dict, discover_only: bool) -> dict:
         if s.get("unknown", 0) > 0:
             repos_with_unknowns.append(name)
 
-    # Language breakdown across all repos (for prioritizing next ecosystem support)
-    language_counts: dict[str, int] = {}
-    for name, info in repos.items():
-        lang = info.get("primary_language") or "Unknown"
-        language_counts[lang] = language_counts.get(lang, 0) + 1
-    # Sort by count descending
-    language_breakdown = dict(sorted(language_counts.items(), key=lambda x: -x[1]))
+    # Sort by count descending (ties keep discovery order)
+    language_counts = Counter(info.get("primary_language") or "Unknown" for info in repos.values())
+    language_breakdown = dict(language_counts.most_common())
 
     output = {
         "orgs": tracker["orgs"],
@@ -633,9 +812,9 @@ def build_output(tracker: dict, results: dict, discover_only: bool) -> dict:
         "discover_only": discover_only,
         "counts": {
             "total_repos": len(repos),
-            "scannable_repos": len(scannable_repos),
-            "skipped_repos": len(skipped_repos),
-            "scanned_repos": len(scanned_repos),
+            "scannable_repos": scannable_count,
+            "skipped_repos": skipped_count,
+            "scanned_repos": scanned_count,
             "error_repos": len(error_repos),
             "unscanned_repos": len(unscanned_repos),
         },
@@ -674,233 +853,242 @@ def _repo_short(name: str) -> str:
     return name.split("/", 1)[1] if "/" in name else name
 
 
+def _group_by_org(entries: list[tuple]) -> dict[str, tuple[str, list]]:
+    """Group (name, ...) entries by lowercased org: {org: (org as cased in repo names, entries)}."""
+    groups: dict[str, tuple[str, list]] = {}
+    for entry in entries:
+        org = _repo_org(entry[0])
+        key = org.lower()
+        _, members = groups.get(key, (org, []))
+        members.append(entry)
+        groups[key] = (org, members)
+    return groups
+
+
+# Row formatters are f-strings: CPython compiles them to direct formatting
+# ops, about twice as fast as applying a module-level template with format_map
+def _notable_row(name: str, s: dict, pm: str, scanned_date: str) -> str:
+    """Report table row for a repo with non-permissive dependencies."""
+    return f"| {_repo_short(name)} | {pm} | {s.get('total', 0):,} | {s.get('weak_copyleft', 0)} | {s.get('restrictive', 0)} | {s.get('custom', 0)} | {s.get('unknown', 0)} | {scanned_date} |\n"
+
+
+def _clean_row(name: str, s: dict, pm: str, scanned_date: str) -> str:
+    """Report table row for a repo with only permissive dependencies."""
+    return f"| {_repo_short(name)} | {pm} | {s.get('total', 0):,} | {scanned_date} |\n"
+
+
+def _package_row(pkg: dict) -> str:
+    """Appendix table row for one non-permissive package."""
+    desc = pkg.get("description", "") or "—"
+    alt = pkg.get("alternative", "") or "Needs review"
+    removable = pkg.get("removable", "") or "Needs review"
+    # Escape pipes in descriptions; for one character str.replace is a single
+    # C scan that returns the string itself when there is no pipe, far cheaper
+    # than str.translate's per-character table lookups
+    desc = desc.replace("|", "\\|")
+    alt = alt.replace("|", "\\|")
+    return f"| {pkg.get('name', '?')} | {pkg.get('version', '?')} | {pkg.get('license', '?')} | {desc} | {alt} | {removable} |\n"
+
+
 def generate_report(tracker: dict, report_path: Path) -> None:
     """Generate a markdown compliance report from tracker data."""
     repos = tracker["repos"]
-    scanned = [(n, i) for n, i in repos.items() if i.get("last_scanned") and not i.get("scan_error")]
-    errors = [(n, i) for n, i in repos.items() if i.get("scan_error")]
-    scannable_count = sum(1 for n, i in repos.items() if i.get("has_lockfile"))
-    skipped_count = sum(1 for n, i in repos.items() if i.get("skip_reason"))
-
-    # Aggregate
+    # One pass over the tracker fills the partitions, counters and license totals
+    scanned = []
+    errors = []
+    # (name, info, table row), rendered here while the summary is at hand
+    notable = []  # has non-permissive deps
+    clean = []  # 100% permissive
+    repos_with_detail = []  # notable repos with per-package detail for the appendix
+    scannable_count = skipped_count = unknowns_count = 0
     total = {"permissive": 0, "weak_copyleft": 0, "restrictive": 0, "custom": 0, "unknown": 0, "total": 0}
-    for name, info in scanned:
+    # Module helpers bound to locals: the loop runs once per tracker repo, and
+    # before 3.11 every call otherwise pays a global-dict lookup
+    short_date, notable_row, clean_row = _short_date, _notable_row, _clean_row
+    for name, info in repos.items():
+        if info.get("has_lockfile"):
+            scannable_count += 1
+        if info.get("skip_reason"):
+            skipped_count += 1
+        if info.get("scan_error"):
+            errors.append((name, info))
+            continue
+        if not info.get("last_scanned"):
+            continue
+        scanned.append((name, info))
         s = info["last_result_summary"]
         for k in total:
             total[k] += s.get(k, 0)
-
-    # Split repos into notable (has non-permissive) vs clean (100% permissive)
-    notable = []
-    clean = []
-    for name, info in scanned:
-        s = info["last_result_summary"]
-        if s.get("weak_copyleft", 0) > 0 or s.get("restrictive", 0) > 0 or s.get("custom", 0) > 0 or s.get("unknown", 0) > 0:
-            notable.append((name, info))
+        pm = s.get("package_manager") or info.get("package_manager") or "?"
+        scanned_date = short_date(info.get("last_scanned"))
+        unknown = s.get("unknown", 0)
+        if unknown > 0 or s.get("weak_copyleft", 0) > 0 or s.get("restrictive", 0) > 0 or s.get("custom", 0) > 0:
+            notable.append((name, info, notable_row(name, s, pm, scanned_date)))
+            if unknown > 0:
+                unknowns_count += 1
+            if info.get("non_permissive_packages"):
+                repos_with_detail.append((name, info, pm))
         else:
-            clean.append((name, info))
-    notable.sort(key=lambda x: -(x[1]["last_result_summary"].get("total", 0)))
-    clean.sort(key=lambda x: -(x[1]["last_result_summary"].get("total", 0)))
-
-    # Language breakdown
-    langs: dict[str, int] = {}
-    for n, i in repos.items():
-        lang = i.get("primary_language") or "Unknown"
-        langs[lang] = langs.get(lang, 0) + 1
+            clean.append((name, info, clean_row(name, s, pm, scanned_date)))
+    langs = Counter(info.get("primary_language") or "Unknown" for info in repos.values())
+    # Largest dependency trees first; the sort is stable, so ties keep tracker order
+    for entries in (notable, clean, repos_with_detail):
+        entries.sort(key=lambda x: -(x[1]["last_result_summary"].get("total", 0)))
 
     # Group scanned repos by org
     orgs_in_tracker = tracker.get("orgs", [])
+    # Lowercased once; sections list org groups in tracker order
+    org_keys = [org.lower() for org in orgs_in_tracker]
 
-    lines: list[str] = []
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "wb", buffering=REPORT_WRITE_BUFFER_SIZE) as f:
+        # Every block ends with a newline, which is held back and written
+        # ahead of the next block, so the report ends in one newline rather
+        # than the blank line that closes each block
+        newline_pending = False
+
+        def emit(text: str) -> None:
+            nonlocal newline_pending
+            if not text:
+                return
+            if newline_pending:
+                f.write(b"\n")
+            f.write(text[:-1].encode("utf-8"))
+            newline_pending = True
+
+        # --- Executive summary ---
+        if total["restrictive"] > 0:
+            verdict = "FAIL — restrictive licenses (GPL/AGPL/SSPL) detected"
+        elif total["unknown"] > 20:
+            verdict = "REVIEW NEEDED — no restrictive licenses, but significant unknowns"
+        elif total["unknown"] > 0:
+            verdict = "PASS (with minor unknowns to review)"
+        else:
+            verdict = "PASS — all dependencies use permissive or documented licenses"
+        emit(
+            "# Org-Wide License Compliance Report\n\n"
+            f"**Verdict: {verdict}**\n\n"
+            f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M')}\n"
+            f"**Orgs:** {', '.join(orgs_in_tracker)}\n"
+            f"**Total repos:** {len(repos)} | **Scannable repos:** {scannable_count} | **Scanned:** {len(scanned)} | **Errors:** {len(errors)} | **Skipped:** {skipped_count}\n\n"
+        )
 
-    # --- Header ---
-    lines.append("# Org-Wide License Compliance Report")
-    lines.append("")
+        # --- Aggregate summary ---
+        status = "HIGH" if total["restrictive"] > 0 else "OK"
+        emit(
+            "## Aggregate License Summary\n\n"
+            "| Classification | Count | Status |\n"
+            "|:---------------|------:|:-------|\n"
+            f"| Permissive     | {total['permissive']:,} | OK |\n"
+            f"| Weak Copyleft  | {total['weak_copyleft']:,} | MEDIUM |\n"
+            f"| Restrictive    | {total['restrictive']:,} | {status} |\n"
+            f"| Custom         | {total['custom']:,} | Review |\n"
+            f"| Unknown        | {total['unknown']:,} | Review |\n"
+            f"| **Total**      | **{total['total']:,}** | |\n\n"
+        )
 
-    # --- Executive summary ---
-    if total["restrictive"] > 0:
-        verdict = "FAIL — restrictive licenses (GPL/AGPL/SSPL) detected"
-    elif total["unknown"] > 20:
-        verdict = "REVIEW NEEDED — no restrictive licenses, but significant unknowns"
-    elif total["unknown"] > 0:
-        verdict = "PASS (with minor unknowns to review)"
-    else:
-        verdict = "PASS — all dependencies use permissive or documented licenses"
-    lines.append(f"**Verdict: {verdict}**")
-    lines.append("")
-    lines.append(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-    lines.append(f"**Orgs:** {', '.join(orgs_in_tracker)}")
-    lines.append(f"**Total repos:** {len(repos)} | **Scannable repos:** {scannable_count} | **Scanned:** {len(scanned)} | **Errors:** {len(errors)} | **Skipped:** {skipped_count}")
-    lines.append("")
-
-    # --- Aggregate summary ---
-    lines.append("## Aggregate License Summary")
-    lines.append("")
-    lines.append("| Classification | Count | Status |")
-    lines.append("|:---------------|------:|:-------|")
-    lines.append(f"| Permissive     | {total['permissive']:,} | OK |")
-    lines.append(f"| Weak Copyleft  | {total['weak_copyleft']:,} | MEDIUM |")
-    status = "HIGH" if total["restrictive"] > 0 else "OK"
-    lines.append(f"| Restrictive    | {total['restrictive']:,} | {status} |")
-    lines.append(f"| Custom         | {total['custom']:,} | Review |")
-    lines.append(f"| Unknown        | {total['unknown']:,} | Review |")
-    lines.append(f"| **Total**      | **{total['total']:,}** | |")
-    lines.append("")
-
-    # --- Repos needing attention (grouped by org) ---
-    if notable:
-        lines.append("## Repos Needing Attention")
-        lines.append("")
-        # Group notable by org (case-insensitive match)
-        notable_by_org: dict[str, list] = {}
-        org_display: dict[str, str] = {}  # lowercase -> actual casing
-        for name, info in notable:
-            org = _repo_org(name)
-            notable_by_org.setdefault(org.lower(), []).append((name, info))
-            org_display[org.lower()] = org
-
-        for org in orgs_in_tracker:
-            org_repos = notable_by_org.get(org.lower(), [])
-            if not org_repos:
-                continue
-            lines.append(f"### {org_display.get(org.lower(), org)}")
-            lines.append("")
-            lines.append("| Repo | Package Manager | Total | Weak Copyleft | Restrictive | Custom | Unknown | Last Scanned |")
-            lines.append("|:-----|:----------------|------:|--------------:|------------:|-------:|--------:|:-------------|")
-            for name, info in org_repos:
-                s = info["last_result_summary"]
-                pm = s.get("package_manager") or info.get("package_manager") or "?"
-                scanned_date = _short_date(info.get("last_scanned"))
-                lines.append(f"| {_repo_short(name)} | {pm} | {s.get('total', 0):,} | {s.get('weak_copyleft', 0)} | {s.get('restrictive', 0)} | {s.get('custom', 0)} | {s.get('unknown', 0)} | {scanned_date} |")
-            lines.append("")
-
-    # --- Clean repos (grouped by org) ---
-    if clean:
-        lines.append("## Clean Repos")
-        lines.append("")
-        lines.append(f"{len(clean)} repos with only permissive licenses.")
-        lines.append("")
-        clean_by_org: dict[str, list] = {}
-        clean_org_display: dict[str, str] = {}
-        for name, info in clean:
-            org = _repo_org(name)
-            clean_by_org.setdefault(org.lower(), []).append((name, info))
-            clean_org_display[org.lower()] = org
-
-        for org in orgs_in_tracker:
-            org_repos = clean_by_org.get(org.lower(), [])
-            if not org_repos:
-                continue
-            lines.append(f"### {clean_org_display.get(org.lower(), org)}")
-            lines.append("")
-            lines.append("| Repo | Package Manager | Total Dependencies | Last Scanned |")
-            lines.append("|:-----|:----------------|-------------------:|:-------------|")
-            for name, info in org_repos:
-                s = info["last_result_summary"]
-                pm = s.get("package_manager") or info.get("package_manager") or "?"
-                scanned_date = _short_date(info.get("last_scanned"))
-                lines.append(f"| {_repo_short(name)} | {pm} | {s.get('total', 0):,} | {scanned_date} |")
-            lines.append("")
-
-    # --- Errors ---
-    if errors:
-        lines.append("## Scan Errors")
-        lines.append("")
-        lines.append("| Repo | Error |")
-        lines.append("|:-----|:------|")
-        for name, info in errors:
-            err = classify_error(info["scan_error"])
-            lines.append(f"| {name} | {err} |")
-        lines.append("")
-
-    # --- Unsupported languages ---
-    non_scannable = [(l, c) for l, c in sorted(langs.items(), key=lambda x: -x[1])
-                     if l not in SUPPORTED_LANGUAGES and l not in ("Unknown", "HCL", "Shell", "MDX", "TeX", "Jsonnet", "Dockerfile", "CSS", "Jupyter Notebook")]
-    if non_scannable:
-        lines.append("## Unsupported Languages")
-        lines.append("")
-        lines.append("Ranked by repo count — informs which ecosystem to add license scanning support for next.")
-        lines.append("")
-        lines.append("| Language | Repos |")
-        lines.append("|:---------|------:|")
-        for lang, count in non_scannable:
-            lines.append(f"| {lang} | {count} |")
-        lines.append("")
-
-    # --- Action items ---
-    lines.append("## Action Items")
-    lines.append("")
-    item = 1
-    if total["restrictive"] > 0:
-        lines.append(f"{item}. **{total['restrictive']} restrictive licenses** — must be replaced or receive legal approval")
-        item += 1
-    if total["unknown"] > 0:
-        unknowns_count = sum(1 for n, i in notable if i["last_result_summary"].get("unknown", 0) > 0)
-        lines.append(f"{item}. **{total['unknown']} unknown licenses** across {unknowns_count} repos need manual review or config overrides")
-        item += 1
-    if total["weak_copyleft"] > 0:
-        lines.append(f"{item}. **{total['weak_copyleft']} weak copyleft** (MPL-2.0, LGPL) — likely acceptable but worth documenting")
-        item += 1
-    if errors:
-        lines.append(f"{item}. **{len(errors)} scan errors** — repos with outdated lockfiles, missing lockfiles, or install failures")
-        item += 1
-    if non_scannable:
-        top = non_scannable[0]
-        lines.append(f"{item}. **{top[0]} ({top[1]} repos)** is the largest unsupported ecosystem — add support next")
-    lines.append("")
-
-    # --- Appendix: per-repo package detail ---
-    repos_with_detail = [(n, i) for n, i in notable if i.get("non_permissive_packages")]
-    if repos_with_detail:
-        lines.append("---")
-        lines.append("")
-        lines.append("## Appendix: Package Detail")
-        lines.append("")
-        for name, info in repos_with_detail:
-            s = info["last_result_summary"]
-            pm = s.get("package_manager") or info.get("package_manager") or "?"
-            mono = "Yes" if s.get("is_monorepo") else "No"
-            lines.append(f"### {name}")
-            lines.append("")
-            lines.append(f"**Package Manager:** {pm} | **Monorepo:** {mono} | **Total Dependencies:** {s.get('total', 0):,}")
-            lines.append("")
-
-            pkgs = info["non_permissive_packages"]
-            # Group by classification
-            by_class: dict[str, list] = {}
-            for pkg in pkgs:
-                cls = pkg.get("classification", "unknown")
-                by_class.setdefault(cls, []).append(pkg)
-
-            class_order = ["restrictive", "weak_copyleft", "custom", "unknown"]
-            class_labels = {
-                "restrictive": "Restrictive",
-                "weak_copyleft": "Weak Copyleft",
-                "custom": "Custom",
-                "unknown": "Unknown",
-            }
-
-            for cls in class_order:
-                cls_pkgs = by_class.get(cls, [])
-                if not cls_pkgs:
+        # --- Repos needing attention (grouped by org) ---
+        if notable:
+            emit("## Repos Needing Attention\n\n")
+            # Group notable by org (case-insensitive match)
+            notable_by_org = _group_by_org(notable)
+            for key in org_keys:
+                group = notable_by_org.get(key)
+                if group is None:
+                    continue
+                display, org_repos = group
+                emit(
+                    f"### {display}\n\n"
+                    "| Repo | Package Manager | Total | Weak Copyleft | Restrictive | Custom | Unknown | Last Scanned |\n"
+                    "|:-----|:----------------|------:|--------------:|------------:|-------:|--------:|:-------------|\n"
+                )
+                emit("".join([row for _, _, row in org_repos]))
+                emit("\n")
+
+        # --- Clean repos (grouped by org) ---
+        if clean:
+            emit(f"## Clean Repos\n\n{len(clean)} repos with only permissive licenses.\n\n")
+            clean_by_org = _group_by_org(clean)
+            for key in org_keys:
+                group = clean_by_org.get(key)
+                if group is None:
                     continue
-                label = class_labels.get(cls, cls)
-                lines.append(f"#### {label} ({len(cls_pkgs)})")
-                lines.append("")
-                lines.append("| Package | Version | License | Purpose | Permissive Alternative | Removable? |")
-                lines.append("|:--------|:--------|:--------|:--------|:-----------------------|:-----------|")
-                for pkg in sorted(cls_pkgs, key=lambda p: p.get("name", "")):
-                    desc = pkg.get("description", "") or "—"
-                    alt = pkg.get("alternative", "") or "Needs review"
-                    removable = pkg.get("removable", "") or "Needs review"
-                    # Escape pipes in descriptions
-                    desc = desc.replace("|", "\\|")
-                    alt = alt.replace("|", "\\|")
-                    lines.append(f"| {pkg.get('name', '?')} | {pkg.get('version', '?')} | {pkg.get('license', '?')} | {desc} | {alt} | {removable} |")
-                lines.append("")
+                display, org_repos = group
+                emit(
+                    f"### {display}\n\n"
+                    "| Repo | Package Manager | Total Dependencies | Last Scanned |\n"
+                    "|:-----|:----------------|-------------------:|:-------------|\n"
+                )
+                emit("".join([row for _, _, row in org_repos]))
+                emit("\n")
+
+        # --- Errors ---
+        if errors:
+            emit("## Scan Errors\n\n| Repo | Error |\n|:-----|:------|\n")
+            emit("".join([f"| {name} | {classify_error(info['scan_error'])} |\n" for name, info in errors]))
+            emit("\n")
+
+        # --- Unsupported languages ---
+        non_scannable = [(l, c) for l, c in langs.most_common() if l not in UNSUPPORTED_REPORT_EXCLUDED]
+        if non_scannable:
+            emit(
+                "## Unsupported Languages\n\n"
+                "Ranked by repo count — informs which ecosystem to add license scanning support for next.\n\n"
+                "| Language | Repos |\n"
+                "|:---------|------:|\n"
+            )
+            emit("".join([f"| {lang} | {count} |\n" for lang, count in non_scannable]))
+            emit("\n")
+
+        # --- Action items ---
+        top_lang, top_count = non_scannable[0] if non_scannable else ("", 0)
+        action_items = [
+            (total["restrictive"] > 0,
+             f"**{total['restrictive']} restrictive licenses** — must be replaced or receive legal approval"),
+            (total["unknown"] > 0,
+             f"**{total['unknown']} unknown licenses** across {unknowns_count} repos need manual review or config overrides"),
+            (total["weak_copyleft"] > 0,
+             f"**{total['weak_copyleft']} weak copyleft** (MPL-2.0, LGPL) — likely acceptable but worth documenting"),
+            (bool(errors),
+             f"**{len(errors)} scan errors** — repos with outdated lockfiles, missing lockfiles, or install failures"),
+            (bool(non_scannable),
+             f"**{top_lang} ({top_count} repos)** is the largest unsupported ecosystem — add support next"),
+        ]
+        numbered = [text for applies, text in action_items if applies]
+        emit("## Action Items\n\n")
+        emit("".join([f"{n}. {text}\n" for n, text in enumerate(numbered, 1)]))
+        emit("\n")
+
+        # --- Appendix: per-repo package detail ---
+        if repos_with_detail:
+            emit("---\n\n## Appendix: Package Detail\n\n")
+            for name, info, pm in repos_with_detail:
+                s = info["last_result_summary"]
+                mono = "Yes" if s.get("is_monorepo") else "No"
+                emit(
+                    f"### {name}\n\n"
+                    f"**Package Manager:** {pm} | **Monorepo:** {mono} | **Total Dependencies:** {s.get('total', 0):,}\n\n"
+                )
+
+                # Group by classification; anything outside the appendix classes is left out
+                by_class: dict[str, list] = {cls: [] for cls in APPENDIX_CLASS_LABELS}
+                for pkg in info["non_permissive_packages"]:
+                    bucket = by_class.get(pkg.get("classification", "unknown"))
+                    if bucket is not None:
+                        bucket.append(pkg)
+
+                for cls, label in APPENDIX_CLASS_LABELS.items():
+                    cls_pkgs = by_class[cls]
+                    if not cls_pkgs:
+                        continue
+                    emit(
+                        f"#### {label} ({len(cls_pkgs)})\n\n"
+                        "| Package | Version | License | Purpose | Permissive Alternative | Removable? |\n"
+                        "|:--------|:--------|:--------|:--------|:-----------------------|:-----------|\n"
+                    )
+                    emit("".join([_package_row(pkg) for pkg in sorted(cls_pkgs, key=itemgetter("name"))]))
+                    emit("\n")
 
-    report_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(report_path, "w") as f:
-        f.write("\n".join(lines))
 
     print(f"Report written to {report_path}", file=sys.stderr)
 
@@ -929,6 +1117,10 @@ def main() -> None:
         "--only", type=str, default=None,
         help="Comma-separated repos to scan (e.g., reown-com/appkit,reown-com/web-monorepo)"
     )
+    parser.add_argument(
+        "--max-concurrent", type=int, default=DEFAULT_MAX_CONCURRENT_SCANS,
+        help=f"Repos to scan in parallel, each with its own clone and install (default: {DEFAULT_MAX_CONCURRENT_SCANS})"
+    )
     parser.add_argument(
         "--report", type=Path, default=None,
         help="Path to write markdown report (e.g., ./license-compliance-report.md)"
@@ -949,7 +1141,7 @@ def main() -> None:
     # If discover-only, output stats and exit
     if args.discover_only:
         output = build_output(tracker, {}, discover_only=True)
-        print(json.dumps(output, indent=2))
+        print_output(output)
         if args.report:
             generate_report(tracker, args.report)
         return
@@ -959,12 +1151,12 @@ def main() -> None:
     candidates = get_scan_candidates(tracker, args.stale_days, only)
 
     # Scan
-    tracker, results = run_scans(tracker, candidates, tracker_path=args.tracker)
+    tracker, results = run_scans(tracker, candidates, tracker_path=args.tracker, max_concurrent=args.max_concurrent)
     save_tracker(tracker, args.tracker)
 
     # Output
     output = build_output(tracker, results, discover_only=False)
-    print(json.dumps(output, indent=2))
+    print_output(output)
 
     # Generate markdown report if requested
     if args.report:
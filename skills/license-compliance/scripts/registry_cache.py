@@ -0,0 +1,189 @@
+"""Persistent on-disk cache for registry license lookups (SQLite)."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+from urllib.error import HTTPError, URLError
+
+from http_client import http_get_conditional
+
+CACHE_PATH = Path.home() / ".cache" / "license_check" / "registry.sqlite3"
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+_conn: Optional[sqlite3.Connection] = None
+_conn_failed = False
+_lock = threading.Lock()
+
+
+def _connect() -> Optional[sqlite3.Connection]:
+    """Open (once) the cache database; returns None if it is unavailable."""
+    global _conn, _conn_failed
+    if _conn is not None or _conn_failed:
+        return _conn
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(CACHE_PATH), timeout=5, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS lookups ("
+            "ecosystem TEXT, name TEXT, version TEXT, value TEXT, fetched_at INT, "
+            "etag TEXT, last_modified TEXT, "
+            "PRIMARY KEY (ecosystem, name, version))"
+        )
+        # Databases created before validators were stored lack these columns
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(lookups)")}
+        for column in ("etag", "last_modified"):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE lookups ADD COLUMN {column} TEXT")
+        conn.commit()
+        _conn = conn
+    except (sqlite3.Error, OSError):
+        _conn_failed = True
+    return _conn
+
+
+def _cache_row(ecosystem: str, name: str, version: str) -> Optional[tuple]:
+    """Return (value, fetched_at, etag, last_modified) or None."""
+    with _lock:
+        conn = _connect()
+        if conn is None:
+            return None
+        try:
+            return conn.execute(
+                "SELECT value, fetched_at, etag, last_modified FROM lookups "
+                "WHERE ecosystem = ? AND name = ? AND version = ?",
+                (ecosystem, name, version),
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+
+
+def cache_get(ecosystem: str, name: str, version: str = "") -> Optional[str]:
+    """Return a cached lookup value, or None on a miss or stale entry."""
+    row = _cache_row(ecosystem, name, version)
+    if not row or time.time() - row[1] > CACHE_TTL_SECONDS:
+        return None
+    return row[0]
+
+
+def cache_can_revalidate(ecosystem: str, name: str, version: str = "") -> bool:
+    """True if a stale entry has an ETag / Last-Modified for a conditional request."""
+    row = _cache_row(ecosystem, name, version)
+    return bool(row and (row[2] or row[3]))
+
+
+def cache_put(
+    ecosystem: str, name: str, version: str, value: str,
+    etag: Optional[str] = None, last_modified: Optional[str] = None,
+) -> None:
+    """Store a successful lookup. Failures are never cached so they get retried."""
+    with _lock:
+        conn = _connect()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO lookups "
+                "(ecosystem, name, version, value, fetched_at, etag, last_modified) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (ecosystem, name, version, value, int(time.time()), etag, last_modified),
+            )
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+
+def _cache_touch(ecosystem: str, name: str, version: str) -> None:
+    """Mark a revalidated entry fresh again."""
+    with _lock:
+        conn = _connect()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                "UPDATE lookups SET fetched_at = ? WHERE ecosystem = ? AND name = ? AND version = ?",
+                (int(time.time()), ecosystem, name, version),
+            )
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+
+def _cache_delete(ecosystem: str, name: str, version: str) -> None:
+    """Drop an entry whose upstream resource is gone."""
+    with _lock:
+        conn = _connect()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                "DELETE FROM lookups WHERE ecosystem = ? AND name = ? AND version = ?",
+                (ecosystem, name, version),
+            )
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+
+def cached_fetch(
+    ecosystem: str,
+    name: str,
+    version: str,
+    url: str,
+    parse: Callable[[bytes], Optional[str]],
+    headers: Optional[Callable[[], dict]] = None,
+    timeout: float = 10,
+    fetch: Optional[Callable] = None,
+) -> Optional[str]:
+    """Fetch url and parse it into a cached value, revalidating stale entries.
+
+    Fresh entries are returned without a request. Stale entries are sent
+    with If-None-Match / If-Modified-Since; a 304 (which GitHub does not
+    count against the rate limit) keeps the cached value, as does a
+    revalidation that fails on a network error, 429 or 5xx; a 404 or 410
+    (e.g. a yanked or renamed package) evicts it. headers is a
+    callable so expensive ones (e.g. a gh auth token) are only built when
+    a request is actually made. fetch replaces http_get_conditional, e.g.
+    to add rate-limit handling.
+    """
+    row = _cache_row(ecosystem, name, version)
+    if row and time.time() - row[1] <= CACHE_TTL_SECONDS:
+        return row[0]
+
+    req_headers = dict(headers()) if headers else {}
+    if row:
+        if row[2]:
+            req_headers["If-None-Match"] = row[2]
+        if row[3]:
+            req_headers["If-Modified-Since"] = row[3]
+    try:
+        body, resp_headers = (fetch or http_get_conditional)(url, req_headers, timeout)
+    except HTTPError as e:
+        if e.code in (404, 410):
+            if row:
+                _cache_delete(ecosystem, name, version)
+            return None
+        if e.code != 429 and e.code < 500:
+            return None
+        # Rate-limited or server error: a stale value beats reporting unknown
+        return row[0] if row else None
+    except (URLError, OSError):
+        # Offline: a stale value beats reporting unknown
+        return row[0] if row else None
+
+    if body is None:
+        if row:
+            _cache_touch(ecosystem, name, version)
+            return row[0]
+        return None
+
+    value = parse(body)
+    if value:
+        cache_put(
+            ecosystem, name, version, value,
+            resp_headers.get("ETag"), resp_headers.get("Last-Modified"),
+        )
+    return value
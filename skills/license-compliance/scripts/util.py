@@ -2,20 +2,75 @@
 
 from __future__ import annotations
 
+import json
+import os
 import subprocess
-from typing import Optional
+import tempfile
+from pathlib import Path
+from typing import Iterator, Optional
 
+try:
+    # Optional speedup for lockfiles, registry responses and the org tracker
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    json_loads = json.loads
 
-def run_command(args: list[str], cwd: Optional[str] = None, timeout: int = 300) -> tuple[bool, str]:
-    """Run a command and return (success, output)."""
+# Directories that never hold manifests we scan: VCS metadata, installed
+# dependencies, virtualenvs, IDE/tool state and build output
+IGNORED_DIRS = frozenset({
+    ".git", "node_modules", "build", ".dart_tool", "bin", "obj", "target", ".venv", "__pycache__",
+    ".gradle", ".idea", "out", ".build", "DerivedData", "Pods",
+})
+
+
+def json_dumps(obj, indent: bool = False) -> str:
+    """Serialize with orjson when available; compact unless indent is set."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    if indent:
+        return json.dumps(obj, indent=2)
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def walk_project(root: Path) -> Iterator[tuple[str, list[str], list[str]]]:
+    """os.walk over root, pruning IGNORED_DIRS in place."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS]
+        yield dirpath, dirnames, filenames
+
+
+def run_command(
+    args: list[str], cwd: Optional[str] = None, timeout: int = 300, tail_bytes: Optional[int] = None
+) -> tuple[bool, str]:
+    """Run a command and return (success, output).
+
+    With tail_bytes, stdout and stderr are written to temporary files rather
+    than buffered in memory, and only their last tail_bytes are decoded; for
+    commands like package installs whose logs matter only as an error message.
+    """
     try:
-        result = subprocess.run(
-            args, capture_output=True, text=True, cwd=cwd, timeout=timeout
-        )
-        if result.returncode != 0:
-            return False, result.stderr.strip() or result.stdout.strip()
-        return True, result.stdout.strip()
+        if tail_bytes is None:
+            result = subprocess.run(
+                args, capture_output=True, text=True, cwd=cwd, timeout=timeout
+            )
+            stdout, stderr = result.stdout, result.stderr
+        else:
+            with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+                result = subprocess.run(args, stdout=out, stderr=err, cwd=cwd, timeout=timeout)
+                stdout, stderr = _read_tail(out, tail_bytes), _read_tail(err, tail_bytes)
     except subprocess.TimeoutExpired:
         return False, f"Timeout after {timeout}s: {' '.join(args)}"
     except FileNotFoundError:
         return False, f"Command not found: {args[0]}"
+    if result.returncode != 0:
+        return False, stderr.strip() or stdout.strip()
+    return True, stdout.strip()
+
+
+def _read_tail(f, size: int) -> str:
+    """Decode the last size bytes of a binary file."""
+    end = f.seek(0, os.SEEK_END)
+    f.seek(max(0, end - size))
+    return f.read().decode("utf-8", errors="replace")